@@ -6,8 +6,16 @@
 
 import pickle
 import os
+import stat
+import sys
 import tempfile
 import copy
+import gc
+import hashlib
+import time
+import concurrent.futures
+import multiprocessing
+from collections import namedtuple
 from vulkan_object import (VulkanObject,
     Extension, Version, Legacy, Handle, Param, CommandScope, Command,
     EnumField, Enum, Flag, Bitmask, ExternSync, Flags, Member, Struct,
@@ -21,7 +29,8 @@ from vulkan_object import (VulkanObject,
 # Vulkan-Headers/registry folder
 from generator import OutputGenerator, GeneratorOptions, write
 from vkconventions import VulkanConventions
-from reg import Registry
+from reg import Registry, MemberAttributes
+import phaseprofile
 from xml.etree import ElementTree
 
 # An API style convention object
@@ -40,14 +49,22 @@ def intIfGet(elem, name):
 def boolGet(elem, name) -> bool:
     return elem.get(name) is not None and elem.get(name) == "true"
 
-def externSyncGet(elem):
-    value = elem.get('externsync')
-    if value is None:
+# Returns the (length, nullTerminated) of a member or param from its parsed attributes
+def lengthGet(attributes: MemberAttributes):
+    length = attributes.altlen if attributes.altlen is not None else ','.join(attributes.len)
+    if not length:
+        return (None, False)
+    # we will either find it like "null-terminated" or "enabledExtensionCount,null-terminated"
+    # This finds both
+    nullTerminated = 'null-terminated' in length
+    length = length.replace(',null-terminated', '') if 'null-terminated' in length else length
+    length = None if length == 'null-terminated' else length
+    return (length, nullTerminated)
+
+# Returns the (ExternSync, externSyncPointer) of a member or param from its parsed attributes
+def externSyncGet(attributes: MemberAttributes):
+    if not attributes.externsync:
         return (ExternSync.NONE, None)
-    if value == 'true':
-        return (ExternSync.ALWAYS, None)
-    if value == 'maybe':
-        return (ExternSync.MAYBE, None)
 
     # There are no cases where multiple members of the param are marked as
     # externsync.  Supporting that with maybe: requires more than
@@ -57,7 +74,12 @@ def externSyncGet(elem):
     # If this assert is hit, please consider simplifying the design such that
     # externsync can move to the struct itself and so external synchronization
     # requirements do not depend on the context.
-    assert ',' not in value
+    assert len(attributes.externsync) == 1
+    value = attributes.externsync[0]
+    if value == 'true':
+        return (ExternSync.ALWAYS, None)
+    if value == 'maybe':
+        return (ExternSync.MAYBE, None)
 
     if value.startswith('maybe:'):
         return (ExternSync.SUBTYPE_MAYBE, value.removeprefix('maybe:'))
@@ -84,10 +106,154 @@ def SetMergedApiNames(names: str) -> None:
     global mergedApiNames
     mergedApiNames = names
 
-cachingEnabled = False
-def EnableCaching() -> None:
-    global cachingEnabled
-    cachingEnabled = True
+# Version of the VulkanObject cache file layout. Increment on incompatible changes.
+VULKAN_OBJECT_CACHE_VERSION = 1
+
+#
+# Cache of VulkanObjects shared by generator processes, so generators run against the
+# same XML only build the VulkanObject once.
+#
+# Entries are keyed by a hash of the vk.xml and video.xml contents, the target and merged
+# API names, and the source of the scripts building the VulkanObject, so a stale entry is
+# never used. Entries are written to a temporary file and renamed into place, so concurrent
+# generator processes never see a partial entry. Loading an entry marks it as recently used,
+# and the least recently used entries are removed when there are more than maxEntries.
+#
+# Unpickling an entry can run arbitrary code, so entries are only used from a directory owned
+# by the current user, which other users cannot write to.
+class VulkanObjectCache:
+    suffix = '.vkobject'
+
+    def __init__(self, directory: str, maxEntries: int):
+        self.directory = directory
+        self.maxEntries = maxEntries
+
+    # Returns True if the cache directory exists and only the current user can write to it
+    def isPrivate(self) -> bool:
+        try:
+            st = os.stat(self.directory)
+        except OSError:
+            return False
+        if not stat.S_ISDIR(st.st_mode) or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return False
+        # There is no owner to check on Windows
+        return not hasattr(os, 'getuid') or st.st_uid == os.getuid()
+
+    # generatorClass is the BaseGenerator subclass building the VulkanObject, since it can override
+    # the gen*() callbacks or applyExtensionDependency() and so change the VulkanObject
+    def makeKey(self, registryPath: str, videoXmlPath: str, apiName: str, mergedApiNames: str, generatorClass: type) -> str:
+        digest = hashlib.sha256()
+        digest.update(f'{VULKAN_OBJECT_CACHE_VERSION}\0'.encode())
+        for path in (registryPath, videoXmlPath):
+            if path is None:
+                digest.update(b'\0')
+            else:
+                with open(path, 'rb') as fp:
+                    digest.update(hashlib.sha256(fp.read()).digest())
+        digest.update(repr((apiName, mergedApiNames, generatorClass.__module__, generatorClass.__qualname__)).encode())
+        # Changes to the scripts building the VulkanObject, including those defining the generator
+        # class and its base classes, also invalidate the cache
+        modules = ['base_generator', 'vulkan_object', 'reg', 'generator']
+        for cls in generatorClass.__mro__:
+            if cls.__module__ not in modules:
+                modules.append(cls.__module__)
+        for module in modules:
+            path = getattr(sys.modules.get(module), '__file__', None)
+            if path is not None:
+                with open(path, 'rb') as fp:
+                    digest.update(fp.read())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    # Returns the cached VulkanObject, or None if there is no valid entry
+    def load(self, key: str) -> VulkanObject:
+        # Unpickling allocates many objects, none of them garbage
+        if not self.isPrivate():
+            return None
+        gcEnabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.path(key), 'rb') as fp:
+                (version, entryKey, vk) = pickle.load(fp)
+            if version != VULKAN_OBJECT_CACHE_VERSION or entryKey != key:
+                return None
+            os.utime(self.path(key))
+        except Exception:
+            # Missing, truncated, or incompatible entries are all misses
+            return None
+        finally:
+            if gcEnabled:
+                gc.enable()
+        return vk
+
+    # The cache is only an optimization, so failing to write an entry is a warning, not an error
+    def store(self, key: str, vk: VulkanObject) -> None:
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            if not self.isPrivate():
+                print(f'WARNING: Not caching the VulkanObject in {self.directory}, which is not private to the current user', file=sys.stderr)
+                return
+            fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as fp:
+                    pickle.dump((VULKAN_OBJECT_CACHE_VERSION, key, vk), fp, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpname, self.path(key))
+            except BaseException:
+                os.remove(tmpname)
+                raise
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as error:
+            # pickle raises any of the last three for objects which cannot be pickled
+            print(f'WARNING: Could not cache the VulkanObject in {self.directory}: {error}', file=sys.stderr)
+            return
+        self.evict()
+
+    # Remove the least recently used entries beyond maxEntries
+    def evict(self) -> None:
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError as error:
+            print(f'WARNING: Could not evict VulkanObject cache entries in {self.directory}: {error}', file=sys.stderr)
+            return
+        for name in names:
+            if name.endswith(self.suffix):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    # Removed by another process
+                    pass
+        entries.sort(reverse=True)
+        for (_, path) in entries[self.maxEntries:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+# Returns the default VulkanObjectCache directory, in the current user's cache directory
+def DefaultCacheDirectory() -> str:
+    cacheHome = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cacheHome, 'vkobject_cache')
+
+vulkanObjectCache = None
+
+#
+# Use a VulkanObjectCache in directory, or in DefaultCacheDirectory().
+# Only RunGenerator() and RunGenerators() load the VulkanObject from the cache, skipping reg.py.
+# Generators run by a Registry directly (Registry(), loadFile(), apiGen()) have already parsed
+# the XML, so they only store the VulkanObject they build; switch them to RunGenerator() to
+# load it from the cache.
+def EnableCaching(directory: str = None, maxEntries: int = 8) -> None:
+    global vulkanObjectCache
+    if directory is None:
+        directory = DefaultCacheDirectory()
+    vulkanObjectCache = VulkanObjectCache(directory, maxEntries)
+
+def DisableCaching() -> None:
+    global vulkanObjectCache
+    vulkanObjectCache = None
 
 # This class is a container for any source code, data, or other behavior that is necessary to
 # customize the generator script for a specific target API variant (e.g. Vulkan SC). As such,
@@ -156,6 +322,126 @@ class BaseGeneratorOptions(GeneratorOptions):
         # This is used to provide the video.xml to the private video XML generator
         self.videoXmlPath = videoXmlPath
 
+#
+# Keeps lists free of duplicates as items are appended to them, without searching the lists.
+# Strings are compared by value, and other items by identity rather than by the dataclass
+# __eq__, which compares every field of the items, including nested lists.
+# Items already in a list when it is first appended to are included.
+class UniqueLists:
+    def __init__(self):
+        # id() of each list -> (list, set of its item keys)
+        # The list is kept so its id() cannot be reused by another list
+        self.lists = dict()
+
+    @staticmethod
+    def key(item):
+        return item if isinstance(item, str) else id(item)
+
+    # Returns the set of keys of the items in the list, which are the items themselves for strings
+    def members(self, items: list) -> set:
+        entry = self.lists.get(id(items))
+        if entry is None:
+            entry = self.lists[id(items)] = (items, {self.key(x) for x in items})
+        return entry[1]
+
+    # Appends the item to the list if it is not already in it
+    def append(self, items: list, item) -> None:
+        members = self.members(items)
+        key = self.key(item)
+        if key not in members:
+            members.add(key)
+            items.append(item)
+
+#
+# Run a generator on the registry XML file, loading the VulkanObject from the
+# VulkanObjectCache if caching is enabled and it has an entry for the XML and options,
+# and otherwise building it with reg.py and storing it in the cache.
+def RunGenerator(generator: 'BaseGenerator', genOpts: BaseGeneratorOptions, registryPath: str) -> None:
+    if vulkanObjectCache is not None:
+        key = vulkanObjectCache.makeKey(registryPath, genOpts.videoXmlPath, genOpts.apiname, genOpts.mergeApiNames,
+                                         type(generator))
+        vk = vulkanObjectCache.load(key)
+        if vk is not None:
+            generator.generateFromCache(vk, genOpts)
+            return
+        generator.cacheKey = key
+    reg = Registry(generator, genOpts)
+    reg.loadFile(registryPath)
+    reg.apiGen()
+
+#
+# Result of a generator run by RunGenerators()
+#   filename - output file name from the generator options
+#   generator - class name of the generator
+#   seconds - time taken by the generator, not including building the VulkanObject
+#   outputFiles - dictionary of the files written by the generator, mapped to their SHA-256 digest
+GeneratorRun = namedtuple('GeneratorRun', ['filename', 'generator', 'seconds', 'outputFiles'])
+
+# Jobs run by RunGenerators(), inherited by the worker processes when they are forked
+# Each job is a (generator, genOpts, pickled VulkanObject) tuple
+runnerJobs = []
+
+# Run a job of RunGenerators(), returning its GeneratorRun and the phases timed for it
+def RunGeneratorsJob(index: int) -> tuple:
+    (generator, genOpts, vkData) = runnerJobs[index]
+    profiler = phaseprofile.profiler
+    firstEvent = len(profiler.events) if profiler else 0
+    name = type(generator).__name__
+    start = time.perf_counter()
+    with phaseprofile.phase(genOpts.filename or name):
+        # generate() may modify the VulkanObject, so each generator gets its own copy
+        # Unpickling allocates many objects, none of them garbage
+        gcEnabled = gc.isenabled()
+        gc.disable()
+        try:
+            vk = pickle.loads(vkData)
+        finally:
+            if gcEnabled:
+                gc.enable()
+        generator.generateFromCache(vk, genOpts)
+    run = GeneratorRun(genOpts.filename, name, time.perf_counter() - start, dict(generator.outputFiles))
+    return (run, profiler.events[firstEvent:] if profiler else [])
+
+#
+# Run several generators, each with its own options, on the registry XML file.
+# The VulkanObject is only built once for all generators with the same API and video.xml,
+# loading it from the VulkanObjectCache if caching is enabled.
+# With more than one job, worker processes are forked after the VulkanObjects are built
+# and run generate() for the generators concurrently. Output files are written by the
+# worker processes, each replacing the file atomically if its contents changed.
+# Returns a GeneratorRun for each generator, in the same order as the generators.
+def RunGenerators(generators: list, registryPath: str, jobs: int = 1) -> list[GeneratorRun]:
+    global runnerJobs
+    vkData = dict()
+    jobList = []
+    for (generator, genOpts) in generators:
+        key = (genOpts.apiname, genOpts.mergeApiNames, genOpts.videoXmlPath)
+        if key not in vkData:
+            builder = _VulkanObjectBuilder()
+            builderOptions = copy.copy(genOpts)
+            builderOptions.filename = None
+            with phaseprofile.phase('VulkanObject'):
+                RunGenerator(builder, builderOptions, registryPath)
+                vkData[key] = pickle.dumps(builder.vk, protocol=pickle.HIGHEST_PROTOCOL)
+        jobList.append((generator, genOpts, vkData[key]))
+
+    runnerJobs = jobList
+    try:
+        if jobs <= 1 or len(runnerJobs) <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            results = [RunGeneratorsJob(index) for index in range(len(runnerJobs))]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers = jobs,
+                    mp_context = multiprocessing.get_context('fork')) as executor:
+                results = list(executor.map(RunGeneratorsJob, range(len(runnerJobs))))
+
+            # Add the phases timed in the worker processes
+            if phaseprofile.profiler:
+                for (_, events) in results:
+                    phaseprofile.profiler.events += events
+    finally:
+        runnerJobs = []
+    return [run for (run, _) in results]
+
 #
 # This object handles all the parsing from reg.py generator scripts in the Vulkan-Headers
 # It will grab all the data and form it into a single object the rest of the generators will use
@@ -189,6 +475,9 @@ class BaseGenerator(OutputGenerator):
         self.enumFieldMap: dict[str, EnumField] = dict()
         self.flagMap: dict[str, Flag] = dict()
 
+        # Key of the VulkanObjectCache entry to store the VulkanObject in, once built
+        self.cacheKey = None
+
     # De-aliases a definition name based on the specified alias map.
     # There are aliases of aliases.
     # e.g. VK_STRUCTURE_TYPE_PHYSICAL_DEVICE_VARIABLE_POINTER_FEATURES_KHR aliases
@@ -201,6 +490,40 @@ class BaseGenerator(OutputGenerator):
             name = aliasMap[name]
         return name
 
+    # The same names (types, extensions, protect macros, etc) are repeated throughout the
+    # VulkanObject as separate strings, so replace them all with a single interned copy.
+    # This also makes pickling the VulkanObject store each name only once.
+    @phaseprofile.timed('internStrings')
+    def internStrings(self):
+        intern = sys.intern
+        visited = set()
+
+        def internValue(value):
+            valueType = type(value)
+            if valueType is str:
+                return intern(value)
+            if value is None or valueType is bool or valueType is int or id(value) in visited:
+                return value
+            visited.add(id(value))
+            if valueType is list:
+                if value:
+                    value[:] = [intern(x) if type(x) is str else internValue(x) for x in value]
+            elif valueType is dict:
+                items = [(internValue(key), internValue(x)) for (key, x) in value.items()]
+                value.clear()
+                value.update(items)
+            elif hasattr(valueType, '__dataclass_fields__'):
+                if hasattr(valueType, '__setstate__'):
+                    # The state of slotted model objects is a tuple of their field values
+                    value.__setstate__(tuple([intern(x) if type(x) is str else internValue(x)
+                                              for x in value.__getstate__()]))
+                else:
+                    for name in value.__dataclass_fields__:
+                        setattr(value, name, internValue(getattr(value, name)))
+            return value
+
+        internValue(self.vk)
+
     def write(self, data):
         # Prevents having to check before writing
         if data is not None and data != "":
@@ -210,6 +533,11 @@ class BaseGenerator(OutputGenerator):
         OutputGenerator.beginFile(self, genOpts)
         self.filename = genOpts.filename
 
+        # Generators run by a Registry directly, rather than by RunGenerator(), have no cache key yet
+        if vulkanObjectCache is not None and self.cacheKey is None and isinstance(self.registry.filename, (str, os.PathLike)):
+            self.cacheKey = vulkanObjectCache.makeKey(self.registry.filename, genOpts.videoXmlPath, genOpts.apiname,
+                                                      genOpts.mergeApiNames, type(self))
+
         # No gen*() command to get these, so do it manually
         for platform in self.registry.tree.findall('platforms/platform'):
             self.vk.platforms[platform.get('name')] = platform.get('protect')
@@ -240,7 +568,9 @@ class BaseGenerator(OutputGenerator):
     #
     # self.featureDictionary is built for use in the reg.py framework
     # Details found in Vulkan-Docs/scripts/scriptgenerator.py
+    @phaseprofile.timed('applyExtensionDependency')
     def applyExtensionDependency(self):
+        unique = UniqueLists()
         for extension in self.vk.extensions.values():
             # dict.key() can be None, so need to double loop
             dict = self.featureDictionary[extension.name]['command']
@@ -261,9 +591,8 @@ class BaseGenerator(OutputGenerator):
                         continue
 
                     command = self.vk.commands[commandName]
-                    # Make sure list is unique
-                    command.extensions.extend([extension.name] if extension.name not in command.extensions else [])
-                    extension.commands.extend([command] if command not in extension.commands else [])
+                    unique.append(command.extensions, extension.name)
+                    unique.append(extension.commands, command)
 
             # While genGroup() will call twice with aliased value, it does not provide all the information we need
             dict = self.featureDictionary[extension.name]['enumconstant']
@@ -272,38 +601,36 @@ class BaseGenerator(OutputGenerator):
                 for group in dict[required]:
                     if group in self.vk.handles:
                         handle = self.vk.handles[group]
-                        # Make sure list is unique
-                        handle.extensions.extend([extension.name] if extension.name not in handle.extensions else [])
-                        extension.handles[group].extend([handle] if handle not in extension.handles[group] else [])
+                        unique.append(handle.extensions, extension.name)
+                        unique.append(extension.handles, handle)
                     if group in self.vk.enums:
                         if group not in extension.enumFields:
                             extension.enumFields[group] = [] # Dict needs init
                         enum = self.vk.enums[group]
                         # Need to convert all alias so they match what is in EnumField
-                        enumList = list(map(lambda x: x if x not in self.enumFieldAliasMap else self.dealias(x, self.enumFieldAliasMap), dict[required][group]))
+                        enumNames = {self.dealias(x, self.enumFieldAliasMap) for x in dict[required][group]}
 
-                        for enumField in [x for x in enum.fields if x.name in enumList]:
-                            # Make sure list is unique
-                            enum.fieldExtensions.extend([extension.name] if extension.name not in enum.fieldExtensions else [])
-                            enumField.extensions.extend([extension.name] if extension.name not in enumField.extensions else [])
-                            extension.enumFields[group].extend([enumField] if enumField not in extension.enumFields[group] else [])
+                        for enumField in [x for x in enum.fields if x.name in enumNames]:
+                            unique.append(enum.fieldExtensions, extension.name)
+                            unique.append(enumField.extensions, extension.name)
+                            unique.append(extension.enumFields[group], enumField)
                     if group in self.vk.bitmasks:
                         if group not in extension.flagBits:
                             extension.flagBits[group] = [] # Dict needs init
                         bitmask = self.vk.bitmasks[group]
                         # Need to convert all alias so they match what is in Flags
-                        flagList = list(map(lambda x: x if x not in self.flagAliasMap else self.dealias(x, self.flagAliasMap), dict[required][group]))
+                        flagNames = {self.dealias(x, self.flagAliasMap) for x in dict[required][group]}
 
-                        for flags in [x for x in bitmask.flags if x.name in flagList]:
-                            # Make sure list is unique
-                            bitmask.flagExtensions.extend([extension.name] if extension.name not in bitmask.flagExtensions else [])
-                            flags.extensions.extend([extension.name] if extension.name not in flags.extensions else [])
-                            extension.flagBits[group].extend([flags] if flags not in extension.flagBits[group] else [])
+                        for flags in [x for x in bitmask.flags if x.name in flagNames]:
+                            unique.append(bitmask.flagExtensions, extension.name)
+                            unique.append(flags.extensions, extension.name)
+                            unique.append(extension.flagBits[group], flags)
                     if group in self.vk.flags:
                         flags = self.vk.flags[group]
-                        # Make sure list is unique
-                        flags.extensions.extend([extension.name] if extension.name not in flags.extensions else [])
-                        extension.flags.extend([flags] if flags not in extension.flags[group] else [])
+                        unique.append(flags.extensions, extension.name)
+                        if group not in extension.flags:
+                            extension.flags[group] = [] # Dict needs init
+                        unique.append(extension.flags[group], flags)
 
         # Need to do 'enum'/'bitmask' after 'enumconstant' has applied everything so we can add implicit extensions
         #
@@ -322,17 +649,18 @@ class BaseGenerator(OutputGenerator):
                         enumName = self.dealias(enumName, self.enumAliasMap)
                         if enumName in self.vk.enums:
                             enum = self.vk.enums[enumName]
-                            enum.extensions.extend([extension.name] if extension.name not in enum.extensions else [])
-                            extension.enums.extend([enum] if enum not in extension.enums else [])
+                            unique.append(enum.extensions, extension.name)
+                            unique.append(extension.enums, enum)
                             # Update fields with implicit base extension
                             if isAlias:
                                 continue
-                            enum.fieldExtensions.extend([extension.name] if extension.name not in enum.fieldExtensions else [])
-                            for enumField in [x for x in enum.fields if (not x.extensions or (x.extensions and all(e in enum.extensions for e in x.extensions)))]:
-                                enumField.extensions.extend([extension.name] if extension.name not in enumField.extensions else [])
+                            unique.append(enum.fieldExtensions, extension.name)
+                            enumExtensions = unique.members(enum.extensions)
+                            for enumField in [x for x in enum.fields if enumExtensions.issuperset(x.extensions)]:
+                                unique.append(enumField.extensions, extension.name)
                                 if enumName not in extension.enumFields:
                                     extension.enumFields[enumName] = [] # Dict needs init
-                                extension.enumFields[enumName].extend([enumField] if enumField not in extension.enumFields[enumName] else [])
+                                unique.append(extension.enumFields[enumName], enumField)
 
             dict = self.featureDictionary[extension.name]['bitmask']
             for required in dict:
@@ -343,17 +671,18 @@ class BaseGenerator(OutputGenerator):
                         bitmaskName = self.dealias(bitmaskName, self.bitmaskAliasMap)
                         if bitmaskName in self.vk.bitmasks:
                             bitmask = self.vk.bitmasks[bitmaskName]
-                            bitmask.extensions.extend([extension.name] if extension.name not in bitmask.extensions else [])
-                            extension.bitmasks.extend([bitmask] if bitmask not in extension.bitmasks else [])
+                            unique.append(bitmask.extensions, extension.name)
+                            unique.append(extension.bitmasks, bitmask)
                             # Update flags with implicit base extension
                             if isAlias:
                                 continue
-                            bitmask.flagExtensions.extend([extension.name] if extension.name not in bitmask.flagExtensions else [])
-                            for flag in [x for x in bitmask.flags if (not x.extensions or (x.extensions and all(e in bitmask.extensions for e in x.extensions)))]:
-                                flag.extensions.extend([extension.name] if extension.name not in flag.extensions else [])
+                            unique.append(bitmask.flagExtensions, extension.name)
+                            bitmaskExtensions = unique.members(bitmask.extensions)
+                            for flag in [x for x in bitmask.flags if bitmaskExtensions.issuperset(x.extensions)]:
+                                unique.append(flag.extensions, extension.name)
                                 if bitmaskName not in extension.flagBits:
                                     extension.flagBits[bitmaskName] = [] # Dict needs init
-                                extension.flagBits[bitmaskName].extend([flag] if flag not in extension.flagBits[bitmaskName] else [])
+                                unique.append(extension.flagBits[bitmaskName], flag)
 
         # Some structs (ex VkAttachmentSampleCountInfoAMD) can have multiple alias pointing to same extension
         for extension in self.vk.extensions.values():
@@ -365,8 +694,8 @@ class BaseGenerator(OutputGenerator):
                         structName = self.dealias(structName, self.structAliasMap)
                         if structName in self.vk.structs:
                             struct = self.vk.structs[structName]
-                            struct.extensions.extend([extension.name] if extension.name not in struct.extensions else [])
-                            extension.structs.extend([struct] if struct not in extension.structs else [])
+                            unique.append(struct.extensions, extension.name)
+                            unique.append(extension.structs, struct)
 
         # While we update struct alias inside other structs, the command itself might have the struct as a first level param.
         # We use this time to update params to have the promoted name
@@ -495,24 +824,19 @@ class BaseGenerator(OutputGenerator):
         self.vk.headerVersionComplete = APISpecific.createHeaderVersion(self.targetApiName, self.vk)
 
         # Use structs and commands to find which things are returnedOnly
-        for struct in [x for x in self.vk.structs.values() if not x.returnedOnly]:
-            for enum in [self.vk.enums[x.type] for x in struct.members if x.type in self.vk.enums]:
-                enum.returnedOnly = False
-            for bitmask in [self.vk.bitmasks[x.type] for x in struct.members if x.type in self.vk.bitmasks]:
-                bitmask.returnedOnly = False
-            for flags in [self.vk.flags[x.type] for x in struct.members if x.type in self.vk.flags]:
-                flags.returnedOnly = False
-                if flags.bitmaskName is not None:
-                    self.vk.bitmasks[flags.bitmaskName].returnedOnly = False
-        for command in self.vk.commands.values():
-            for enum in [self.vk.enums[x.type] for x in command.params if x.type in self.vk.enums]:
-                enum.returnedOnly = False
-            for bitmask in [self.vk.bitmasks[x.type] for x in command.params if x.type in self.vk.bitmasks]:
-                bitmask.returnedOnly = False
-            for flags in [self.vk.flags[x.type] for x in command.params if x.type in self.vk.flags]:
-                flags.returnedOnly = False
-                if flags.bitmaskName is not None:
-                    self.vk.bitmasks[flags.bitmaskName].returnedOnly = False
+        references = self.registry.references
+        def usedAsInput(typeName):
+            return (any(x in self.vk.commands for x in references.commandsUsingType(typeName)) or
+                    any(x in self.vk.structs and not self.vk.structs[x].returnedOnly
+                        for x in references.structsUsingType(typeName)))
+        for enum in [x for x in self.vk.enums.values() if usedAsInput(x.name)]:
+            enum.returnedOnly = False
+        for bitmask in [x for x in self.vk.bitmasks.values() if usedAsInput(x.name)]:
+            bitmask.returnedOnly = False
+        for flags in [x for x in self.vk.flags.values() if usedAsInput(x.name)]:
+            flags.returnedOnly = False
+            if flags.bitmaskName is not None:
+                self.vk.bitmasks[flags.bitmaskName].returnedOnly = False
 
         # Turn handle parents into pointers to classes
         for handle in [x for x in self.vk.handles.values() if x.parent is not None]:
@@ -529,22 +853,23 @@ class BaseGenerator(OutputGenerator):
         maxSyncEquivalent.accesses = self.vk.bitmasks['VkAccessFlagBits2'].flags
         maxSyncEquivalent.stages = self.vk.bitmasks['VkPipelineStageFlagBits2'].flags
 
+        self.internStrings()
+
+        # Cache the VulkanObject before generate() can modify it
+        if vulkanObjectCache is not None and self.cacheKey is not None:
+            vulkanObjectCache.store(self.cacheKey, self.vk)
+        self.cacheKey = None
+
         # All inherited generators should run from here
         self.generate()
 
-        if cachingEnabled:
-            cachePath = os.path.join(tempfile.gettempdir(), f'vkobject_{os.getpid()}')
-            if not os.path.isfile(cachePath):
-                cacheFile = open(cachePath, 'wb')
-                pickle.dump(self.vk, cacheFile)
-                cacheFile.close()
-
         # This should not have to do anything but call into OutputGenerator
         OutputGenerator.endFile(self)
 
     #
     # Bypass the entire processing and load in the VkObject data
     # Still need to handle the beingFile/endFile for reg.py
+    # RunGenerator() does this when caching is enabled and the cache has a matching VulkanObject
     def generateFromCache(self, cacheVkObjectData, genOpts):
         OutputGenerator.beginFile(self, genOpts)
         self.filename = genOpts.filename
@@ -626,7 +951,7 @@ class BaseGenerator(OutputGenerator):
             return
 
         params = []
-        for param in cmdinfo.elem.findall('param'):
+        for (param, paramAttributes) in zip(cmdinfo.getParams(), cmdinfo.paramAttributes):
             paramName = param.find('name').text
             paramType = textIfFind(param, 'type')
             paramAlias = param.get('alias')
@@ -639,25 +964,18 @@ class BaseGenerator(OutputGenerator):
 
             paramNoautovalidity = boolGet(param, 'noautovalidity')
 
-            nullTerminated = False
-            length = param.get('altlen') if param.get('altlen') is not None else param.get('len')
-            if length:
-                # we will either find it like "null-terminated" or "enabledExtensionCount,null-terminated"
-                # This finds both
-                nullTerminated = 'null-terminated' in length
-                length = length.replace(',null-terminated', '') if 'null-terminated' in length else length
-                length = None if length == 'null-terminated' else length
+            (length, nullTerminated) = lengthGet(paramAttributes)
 
             if fixedSizeArray and not length:
                 length = ','.join(fixedSizeArray)
 
             # See Member::optional code for details of this
-            optionalValues = splitIfGet(param, 'optional')
-            optional = len(optionalValues) > 0 and optionalValues[0].lower() == "true"
-            optionalPointer = len(optionalValues) > 1 and optionalValues[1].lower() == "true"
+            optionalValues = paramAttributes.optional
+            optional = len(optionalValues) > 0 and optionalValues[0]
+            optionalPointer = len(optionalValues) > 1 and optionalValues[1]
 
             # externsync will be 'true', 'maybe', '<expression>' or 'maybe:<expression>'
-            (externSync, externSyncPointer) = externSyncGet(param)
+            (externSync, externSyncPointer) = externSyncGet(paramAttributes)
 
             params.append(Param(paramName, paramAlias, paramType, paramFullType, paramNoautovalidity,
                                 paramConst, length, nullTerminated, pointer, fixedSizeArray,
@@ -670,8 +988,8 @@ class BaseGenerator(OutputGenerator):
 
         queues = splitIfGet(attrib, 'queues')
         allowNoQueues = boolGet(attrib, 'allownoqueues')
-        successcodes = splitIfGet(attrib, 'successcodes')
-        errorcodes = splitIfGet(attrib, 'errorcodes')
+        successcodes = list(cmdinfo.successcodes)
+        errorcodes = list(cmdinfo.errorcodes)
         cmdbufferlevel = attrib.get('cmdbufferlevel')
         primary = cmdbufferlevel is not None and 'primary' in cmdbufferlevel
         secondary = cmdbufferlevel is not None and 'secondary' in cmdbufferlevel
@@ -817,14 +1135,13 @@ class BaseGenerator(OutputGenerator):
             returnedOnly = boolGet(typeElem, 'returnedonly')
             allowDuplicate = boolGet(typeElem, 'allowduplicate')
 
-            extends = splitIfGet(typeElem, 'structextends')
+            extends = list(typeInfo.structextends)
             extendedBy = self.registry.validextensionstructs[typeName] if len(self.registry.validextensionstructs[typeName]) > 0 else []
 
-            membersElem = typeInfo.elem.findall('.//member')
             members = []
             sType = None
 
-            for member in membersElem:
+            for (member, memberAttributes) in zip(typeInfo.getMembers(), typeInfo.memberAttributes):
                 for comment in member.findall('comment'):
                     member.remove(comment)
 
@@ -834,18 +1151,11 @@ class BaseGenerator(OutputGenerator):
                 noautovalidity = boolGet(member, 'noautovalidity')
                 limittype = member.get('limittype')
 
-                (externSync, externSyncPointer) = externSyncGet(member)
+                (externSync, externSyncPointer) = externSyncGet(memberAttributes)
                 # No cases currently where a subtype of a struct is marked as externally synchronized.
                 assert externSyncPointer is None
 
-                nullTerminated = False
-                length = member.get('altlen') if member.get('altlen') is not None else member.get('len')
-                if length:
-                    # we will either find it like "null-terminated" or "enabledExtensionCount,null-terminated"
-                    # This finds both
-                    nullTerminated = 'null-terminated' in length
-                    length = length.replace(',null-terminated', '') if 'null-terminated' in length else length
-                    length = None if length == 'null-terminated' else length
+                (length, nullTerminated) = lengthGet(memberAttributes)
 
                 cdecl = self.makeCParamDecl(member, 0)
                 fullType = ' '.join(cdecl[:cdecl.rfind(name)].split())
@@ -860,7 +1170,7 @@ class BaseGenerator(OutputGenerator):
                 # Handle C bit field members
                 bitFieldWidth = int(cdecl.split(':')[1]) if ':' in cdecl else None
 
-                selector = member.get('selector') if not union else None
+                selector = memberAttributes.selector if not union else None
                 selection = member.get('selection') if union else None
                 selections = []
                 if selection:
@@ -871,9 +1181,9 @@ class BaseGenerator(OutputGenerator):
                 #     optional="false,true" for pPhysicalDeviceCount
                 # the first is if the variable itself is optional
                 # the second is the value of the pointer is optional;
-                optionalValues = splitIfGet(member, 'optional')
-                optional = len(optionalValues) > 0 and optionalValues[0].lower() == "true"
-                optionalPointer = len(optionalValues) > 1 and optionalValues[1].lower() == "true"
+                optionalValues = memberAttributes.optional
+                optional = len(optionalValues) > 0 and optionalValues[0]
+                optionalPointer = len(optionalValues) > 1 and optionalValues[1]
 
                 members.append(Member(name, type, fullType, noautovalidity, limittype,
                                       const, length, nullTerminated, pointer, fixedSizeArray,
@@ -1168,3 +1478,9 @@ class _VideoStdGenerator(BaseGenerator):
     def genSyncPipeline(self, sync):
         # video.xml should not contain any sync pipeline info
         assert False
+
+#
+# Builds the VulkanObject for RunGenerators(), without generating anything from it
+class _VulkanObjectBuilder(BaseGenerator):
+    def generate(self):
+        pass
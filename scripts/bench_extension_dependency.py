@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+#
+# Copyright 2025 The Khronos Group Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Time BaseGenerator.applyExtensionDependency() on a registry.
+
+The VulkanObject is built repeatedly, with phases timed by phaseprofile,
+and the best time of the pass is reported, with a digest of the
+extension dependencies it computed.
+
+To compare revisions, run the script from each of them, for example from
+a `git worktree` of the earlier revision, and check that the digests
+match. On revisions where applyExtensionDependency() is not already timed
+as a phase, or which have no phaseprofile module, the script times it
+itself."""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+from base_generator import (BaseGenerator, BaseGeneratorOptions, SetMergedApiNames,
+                            SetOutputDirectory, SetOutputFileName, SetTargetApiName)
+from reg import Registry
+try:
+    import phaseprofile
+except ImportError:
+    # Revisions before phaseprofile was added
+    phaseprofile = None
+
+phaseName = 'applyExtensionDependency'
+
+
+class DependencyGenerator(BaseGenerator):
+    """Builds the VulkanObject, and records a digest of its extension
+    dependencies."""
+
+    def __init__(self):
+        BaseGenerator.__init__(self)
+        self.digest = None
+
+    def generate(self):
+        self.digest = dependencyDigest(self.vk)
+
+
+def names(items):
+    """Return the names of a list of VulkanObject definitions."""
+    return [item.name for item in items]
+
+
+def dependencyDigest(vk):
+    """Return a SHA-256 hex digest of the extension dependencies in a
+    VulkanObject, in the order applyExtensionDependency() added them.
+
+    - vk - VulkanObject"""
+    digest = hashlib.sha256()
+    for extension in vk.extensions.values():
+        lists = [extension.commands, extension.enums, extension.bitmasks, extension.structs, extension.handles]
+        for groups in (extension.enumFields, extension.flagBits, extension.flags):
+            lists.extend(groups[group] for group in sorted(groups))
+        digest.update(repr((extension.name, [names(items) for items in lists])).encode())
+    for definitions in (vk.commands, vk.enums, vk.bitmasks, vk.structs, vk.handles, vk.flags):
+        for definition in definitions.values():
+            digest.update(repr((definition.name, definition.extensions)).encode())
+    for enum in vk.enums.values():
+        digest.update(repr([(field.name, field.extensions) for field in enum.fields]).encode())
+    for bitmask in vk.bitmasks.values():
+        digest.update(repr([(flag.name, flag.extensions) for flag in bitmask.flags]).encode())
+    return digest.hexdigest()
+
+
+def timeBuild(registryPath):
+    """Build the VulkanObject once, and return the time taken by
+    applyExtensionDependency() in seconds, and the dependency digest.
+
+    - registryPath - path of the registry XML file"""
+    generator = DependencyGenerator()
+    if phaseprofile is None:
+        return timeBuildDirectly(generator, registryPath)
+
+    profiler = phaseprofile.enable()
+    try:
+        # functools.wraps, used by phaseprofile.timed(), sets __wrapped__
+        if not hasattr(BaseGenerator.applyExtensionDependency, '__wrapped__'):
+            phaseprofile.instrument(generator, [phaseName])
+        build(generator, registryPath)
+    finally:
+        phaseprofile.disable()
+    seconds = sum(duration for (path, _, duration, _, _) in profiler.events if path[-1] == phaseName)
+    return (seconds / 1e9, generator.digest)
+
+
+def timeBuildDirectly(generator, registryPath):
+    """Build the VulkanObject once, timing applyExtensionDependency()
+    without phaseprofile, and return the time taken in seconds and the
+    dependency digest.
+
+    - generator - DependencyGenerator
+    - registryPath - path of the registry XML file"""
+    times = []
+    method = generator.applyExtensionDependency
+
+    def timedMethod(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            times.append(time.perf_counter() - start)
+
+    generator.applyExtensionDependency = timedMethod
+    build(generator, registryPath)
+    return (sum(times), generator.digest)
+
+
+def build(generator, registryPath):
+    """Build the VulkanObject with a generator.
+
+    - generator - DependencyGenerator
+    - registryPath - path of the registry XML file"""
+    reg = Registry(generator, BaseGeneratorOptions())
+    reg.loadFile(registryPath)
+    reg.apiGen()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__.split('\n')[0])
+    parser.add_argument('-registry', action='store',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'xml', 'vk.xml'),
+                        help='Use specified registry file instead of vk.xml')
+    parser.add_argument('-apiname', action='store', default='vulkan',
+                        help='Specify API to build the VulkanObject for')
+    parser.add_argument('-mergeApiNames', action='store', default=None,
+                        help='Specify a comma separated list of API names to merge into the target API')
+    parser.add_argument('-repeat', action='store', type=int, default=5,
+                        help='Number of times to build the VulkanObject')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        SetOutputDirectory(directory)
+        SetOutputFileName('bench_extension_dependency.txt')
+        SetTargetApiName(args.apiname)
+        SetMergedApiNames(args.mergeApiNames)
+        results = [timeBuild(args.registry) for _ in range(args.repeat)]
+
+    digests = set(digest for (_, digest) in results)
+    if len(digests) != 1:
+        sys.exit('Dependencies differ between runs')
+    times = sorted(seconds for (seconds, _) in results)
+    print(f'{phaseName}: best {times[0]:.4f}s, median {times[len(times) // 2]:.4f}s of {args.repeat} runs')
+    print(f'digest: {digests.pop()}')
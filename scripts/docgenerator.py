@@ -241,7 +241,7 @@ class DocOutputGenerator(OutputGenerator):
         # Create file
         filename = directory / (f"{basename}{self.file_suffix}")
         self.logMsg('diag', '# Generating include file:', str(filename))
-        fp = open(filename, 'w', encoding='utf-8')
+        fp = self.openFile(filename)
 
         # Asciidoc anchor
         write(self.genOpts.conventions.warning_comment, file=fp)
@@ -277,7 +277,7 @@ class DocOutputGenerator(OutputGenerator):
             # Create secondary no cross-reference include file
             filename = directory / f'{basename}.no-xref{self.file_suffix}'
             self.logMsg('diag', '# Generating include file:', filename)
-            fp = open(filename, 'w', encoding='utf-8')
+            fp = self.openFile(filename)
 
             # Asciidoc anchor
             write(self.genOpts.conventions.warning_comment, file=fp)
@@ -296,7 +296,7 @@ class DocOutputGenerator(OutputGenerator):
         filename = str(directory / f'{basename}.comments{self.file_suffix}')
         self.logMsg('diag', '# Generating include file:', filename)
 
-        with open(filename, 'w', encoding='utf-8') as fp:
+        with self.openFile(filename) as fp:
             write(self.conventions.warning_comment, file=fp)
             write(_ENUM_TABLE_PREFIX, file=fp)
 
@@ -310,7 +310,7 @@ class DocOutputGenerator(OutputGenerator):
         """Write a generalized block/box for some values."""
         self.logMsg('diag', '# Generating include file:', filename)
 
-        with open(filename, 'w', encoding='utf-8') as fp:
+        with self.openFile(filename) as fp:
             write(self.conventions.warning_comment, file=fp)
             write(prefix, file=fp)
 
@@ -488,7 +488,7 @@ class ExtensionMetaDocOutputGenerator(OutputGenerator):
 
     def newFile(self, filename):
         self.logMsg('diag', '# Generating include file:', filename)
-        fp = open(filename, 'w', encoding='utf-8')
+        fp = self.openFile(filename)
         write(self.genOpts.conventions.warning_comment, file=fp)
         return fp
 
@@ -7,19 +7,30 @@
 
 from __future__ import unicode_literals
 
+import functools
+import hashlib
+import importlib.util
 import io
 import os
 import pdb
 import re
-import shutil
 import sys
-import tempfile
+import threading
+from collections import namedtuple
 try:
     from pathlib import Path
 except ImportError:
     from pathlib2 import Path  # type: ignore
 
 from spec_tools.util import getElemName, getElemType
+import phaseprofile
+
+
+EXT_BASE = 1000000000
+"Value of the first enumerant defined by an extension, with extension number 1"
+
+EXT_BLOCK_SIZE = 1000
+"Number of enumerant values reserved for each extension"
 
 
 def write(*args, **kwargs):
@@ -95,6 +106,119 @@ def regSortFeatures(orderedFeatureNames, features):
     # Sort by sortorder attribute
     orderedFeatureNames.sort(key=lambda name: features[name].sortorder)
 
+def writeFileIfChanged(filename, contents, newline=None):
+    """Write text to a file, unless the file already has the same contents.
+
+    The file is replaced atomically, by writing a temporary file in the
+    same directory and renaming it over the file.
+    Returns a (written, digest) tuple, where written is True if the file
+    was written and False if it was unchanged, and digest is the SHA-256
+    hex digest of the file contents.
+
+    - filename - path of the file to write
+    - contents - text to write, encoded as UTF-8
+    - newline - line ending '\\n' characters are translated to, as for
+      open(); by default, os.linesep"""
+
+    if newline is None:
+        newline = os.linesep
+    if newline not in ('', '\n'):
+        contents = contents.replace('\n', newline)
+    data = contents.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+
+    # Only read existing files which may match
+    filename = os.fspath(filename)
+    try:
+        if os.path.getsize(filename) == len(data):
+            with open(filename, 'rb') as fp:
+                if hashlib.sha256(fp.read()).hexdigest() == digest:
+                    return (False, digest)
+    except FileNotFoundError:
+        pass
+
+    (directory, basename) = os.path.split(filename)
+    tempname = os.path.join(directory, f'.{basename}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        with open(tempname, 'wb') as fp:
+            fp.write(data)
+        os.replace(tempname, filename)
+    except BaseException:
+        if os.path.exists(tempname):
+            os.remove(tempname)
+        raise
+    return (True, digest)
+
+
+class OutputFile(io.StringIO):
+    """Text file accumulated in memory, and written by writeFileIfChanged()
+    when closed. The file is not written if an exception is raised inside a
+    `with` statement using it."""
+
+    def __init__(self, filename, newline=None, onClose=None):
+        """Constructor
+
+        - filename - path of the file to write
+        - newline - line ending, as for writeFileIfChanged()
+        - onClose - function called with this object after the file is
+          written, or None"""
+        super().__init__()
+        self.name = filename
+        self.newline = newline
+        self.onClose = onClose
+        self.written = None
+        """True if the file was written when closed, False if unchanged."""
+        self.digest = None
+        """SHA-256 hex digest of the file contents, set when closed."""
+
+    def close(self):
+        if not self.closed:
+            with phaseprofile.phase('write file'):
+                (self.written, self.digest) = writeFileIfChanged(self.name, self.getvalue(), self.newline)
+            if self.onClose is not None:
+                self.onClose(self)
+        super().close()
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is not None:
+            # Discard the output
+            super().close()
+            return False
+        return super().__exit__(excType, excValue, traceback)
+
+
+def sharedDeclaration(method):
+    """Decorator for OutputGenerator methods making declarations from
+    registry Elements, sharing each declaration with the other generators
+    of the registry formatting declarations alike.
+
+    Declarations are looked up and stored in the OutputGenerator declCache,
+    by method name and arguments. Lists are copied, since callers may
+    modify them.
+
+    - method - OutputGenerator method with hashable arguments"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        cache = self.declCache
+        if cache is None:
+            return method(self, *args)
+        key = (name,) + args
+        decl = cache.get(key)
+        if decl is None:
+            decl = cache[key] = method(self, *args)
+        if isinstance(decl, list):
+            return list(decl)
+        return decl
+    return wrapper
+
+
+LogRecord = namedtuple('LogRecord', ['level', 'args'])
+"""A message logged by OutputGenerator.logMsg, recorded by
+OutputGenerator.recordMessages"""
+
+
 class MissingGeneratorOptionsError(RuntimeError):
     """Error raised when a Generator tries to do something that requires GeneratorOptions but it is None."""
 
@@ -320,6 +444,14 @@ class OutputGenerator:
         'basetype': 'basetypes',
     }
 
+    # profiledCallbacks - methods called by the Registry which are timed,
+    # if phases are timed
+    profiledCallbacks = (
+        'beginFile', 'endFile', 'beginFeature', 'endFeature',
+        'genType', 'genStruct', 'genGroup', 'genEnum', 'genCmd',
+        'genSpirv', 'genFormat', 'genSyncStage', 'genSyncAccess', 'genSyncPipeline',
+    )
+
     def breakName(self, name, msg):
         """Break into debugger if this is a special name"""
 
@@ -339,7 +471,16 @@ class OutputGenerator:
         self.outFile = None
         self.errFile = errFile
         self.warnFile = warnFile
+
+        self.logRecords = None
+        """List of LogRecords of the messages logged, if recordMessages()
+        has been called, or None."""
+
+        # Setting diagFile also sets diag_enabled, True if diagnostics are
+        # written or recorded. Callers test it before logMsg('diag', ...),
+        # so diagnostics are not even constructed when they are discarded.
         self.diagFile = diagFile
+
         # Internal state
         self.featureName = None
         """The current feature name being generated."""
@@ -353,9 +494,6 @@ class OutputGenerator:
         self.featureDictionary = {}
         """The dictionary of dictionaries of API features."""
 
-        # Used for extension enum value generation
-        self.extBase = 1000000000
-        self.extBlockSize = 1000
         self.madeDirs = {}
 
         # API dictionary, which may be loaded by the beginFile method of
@@ -365,6 +503,39 @@ class OutputGenerator:
         # File suffix for generated files, set in beginFile below.
         self.file_suffix = ''
 
+        self.declCache = None
+        """dictionary of declarations made by methods decorated with
+        sharedDeclaration(), shared with other generators making them alike
+        through Registry.declCache, while generating a file, or None"""
+
+        # Numbers of output files written and left unchanged because their
+        # contents were the same
+        self.outputCounts = {'written': 0, 'unchanged': 0}
+
+        # Input files read, other than the registry, and SHA-256 hex digests
+        # of output files produced, indexed by path
+        self.inputFiles = []
+        self.outputFiles = {}
+
+        phaseprofile.instrument(self, self.profiledCallbacks)
+
+    @property
+    def diagFile(self):
+        """File handle to write diagnostics to, or None to not write them."""
+        return self._diagFile
+
+    @diagFile.setter
+    def diagFile(self, diagFile):
+        self._diagFile = diagFile
+        self.diag_enabled = diagFile is not None or self.logRecords is not None
+
+    def recordMessages(self):
+        """Record the messages logged from now on, including diagnostics,
+        and return the list of LogRecords they are appended to."""
+        self.logRecords = []
+        self.diag_enabled = True
+        return self.logRecords
+
     def logMsg(self, level, *args):
         """Write a message of different categories to different
         destinations.
@@ -375,6 +546,8 @@ class OutputGenerator:
           - 'error' (fatal error - raises exception after logging)
 
         - `*args` - print()-style arguments to direct to corresponding log"""
+        if self.logRecords is not None:
+            self.logRecords.append(LogRecord(level, args))
         if level == 'error':
             strfile = io.StringIO()
             write('ERROR:', *args, file=strfile)
@@ -422,19 +595,24 @@ class OutputGenerator:
           API extension enum scheme in this function.
         - An 'alias' attribute contains the name of another enum
           which this is an alias of. The other enum must be
-          declared first when emitting this enum."""
+          declared first when emitting this enum.
+
+        The values are looked up in the table precomputed by
+        Registry.parseEnumValues(), so only the suffix depends on the
+        arguments."""
         if self.genOpts is None:
             raise MissingGeneratorOptionsError()
         if self.genOpts.conventions is None:
             raise MissingGeneratorOptionsConventionsError()
+        if self.registry is None:
+            raise MissingRegistryError()
 
-        name = elem.get('name')
-        numVal = None
-        if 'value' in elem.keys():
-            value = elem.get('value')
-            # print('About to translate value =', value, 'type =', type(value))
-            if needsNum:
-                numVal = int(value, 0)
+        entry = self.registry.getEnumValue(elem)
+        numVal = entry.numVal
+        value = entry.value
+        if entry.source == 'value':
+            if not needsNum:
+                numVal = None
             # If there is a non-integer, numeric 'type' attribute (e.g. 'u' or
             # 'ull'), append it to the string value.
             # t = enuminfo.elem.get('type')
@@ -445,100 +623,49 @@ class OutputGenerator:
                 value = f"{value}ULL"
               else:
                 value = f"{value}U"
-            self.logMsg('diag', 'Enum', name, '-> value [', numVal, ',', value, ']')
-            return [numVal, value]
-        if 'bitpos' in elem.keys():
-            value = elem.get('bitpos')
-            bitpos = int(value, 0)
-            numVal = 1 << bitpos
-            value = f'0x{numVal:08x}'
-            if bitwidth == 64 or bitpos >= 32:
+        elif entry.source == 'bitpos':
+            # Bit positions of 32 or more already have a ULL suffix
+            if numVal >= 1 << 32:
+              pass
+            elif bitwidth == 64:
               value = f"{value}ULL"
             elif forceSuffix:
               value = f"{value}U"
-            self.logMsg('diag', 'Enum', name, '-> bitpos [', numVal, ',', value, ']')
-            return [numVal, value]
-        if 'offset' in elem.keys():
-            # Obtain values in the mapping from the attributes
-            enumNegative = False
-            offset = int(elem.get('offset'), 0)
-            extnumber = int(elem.get('extnumber'), 0)
-            extends = elem.get('extends')
-            if 'dir' in elem.keys():
-                enumNegative = True
-            self.logMsg('diag', 'Enum', name, 'offset =', offset,
-                        'extnumber =', extnumber, 'extends =', extends,
-                        'enumNegative =', enumNegative)
-            # Now determine the actual enumerant value, as defined
-            # in the "Layers and Extensions" appendix of the spec.
-            numVal = self.extBase + (extnumber - 1) * self.extBlockSize + offset
-            if enumNegative:
-                numVal *= -1
-            value = '%d' % numVal
-            # More logic needed!
-            self.logMsg('diag', 'Enum', name, '-> offset [', numVal, ',', value, ']')
-            return [numVal, value]
-        if 'alias' in elem.keys():
-            alias_of = elem.get('alias')
+        elif entry.source == 'alias':
             if parent_for_alias_dereference is None:
-                return (None, alias_of)
+                return (None, value)
             siblings = parent_for_alias_dereference.findall('enum')
             for sib in siblings:
                 sib_name = sib.get('name')
-                if sib_name == alias_of:
+                if sib_name == value:
                     return self.enumToValue(sib, needsNum)
             raise RuntimeError("Could not find the aliased enum value")
-        return [None, None]
+        elif entry.source is None:
+            return [None, None]
+        if self.diag_enabled:
+            self.logMsg('diag', 'Enum', entry.name, '->', entry.source, '[', numVal, ',', value, ']')
+        return [numVal, value]
 
     def checkDuplicateEnums(self, enums):
-        """Check enumerated values for duplicates.
+        """Strip duplicate enumerated values.
 
         -  enums - list of `<enum>` Elements
 
-        returns the list with duplicates stripped"""
-        # Dictionaries indexed by name and numeric value.
-        # Entries are [ Element, numVal, strVal ] matching name or value
-
-        nameMap = {}
-        valueMap = {}
+        returns the list with duplicates stripped. The values of duplicates
+        were already checked by Registry.checkEnumValues(), which reports
+        conflicting values."""
 
+        names = set()
         stripped = []
         for elem in enums:
             name = elem.get('name')
-            (numVal, strVal) = self.enumToValue(elem, True)
-
-            if name in nameMap:
-                # Duplicate name found; check values
-                (name2, numVal2, strVal2) = nameMap[name]
-
-                # Duplicate enum values for the same name are benign. This
-                # happens when defining the same enum conditionally in
-                # several extension blocks.
-                if (strVal2 == strVal or (numVal is not None
-                                          and numVal == numVal2)):
-                    True
-                    # self.logMsg('info', 'checkDuplicateEnums: Duplicate enum (' + name +
-                    #             ') found with the same value:' + strVal)
-                else:
-                    self.logMsg('warn', 'checkDuplicateEnums: Duplicate enum (' + name
-                                + ') found with different values:' + strVal
-                                + ' and ' + strVal2)
 
-                # Do not add the duplicate to the returned list
+            # Do not add the duplicate to the returned list. Duplicate enum
+            # names happen when defining the same enum conditionally in
+            # several extension blocks.
+            if name in names:
                 continue
-            elif numVal in valueMap:
-                # Duplicate value found (such as an alias); report it, but
-                # still add this enum to the list.
-                (name2, numVal2, strVal2) = valueMap[numVal]
-
-                msg = 'Two enums found with the same value: {} = {} = {}'.format(
-                    name, name2.get('name'), strVal)
-                self.logMsg('error', msg)
-
-            # Track this enum to detect followon duplicates
-            nameMap[name] = [elem, numVal, strVal]
-            if numVal is not None:
-                valueMap[numVal] = [elem, numVal, strVal]
+            names.add(name)
 
             # Add this enum to the list
             stripped.append(elem)
@@ -700,9 +827,9 @@ class OutputGenerator:
                     # So initializing an alias from another 'static const' value would fail to compile.
                     # Work around this by chasing the aliases to get the actual value.
                     while numVal is None:
-                        alias = self.registry.tree.find(f"enums/enum[@name='{strVal}']")
+                        alias = self.registry.enumdict.get(strVal)
                         if alias is not None:
-                            (numVal, strVal) = self.enumToValue(alias, True, bitwidth, True)
+                            (numVal, strVal) = self.enumToValue(alias.elem, True, bitwidth, True)
                         else:
                             self.logMsg('error', f'No such alias {strVal} for enum {name}')
                     decl += f"static const {flagTypeName} {name} = {strVal};\n"
@@ -885,7 +1012,8 @@ class OutputGenerator:
         """Create a directory, if not already done.
 
         Generally called from derived generators creating hierarchies."""
-        self.logMsg('diag', 'OutputGenerator::makeDir(', path, ')')
+        if self.diag_enabled:
+            self.logMsg('diag', 'OutputGenerator::makeDir(', path, ')')
         if path not in self.madeDirs:
             # This can get race conditions with multiple writers, see
             # https://stackoverflow.com/questions/273192/
@@ -893,6 +1021,21 @@ class OutputGenerator:
                 os.makedirs(path)
             self.madeDirs[path] = None
 
+    def openFile(self, filename, newline=None):
+        """Open an output file for writing. The file is only written when
+        closed, and only if its contents changed.
+
+        - filename - path of the file to write
+        - newline - line ending, as for writeFileIfChanged()"""
+        return OutputFile(filename, newline, self.closeFile)
+
+    def closeFile(self, outFile):
+        """Record an output file opened by openFile() after it is closed.
+
+        - outFile - the OutputFile"""
+        self.outputCounts['written' if outFile.written else 'unchanged'] += 1
+        self.outputFiles[os.fspath(outFile.name)] = outFile.digest
+
     def beginFile(self, genOpts):
         """Start a new interface file
 
@@ -910,19 +1053,28 @@ class OutputGenerator:
         # Try to import the API dictionary, apimap.py, if it exists. Nothing
         # in apimap.py cannot be extracted directly from the XML, and in the
         # future we should do that.
+        # It is loaded from its path each time, rather than imported, so a
+        # long-lived process (genvk.py -serve) uses the current file for
+        # each target, and sys.path and sys.modules are unchanged.
         if self.genOpts.genpath is not None:
+            path = Path(self.genOpts.genpath) / 'apimap.py'
+            spec = importlib.util.spec_from_file_location('apimap', path)
+            apimap = importlib.util.module_from_spec(spec)
             try:
-                sys.path.insert(0, self.genOpts.genpath)
-                import apimap
+                spec.loader.exec_module(apimap)
                 self.apidict = apimap
-            except ImportError:
+                self.inputFiles.append(os.fspath(path))
+            except (FileNotFoundError, ImportError):
                 self.apidict = None
 
         self.conventions = genOpts.conventions
 
-        # Open a temporary file for accumulating output.
+        if self.registry is not None:
+            self.declCache = self.registry.declCache.setdefault(self.declarationStyle(), {})
+
+        # Accumulate output in memory, to be written by endFile.
         if self.genOpts.filename is not None:
-            self.outFile = tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', newline='\n', delete=False)
+            self.outFile = self.openFile(Path(self.genOpts.directory) / self.genOpts.filename, newline='\n')
         else:
             self.outFile = sys.stdout
 
@@ -935,22 +1087,32 @@ class OutputGenerator:
             self.diagFile.flush()
         if self.outFile:
             self.outFile.flush()
-            if self.outFile != sys.stdout and self.outFile != sys.stderr:
-                self.outFile.close()
 
             if self.genOpts is None:
                 raise MissingGeneratorOptionsError()
 
-            # On successfully generating output, move the temporary file to the
-            # target file.
+            # On successfully generating output, write the target file if
+            # its contents changed.
             if self.genOpts.filename is not None:
                 directory = Path(self.genOpts.directory)
                 if sys.platform == 'win32':
                     if not Path.exists(directory):
                         os.makedirs(directory)
-                shutil.copy(self.outFile.name, directory / self.genOpts.filename)
-                os.remove(self.outFile.name)
+                self.outFile.close()
+
+                # When other files were also generated, Makefiles use this
+                # file (such as timeMarker) as the target of the rule
+                # generating all of them, so it must always appear updated.
+                # Other unchanged outputs keep their modification time, so
+                # files depending on them are not rebuilt.
+                mainOutput = os.fspath(self.outFile.name)
+                if not self.outFile.written and any(name != mainOutput for name in self.outputFiles):
+                    os.utime(mainOutput)
+            if self.diag_enabled:
+                self.logMsg('diag', 'Output files written:', self.outputCounts['written'],
+                            'unchanged:', self.outputCounts['unchanged'])
         self.genOpts = None
+        self.declCache = None
 
     def beginFeature(self, interface, emit):
         """Write interface for a feature and tag generated features as having been done.
@@ -1078,6 +1240,28 @@ class OutputGenerator:
         Extend to generate as desired in your derived class."""
         return
 
+    def declarationStyle(self):
+        """Return a tuple of the generator options, conventions, and methods
+        affecting the declarations made by methods decorated with
+        sharedDeclaration(). Generators with the same style share those
+        declarations.
+
+        Derived generators whose declarations depend on other state must
+        extend this."""
+        generator = type(self)
+        return (getattr(self.genOpts, 'apicall', None),
+                getattr(self.genOpts, 'apientry', None),
+                getattr(self.genOpts, 'apientryp', None),
+                getattr(self.genOpts, 'alignFuncParam', None),
+                self.misracppstyle(),
+                self.should_insert_may_alias_macro,
+                type(self.conventions),
+                generator.makeProtoName,
+                generator.makeTypedefName,
+                generator.makeCParamDecl,
+                generator.getCParamTypeLength,
+                generator.makeCDecls)
+
     def makeProtoName(self, name, tail):
         """Turn a `<proto>` `<name>` into C-language prototype
         and typedef declarations for that name.
@@ -1094,6 +1278,7 @@ class OutputGenerator:
             raise MissingGeneratorOptionsError()
         return f"({self.genOpts.apientryp}PFN_{name}{tail})"
 
+    @sharedDeclaration
     def makeCParamDecl(self, param, aligncol):
         """Return a string which is an indented, formatted
         declaration for a `<param>` or `<member>` block (e.g. function parameter
@@ -1118,7 +1303,8 @@ class OutputGenerator:
                 # OpenXR-specific macro insertion - but not in apiinc for the spec
                 tail = self.genOpts.conventions.make_voidpointer_alias(tail)
             if elem.tag == 'name' and aligncol > 0:
-                self.logMsg('diag', 'Aligning parameter', elem.text, 'to column', self.genOpts.alignFuncParam)
+                if self.diag_enabled:
+                    self.logMsg('diag', 'Aligning parameter', elem.text, 'to column', self.genOpts.alignFuncParam)
                 # Align at specified column, if possible
                 paramdecl = paramdecl.rstrip()
                 oldLen = len(paramdecl)
@@ -1127,7 +1313,8 @@ class OutputGenerator:
                 # text.
                 paramdecl = f"{paramdecl.ljust(aligncol - 1)} "
                 newLen = len(paramdecl)
-                self.logMsg('diag', 'Adjust length of parameter decl from', oldLen, 'to', newLen, ':', paramdecl)
+                if self.diag_enabled:
+                    self.logMsg('diag', 'Adjust length of parameter decl from', oldLen, 'to', newLen, ':', paramdecl)
 
             if (self.misracppstyle() and prefix.find('const ') != -1):
                 # Change pointer type order from e.g. "const void *" to "void const *".
@@ -1146,6 +1333,7 @@ class OutputGenerator:
             paramdecl = indent + ' '.join(paramdecl.split())
         return paramdecl
 
+    @sharedDeclaration
     def getCParamTypeLength(self, param):
         """Return the length of the type field is an indented, formatted
         declaration for a `<param>` or `<member>` block (e.g. function parameter
@@ -1170,11 +1358,13 @@ class OutputGenerator:
             if elem.tag == 'name':
                 # Align at specified column, if possible
                 newLen = len(paramdecl.rstrip())
-                self.logMsg('diag', 'Identifying length of', elem.text, 'as', newLen)
+                if self.diag_enabled:
+                    self.logMsg('diag', 'Identifying length of', elem.text, 'as', newLen)
             paramdecl += text + tail
 
         return newLen
 
+    @sharedDeclaration
     def getMaxCParamTypeLength(self, info):
         """Return the length of the longest type field for a member/parameter.
 
@@ -1294,8 +1484,9 @@ class OutputGenerator:
 
         - elem - `<enum>` element to test"""
         required = elem.get('required') is not None
-        self.logMsg('diag', 'isEnumRequired:', elem.get('name'),
-                    '->', required)
+        if self.diag_enabled:
+            self.logMsg('diag', 'isEnumRequired:', elem.get('name'),
+                        '->', required)
         return required
 
         # @@@ This code is overridden by equivalent code now run in
@@ -1318,6 +1509,7 @@ class OutputGenerator:
 
         return required
 
+    @sharedDeclaration
     def makeCDecls(self, cmd):
         """Return C prototype and function pointer typedef for a
         `<command>` Element, as a two-element list of strings.
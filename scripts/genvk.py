@@ -5,18 +5,31 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import argparse
+import concurrent.futures
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import multiprocessing
 import os
-import pdb
 import re
+import signal
+import socket
+import socketserver
 import sys
 import copy
 import time
+import traceback
 import xml.etree.ElementTree as etree
 
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
-from cgenerator import CGeneratorOptions, COutputGenerator
+import phaseprofile
+import reflib
 from reflib import logDiag, logWarn, logErr, setLogFile
+from generator import writeFileIfChanged
+from genvkclient import defaultSocketPath, isPrivateDirectory
 from reg import Registry
 from apiconventions import APIConventions
 
@@ -47,14 +60,49 @@ def makeREstring(strings, default=None, strings_are_regex=False):
     return default
 
 
+def lazyTarget(generator, optionsClass, **kwargs):
+    """Returns a function creating the [ generator function, generator
+    options ] pair for a target. Neither the generator module is imported
+    nor the options object created until the function is called.
+
+    - generator - 'module.name' of the output generator class
+    - optionsClass - 'module.name' of the generator options class
+    - kwargs - arguments of the generator options constructor"""
+
+    def createTarget():
+        (module, name) = generator.rsplit('.', 1)
+        createGenerator = getattr(importlib.import_module(module), name)
+        (module, name) = optionsClass.rsplit('.', 1)
+        options = getattr(importlib.import_module(module), name)(**kwargs)
+        return [ createGenerator, options ]
+
+    return createTarget
+
+
+class LazyTargets(dict):
+    """Dictionary of [ generator function, generator options ] indexed by
+    target name, whose values are created by the lazyTarget() function
+    registered for the target when first looked up."""
+
+    def __getitem__(self, target):
+        value = super().__getitem__(target)
+        if callable(value):
+            value = value()
+            self[target] = value
+        return value
+
+
 def makeGenOpts(args):
     """Returns a directory of [ generator function, generator options ] indexed
     by specified short names. The generator options incorporate the following
     parameters:
 
-    args is a parsed argument object; see below for the fields that are used."""
+    args is a parsed argument object; see below for the fields that are used.
+
+    The entries are created when first looked up, so only the generator
+    modules of targets actually generated are imported."""
     global genOpts
-    genOpts = {}
+    genOpts = LazyTargets()
 
     # Default class of extensions to include, or None
     defaultExtensions = args.defaultExtensions
@@ -148,284 +196,257 @@ def makeGenOpts(args):
 
     isCTS = args.isCTS
 
-    # Try to set up specification generators if the needed modules are available
-    try:
-        from docgenerator import DocGeneratorOptions, DocOutputGenerator
-        from jsgenerator import JSOutputGenerator
-        from pygenerator import PyOutputGenerator
-        from rubygenerator import RubyOutputGenerator
-        from validitygenerator import ValidityOutputGenerator
-        from hostsyncgenerator import HostSynchronizationOutputGenerator
-        from extensionmetadocgenerator import (ExtensionMetaDocGeneratorOptions,
-                                            ExtensionMetaDocOutputGenerator)
-        from interfacedocgenerator import InterfaceDocGenerator
-        from featurerequirementsgenerator import FeatureRequirementsDocGenerator
-        from spirvcapgenerator import SpirvCapabilityOutputGenerator
-        from formatsgenerator import FormatsOutputGenerator
-        from syncgenerator import SyncOutputGenerator
-
-        # API include files for spec and ref pages
-        # Overwrites include subdirectories in spec source tree
-        # The generated include files do not include the calling convention
-        # macros (apientry etc.), unlike the header files.
-        # Because the 1.0 core branch includes ref pages for extensions,
-        # all the extension interfaces need to be generated, even though
-        # none are used by the core spec itself.
-        genOpts['apiinc'] = [
-            DocOutputGenerator,
-            DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'timeMarker',
-                directory         = directory,
-                genpath           = genpath,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = None,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                prefixText        = prefixStrings + vkPrefixStrings,
-                apicall           = '',
-                apientry          = '',
-                apientryp         = '*',
-                alignFuncParam    = 48,
-                expandEnumerants  = False)
-            ]
-
-        # JavaScript, Python, and Ruby representations of API information, used
-        # by scripts that do not need to load the full XML.
-        genOpts['apimap.cjs'] = [
-            JSOutputGenerator,
-            DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'apimap.cjs',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = None,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                reparentEnums     = False)
-            ]
-
-        genOpts['apimap.py'] = [
-            PyOutputGenerator,
-            DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'apimap.py',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = None,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                reparentEnums     = False)
-            ]
-
-        genOpts['apimap.rb'] = [
-            RubyOutputGenerator,
-            DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'apimap.rb',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = None,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                reparentEnums     = False)
-            ]
-
-        # API validity files for spec
-        #
-        # requireCommandAliases is set to True because we need validity files
-        # for the command something is promoted to even when the promoted-to
-        # feature is not included. This avoids wordy includes of validity files.
-        genOpts['validinc'] = [
-            ValidityOutputGenerator,
-            DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'timeMarker',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = None,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                requireCommandAliases = True,
-                )
-            ]
-
-        # API host sync table files for spec
-        genOpts['hostsyncinc'] = [
-            HostSynchronizationOutputGenerator,
-            DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'timeMarker',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = None,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                reparentEnums     = False)
-            ]
-
-        # Extension metainformation for spec extension appendices
-        # Includes all extensions by default, but only so that the generated
-        # 'promoted_extensions_*' files refer to all extensions that were
-        # promoted to a core version.
-        genOpts['extinc'] = [
-            ExtensionMetaDocOutputGenerator,
-            ExtensionMetaDocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'timeMarker',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = None,
-                defaultExtensions = defaultExtensions,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = None,
-                emitExtensions    = emitExtensionsPat)
-            ]
-
-        # Version and extension interface docs for version/extension appendices
-        # Includes all extensions by default.
-        genOpts['interfaceinc'] = [
-            InterfaceDocGenerator,
-            DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'timeMarker',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = None,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                reparentEnums     = False)
-            ]
-
-        # Feature requirements for versions/extensions
-        # Includes all extensions by default.
-        genOpts['requirementsinc'] = [
-              FeatureRequirementsDocGenerator,
-              DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'featurerequirements.adoc',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = addExtensionsPat,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat)
-            ]
-
-        genOpts['spirvcapinc'] = [
-            SpirvCapabilityOutputGenerator,
-            DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'timeMarker',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = None,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                emitSpirv         = emitSpirvPat,
-                reparentEnums     = False)
-            ]
-
-        # Used to generate various format chapter tables
-        genOpts['formatsinc'] = [
-            FormatsOutputGenerator,
-            DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'timeMarker',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = None,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                emitFormats       = emitFormatsPat,
-                reparentEnums     = False)
-            ]
-
-        # Used to generate various synchronization chapter tables
-        genOpts['syncinc'] = [
-            SyncOutputGenerator,
-            DocGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'timeMarker',
-                directory         = directory,
-                genpath           = None,
-                apiname           = defaultAPIName,
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = featuresPat,
-                emitversions      = featuresPat,
-                defaultExtensions = None,
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                reparentEnums     = False)
-            ]
-
-    except ImportError:
-        # Module dependencies are not available for spec generation
-        pass
+    # Specification generators. Their modules may need dependencies not
+    # required for the headers, and are only imported if a target using
+    # them is selected.
+
+    # API include files for spec and ref pages
+    # Overwrites include subdirectories in spec source tree
+    # The generated include files do not include the calling convention
+    # macros (apientry etc.), unlike the header files.
+    # Because the 1.0 core branch includes ref pages for extensions,
+    # all the extension interfaces need to be generated, even though
+    # none are used by the core spec itself.
+    genOpts['apiinc'] = lazyTarget(
+        'docgenerator.DocOutputGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'timeMarker',
+        directory         = directory,
+        genpath           = genpath,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = None,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        apicall           = '',
+        apientry          = '',
+        apientryp         = '*',
+        alignFuncParam    = 48,
+        expandEnumerants  = False)
+
+    # JavaScript, Python, and Ruby representations of API information, used
+    # by scripts that do not need to load the full XML.
+    genOpts['apimap.cjs'] = lazyTarget(
+        'jsgenerator.JSOutputGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'apimap.cjs',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = None,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        reparentEnums     = False)
+
+    genOpts['apimap.py'] = lazyTarget(
+        'pygenerator.PyOutputGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'apimap.py',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = None,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        reparentEnums     = False)
+
+    genOpts['apimap.rb'] = lazyTarget(
+        'rubygenerator.RubyOutputGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'apimap.rb',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = None,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        reparentEnums     = False)
+
+    # API validity files for spec
+    #
+    # requireCommandAliases is set to True because we need validity files
+    # for the command something is promoted to even when the promoted-to
+    # feature is not included. This avoids wordy includes of validity files.
+    genOpts['validinc'] = lazyTarget(
+        'validitygenerator.ValidityOutputGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'timeMarker',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = None,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        requireCommandAliases = True,
+        )
+
+    # API host sync table files for spec
+    genOpts['hostsyncinc'] = lazyTarget(
+        'hostsyncgenerator.HostSynchronizationOutputGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'timeMarker',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = None,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        reparentEnums     = False)
+
+    # Extension metainformation for spec extension appendices
+    # Includes all extensions by default, but only so that the generated
+    # 'promoted_extensions_*' files refer to all extensions that were
+    # promoted to a core version.
+    genOpts['extinc'] = lazyTarget(
+        'extensionmetadocgenerator.ExtensionMetaDocOutputGenerator',
+        'extensionmetadocgenerator.ExtensionMetaDocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'timeMarker',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = None,
+        defaultExtensions = defaultExtensions,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = None,
+        emitExtensions    = emitExtensionsPat)
+
+    # Version and extension interface docs for version/extension appendices
+    # Includes all extensions by default.
+    genOpts['interfaceinc'] = lazyTarget(
+        'interfacedocgenerator.InterfaceDocGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'timeMarker',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = None,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        reparentEnums     = False)
+
+    # Feature requirements for versions/extensions
+    # Includes all extensions by default.
+    genOpts['requirementsinc'] = lazyTarget(
+        'featurerequirementsgenerator.FeatureRequirementsDocGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'featurerequirements.adoc',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = addExtensionsPat,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat)
+
+    genOpts['spirvcapinc'] = lazyTarget(
+        'spirvcapgenerator.SpirvCapabilityOutputGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'timeMarker',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = None,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        emitSpirv         = emitSpirvPat,
+        reparentEnums     = False)
+
+    # Used to generate various format chapter tables
+    genOpts['formatsinc'] = lazyTarget(
+        'formatsgenerator.FormatsOutputGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'timeMarker',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = None,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        emitFormats       = emitFormatsPat,
+        reparentEnums     = False)
+
+    # Used to generate various synchronization chapter tables
+    genOpts['syncinc'] = lazyTarget(
+        'syncgenerator.SyncOutputGenerator',
+        'docgenerator.DocGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'timeMarker',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = None,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        reparentEnums     = False)
+
 
     # Platform extensions, in their own header files
     # Each element of the platforms[] array defines information for
@@ -514,7 +535,9 @@ def makeGenOpts(args):
         emitPlatformExtensionsRE = makeREstring(
             platform[1], strings_are_regex=True)
 
-        opts = CGeneratorOptions(
+        genOpts[headername] = lazyTarget(
+            'cgenerator.COutputGenerator',
+            'cgenerator.CGeneratorOptions',
             conventions       = conventions,
             filename          = headername,
             directory         = directory,
@@ -544,8 +567,6 @@ def makeGenOpts(args):
             misracstyle       = misracstyle,
             misracppstyle     = misracppstyle)
 
-        genOpts[headername] = [ COutputGenerator, opts ]
-
     # Header for core API + extensions.
     # To generate just the core API,
     # change to 'defaultExtensions = None' below.
@@ -557,109 +578,191 @@ def makeGenOpts(args):
     removeExtensionsPat = makeREstring(
         allPlatformExtensions + removeExtensions, None, strings_are_regex=True)
 
-    genOpts['vulkan_core.h'] = [
-          COutputGenerator,
-          CGeneratorOptions(
-            conventions       = conventions,
-            filename          = 'vulkan_core.h',
-            directory         = directory,
-            genpath           = None,
-            apiname           = defaultAPIName,
-            mergeApiNames     = mergeApiNames,
-            mergeInternalApis = mergeInternalApis,
-            profile           = None,
-            versions          = featuresPat,
-            emitversions      = featuresPat,
-            defaultExtensions = defaultExtensions,
-            addExtensions     = addExtensionsPat,
-            removeExtensions  = removeExtensionsPat,
-            emitExtensions    = emitExtensionsPat,
-            prefixText        = prefixStrings + vkPrefixStrings,
-            genFuncPointers   = True,
-            protectFile       = protectFile,
-            protectFeature    = False,
-            protectProto      = '#ifndef',
-            protectProtoStr   = 'VK_NO_PROTOTYPES',
-            protectExportName    = 'vulkan',
-            protectExportProtoStr = 'VK_ONLY_EXPORTED_PROTOTYPES',
-            apicall           = 'VKAPI_ATTR ',
-            apientry          = 'VKAPI_CALL ',
-            apientryp         = 'VKAPI_PTR *',
-            alignFuncParam    = 48,
-            misracstyle       = misracstyle,
-            misracppstyle     = misracppstyle)
-        ]
-
-    genOpts['vulkan_base_core.h'] = [
-          COutputGenerator,
-          CGeneratorOptions(
-            conventions       = conventions,
-            filename          = 'vulkan_base_core.h',
-            directory         = directory,
-            genpath           = None,
-            apiname           = defaultAPIName,
-            mergeApiNames     = mergeApiNames,
-            mergeInternalApis = mergeInternalApis,
-            profile           = None,
-            versions          = featuresPat,
-            emitversions      = featuresPat,
-            defaultExtensions = defaultExtensions,
-            addExtensions     = addExtensionsPat,
-            removeExtensions  = removeExtensionsPat,
-            emitExtensions    = emitExtensionsPat,
-            prefixText        = prefixStrings + vkPrefixStrings,
-            genFuncPointers   = True,
-            protectFile       = protectFile,
-            protectFeature    = False,
-            protectProto      = '#ifndef',
-            protectProtoStr   = 'VK_NO_PROTOTYPES',
-            apicall           = 'VKAPI_ATTR ',
-            apientry          = 'VKAPI_CALL ',
-            apientryp         = 'VKAPI_PTR *',
-            alignFuncParam    = 48,
-            misracstyle       = misracstyle,
-            misracppstyle     = misracppstyle)
-        ]
+    genOpts['vulkan_core.h'] = lazyTarget(
+        'cgenerator.COutputGenerator',
+        'cgenerator.CGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'vulkan_core.h',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeApiNames     = mergeApiNames,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = defaultExtensions,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        protectExportName    = 'vulkan',
+        protectExportProtoStr = 'VK_ONLY_EXPORTED_PROTOTYPES',
+        apicall           = 'VKAPI_ATTR ',
+        apientry          = 'VKAPI_CALL ',
+        apientryp         = 'VKAPI_PTR *',
+        alignFuncParam    = 48,
+        misracstyle       = misracstyle,
+        misracppstyle     = misracppstyle)
+
+    genOpts['vulkan_base_core.h'] = lazyTarget(
+        'cgenerator.COutputGenerator',
+        'cgenerator.CGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'vulkan_base_core.h',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeApiNames     = mergeApiNames,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = defaultExtensions,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        apicall           = 'VKAPI_ATTR ',
+        apientry          = 'VKAPI_CALL ',
+        apientryp         = 'VKAPI_PTR *',
+        alignFuncParam    = 48,
+        misracstyle       = misracstyle,
+        misracppstyle     = misracppstyle)
 
     # Vulkan versions to include for SC header - SC *removes* features from 1.0/1.1/1.2
     scVersions = makeREstring(['VK_BASE_VERSION_1_0', 'VK_COMPUTE_VERSION_1_0', 'VK_GRAPHICS_VERSION_1_0', 'VK_VERSION_1_0', 'VK_BASE_VERSION_1_1', 'VK_COMPUTE_VERSION_1_1', 'VK_GRAPHICS_VERSION_1_1', 'VK_VERSION_1_1', 'VK_BASE_VERSION_1_2', 'VK_COMPUTE_VERSION_1_2', 'VK_GRAPHICS_VERSION_1_2', 'VK_VERSION_1_2', 'VKSC_VERSION_1_0'])
 
-    genOpts['vulkan_sc_core.h'] = [
-          COutputGenerator,
-          CGeneratorOptions(
+    genOpts['vulkan_sc_core.h'] = lazyTarget(
+        'cgenerator.COutputGenerator',
+        'cgenerator.CGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'vulkan_sc_core.h',
+        directory         = directory,
+        apiname           = 'vulkansc',
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = scVersions,
+        emitversions      = scVersions,
+        defaultExtensions = 'vulkansc',
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        protectExportName    = defaultAPIName,
+        protectExportProtoStr = 'VK_ONLY_EXPORTED_PROTOTYPES',
+        apicall           = 'VKAPI_ATTR ',
+        apientry          = 'VKAPI_CALL ',
+        apientryp         = 'VKAPI_PTR *',
+        alignFuncParam    = 48,
+        misracstyle       = misracstyle,
+        misracppstyle     = misracppstyle)
+
+    genOpts['vulkan_sc_core.hpp'] = lazyTarget(
+        'cgenerator.COutputGenerator',
+        'cgenerator.CGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'vulkan_sc_core.hpp',
+        directory         = directory,
+        apiname           = 'vulkansc',
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = scVersions,
+        emitversions      = scVersions,
+        defaultExtensions = 'vulkansc',
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        protectExportName    = defaultAPIName,
+        protectExportProtoStr = 'VK_ONLY_EXPORTED_PROTOTYPES',
+        apicall           = 'VKAPI_ATTR ',
+        apientry          = 'VKAPI_CALL ',
+        apientryp         = 'VKAPI_PTR *',
+        alignFuncParam    = 48,
+        misracstyle       = misracstyle,
+        misracppstyle     = misracppstyle)
+
+    # Vulkan SC JSON generators
+    genOpts['vk.json'] = lazyTarget(
+        'schema_generator.SchemaOutputGenerator',
+        'schema_generator.SchemaGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'vk.json',
+        directory         = directory,
+        apiname           = 'vulkansc',
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = scVersions,
+        emitversions      = scVersions,
+        defaultExtensions = 'vulkansc',
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        apicall           = 'VKAPI_ATTR ',
+        apientry          = 'VKAPI_CALL ',
+        apientryp         = 'VKAPI_PTR *',
+        alignFuncParam    = 48)
+
+    if vulkanLayer:
+        genOpts['vulkan_json_data.hpp'] = lazyTarget(
+            'json_generator.JSONOutputGenerator',
+            'json_generator.JSONGeneratorOptions',
             conventions       = conventions,
-            filename          = 'vulkan_sc_core.h',
+            filename          = 'vulkan_json_data.hpp',
             directory         = directory,
-            apiname           = 'vulkansc',
+            apiname           = 'vulkan',
             mergeInternalApis = mergeInternalApis,
             profile           = None,
-            versions          = scVersions,
-            emitversions      = scVersions,
-            defaultExtensions = 'vulkansc',
+            versions          = featuresPat,
+            emitversions      = featuresPat,
+            defaultExtensions = None,
             addExtensions     = addExtensionsPat,
-            removeExtensions  = removeExtensionsPat,
-            emitExtensions    = emitExtensionsPat,
+            removeExtensions  = None,
+            emitExtensions    = None,
+            vulkanLayer       = vulkanLayer,
             prefixText        = prefixStrings + vkPrefixStrings,
             genFuncPointers   = True,
             protectFile       = protectFile,
             protectFeature    = False,
             protectProto      = '#ifndef',
             protectProtoStr   = 'VK_NO_PROTOTYPES',
-            protectExportName    = defaultAPIName,
-            protectExportProtoStr = 'VK_ONLY_EXPORTED_PROTOTYPES',
             apicall           = 'VKAPI_ATTR ',
             apientry          = 'VKAPI_CALL ',
             apientryp         = 'VKAPI_PTR *',
-            alignFuncParam    = 48,
-            misracstyle       = misracstyle,
-            misracppstyle     = misracppstyle)
-        ]
-
-    genOpts['vulkan_sc_core.hpp'] = [
-          COutputGenerator,
-          CGeneratorOptions(
+            alignFuncParam    = 48)
+    else:
+        genOpts['vulkan_json_data.hpp'] = lazyTarget(
+            'json_generator.JSONOutputGenerator',
+            'json_generator.JSONGeneratorOptions',
             conventions       = conventions,
-            filename          = 'vulkan_sc_core.hpp',
+            filename          = 'vulkan_json_data.hpp',
             directory         = directory,
             apiname           = 'vulkansc',
             mergeInternalApis = mergeInternalApis,
@@ -670,272 +773,168 @@ def makeGenOpts(args):
             addExtensions     = addExtensionsPat,
             removeExtensions  = removeExtensionsPat,
             emitExtensions    = emitExtensionsPat,
+            vulkanLayer       = vulkanLayer,
             prefixText        = prefixStrings + vkPrefixStrings,
             genFuncPointers   = True,
             protectFile       = protectFile,
             protectFeature    = False,
             protectProto      = '#ifndef',
             protectProtoStr   = 'VK_NO_PROTOTYPES',
-            protectExportName    = defaultAPIName,
-            protectExportProtoStr = 'VK_ONLY_EXPORTED_PROTOTYPES',
             apicall           = 'VKAPI_ATTR ',
             apientry          = 'VKAPI_CALL ',
             apientryp         = 'VKAPI_PTR *',
-            alignFuncParam    = 48,
-            misracstyle       = misracstyle,
-            misracppstyle     = misracppstyle)
-        ]
-
-    # Try to set up Vulkan SC JSON generators if the needed modules are available
-    try:
-        from json_parser import JSONParserGenerator, JSONParserOptions
-        from schema_generator import SchemaGeneratorOptions, SchemaOutputGenerator
-        from json_generator import JSONGeneratorOptions, JSONOutputGenerator
-        from json_h_generator import JSONHeaderOutputGenerator, JSONHeaderGeneratorOptions
-        from json_c_generator import JSONCOutputGenerator, JSONCGeneratorOptions
-
-        genOpts['vk.json'] = [
-            SchemaOutputGenerator,
-            SchemaGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'vk.json',
-                directory         = directory,
-                apiname           = 'vulkansc',
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = scVersions,
-                emitversions      = scVersions,
-                defaultExtensions = 'vulkansc',
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                prefixText        = prefixStrings + vkPrefixStrings,
-                genFuncPointers   = True,
-                protectFile       = protectFile,
-                protectFeature    = False,
-                protectProto      = '#ifndef',
-                protectProtoStr   = 'VK_NO_PROTOTYPES',
-                apicall           = 'VKAPI_ATTR ',
-                apientry          = 'VKAPI_CALL ',
-                apientryp         = 'VKAPI_PTR *',
-                alignFuncParam    = 48)
-            ]
-
-        if vulkanLayer:
-            genOpts['vulkan_json_data.hpp'] = [
-                JSONOutputGenerator,
-                JSONGeneratorOptions(
-                    conventions       = conventions,
-                    filename          = 'vulkan_json_data.hpp',
-                    directory         = directory,
-                    apiname           = 'vulkan',
-                    mergeInternalApis = mergeInternalApis,
-                    profile           = None,
-                    versions          = featuresPat,
-                    emitversions      = featuresPat,
-                    defaultExtensions = None,
-                    addExtensions     = addExtensionsPat,
-                    removeExtensions  = None,
-                    emitExtensions    = None,
-                    vulkanLayer       = vulkanLayer,
-                    prefixText        = prefixStrings + vkPrefixStrings,
-                    genFuncPointers   = True,
-                    protectFile       = protectFile,
-                    protectFeature    = False,
-                    protectProto      = '#ifndef',
-                    protectProtoStr   = 'VK_NO_PROTOTYPES',
-                    apicall           = 'VKAPI_ATTR ',
-                    apientry          = 'VKAPI_CALL ',
-                    apientryp         = 'VKAPI_PTR *',
-                    alignFuncParam    = 48)
-                ]
-        else:
-            genOpts['vulkan_json_data.hpp'] = [
-            JSONOutputGenerator,
-            JSONGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'vulkan_json_data.hpp',
-                directory         = directory,
-                apiname           = 'vulkansc',
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = scVersions,
-                emitversions      = scVersions,
-                defaultExtensions = 'vulkansc',
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = removeExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                vulkanLayer       = vulkanLayer,
-                prefixText        = prefixStrings + vkPrefixStrings,
-                genFuncPointers   = True,
-                protectFile       = protectFile,
-                protectFeature    = False,
-                protectProto      = '#ifndef',
-                protectProtoStr   = 'VK_NO_PROTOTYPES',
-                apicall           = 'VKAPI_ATTR ',
-                apientry          = 'VKAPI_CALL ',
-                apientryp         = 'VKAPI_PTR *',
-                isCTS             = isCTS,
-                alignFuncParam    = 48)
-            ]
-
-        # keep any relevant platform extensions for the following generators
-        # (needed for e.g. the vulkan_sci extensions)
-        explicitRemoveExtensionsPat = makeREstring(
-            removeExtensions, None, strings_are_regex=True)
-
-        # Raw C header file generator.
-        genOpts['vulkan_json_gen.h'] = [
-            JSONHeaderOutputGenerator,
-            JSONHeaderGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'vulkan_json_gen.h',
-                directory         = directory,
-                apiname           = 'vulkansc',
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = scVersions,
-                emitversions      = scVersions,
-                defaultExtensions = 'vulkansc',
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = explicitRemoveExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                prefixText        = prefixStrings + vkPrefixStrings,
-                genFuncPointers   = True,
-                protectFile       = protectFile,
-                protectFeature    = False,
-                protectProto      = '#ifndef',
-                protectProtoStr   = 'VK_NO_PROTOTYPES',
-                apicall           = 'VKAPI_ATTR ',
-                apientry          = 'VKAPI_CALL ',
-                apientryp         = 'VKAPI_PTR *',
-                alignFuncParam    = 48)
-            ]
-
-        # Raw C source file generator.
-        genOpts['vulkan_json_gen.c'] = [
-            JSONCOutputGenerator,
-            JSONCGeneratorOptions(
-                conventions       = conventions,
-                filename          = 'vulkan_json_gen.c',
-                directory         = directory,
-                apiname           = 'vulkansc',
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = scVersions,
-                emitversions      = scVersions,
-                defaultExtensions = 'vulkansc',
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = explicitRemoveExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                prefixText        = prefixStrings + vkPrefixStrings,
-                genFuncPointers   = True,
-                protectFile       = protectFile,
-                protectFeature    = False,
-                protectProto      = '#ifndef',
-                protectProtoStr   = 'VK_NO_PROTOTYPES',
-                apicall           = 'VKAPI_ATTR ',
-                apientry          = 'VKAPI_CALL ',
-                apientryp         = 'VKAPI_PTR *',
-                alignFuncParam    = 48)
-            ]
-
-        genOpts['vulkan_json_parser.hpp'] = [
-            JSONParserGenerator,
-            JSONParserOptions(
-                conventions       = conventions,
-                filename          = 'vulkan_json_parser.hpp',
-                directory         = directory,
-                apiname           = 'vulkansc',
-                mergeInternalApis = mergeInternalApis,
-                profile           = None,
-                versions          = scVersions,
-                emitversions      = scVersions,
-                defaultExtensions = 'vulkansc',
-                addExtensions     = addExtensionsPat,
-                removeExtensions  = explicitRemoveExtensionsPat,
-                emitExtensions    = emitExtensionsPat,
-                prefixText        = prefixStrings + vkPrefixStrings,
-                genFuncPointers   = True,
-                protectFile       = protectFile,
-                protectFeature    = False,
-                protectProto      = '#ifndef',
-                protectProtoStr   = 'VK_NO_PROTOTYPES',
-                apicall           = 'VKAPI_ATTR ',
-                apientry          = 'VKAPI_CALL ',
-                apientryp         = 'VKAPI_PTR *',
-                isCTS             = isCTS,
-                alignFuncParam    = 48)
-            ]
-    except ImportError:
-        # Module dependencies are not available for Vulkan SC JSON generation
-        pass
+            isCTS             = isCTS,
+            alignFuncParam    = 48)
+
+    # keep any relevant platform extensions for the following generators
+    # (needed for e.g. the vulkan_sci extensions)
+    explicitRemoveExtensionsPat = makeREstring(
+        removeExtensions, None, strings_are_regex=True)
+
+    # Raw C header file generator.
+    genOpts['vulkan_json_gen.h'] = lazyTarget(
+        'json_h_generator.JSONHeaderOutputGenerator',
+        'json_h_generator.JSONHeaderGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'vulkan_json_gen.h',
+        directory         = directory,
+        apiname           = 'vulkansc',
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = scVersions,
+        emitversions      = scVersions,
+        defaultExtensions = 'vulkansc',
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = explicitRemoveExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        apicall           = 'VKAPI_ATTR ',
+        apientry          = 'VKAPI_CALL ',
+        apientryp         = 'VKAPI_PTR *',
+        alignFuncParam    = 48)
+
+    # Raw C source file generator.
+    genOpts['vulkan_json_gen.c'] = lazyTarget(
+        'json_c_generator.JSONCOutputGenerator',
+        'json_c_generator.JSONCGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'vulkan_json_gen.c',
+        directory         = directory,
+        apiname           = 'vulkansc',
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = scVersions,
+        emitversions      = scVersions,
+        defaultExtensions = 'vulkansc',
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = explicitRemoveExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        apicall           = 'VKAPI_ATTR ',
+        apientry          = 'VKAPI_CALL ',
+        apientryp         = 'VKAPI_PTR *',
+        alignFuncParam    = 48)
+
+    genOpts['vulkan_json_parser.hpp'] = lazyTarget(
+        'json_parser.JSONParserGenerator',
+        'json_parser.JSONParserOptions',
+        conventions       = conventions,
+        filename          = 'vulkan_json_parser.hpp',
+        directory         = directory,
+        apiname           = 'vulkansc',
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = scVersions,
+        emitversions      = scVersions,
+        defaultExtensions = 'vulkansc',
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = explicitRemoveExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        apicall           = 'VKAPI_ATTR ',
+        apientry          = 'VKAPI_CALL ',
+        apientryp         = 'VKAPI_PTR *',
+        isCTS             = isCTS,
+        alignFuncParam    = 48)
 
     # Unused - vulkan10.h target.
     # It is possible to generate a header with just the Vulkan 1.0 +
     # extension interfaces defined, but since the promoted KHR extensions
     # are now defined in terms of the 1.1 interfaces, such a header is very
     # similar to vulkan_core.h.
-    genOpts['vulkan10.h'] = [
-          COutputGenerator,
-          CGeneratorOptions(
-            conventions       = conventions,
-            filename          = 'vulkan10.h',
-            directory         = directory,
-            genpath           = None,
-            apiname           = defaultAPIName,
-            mergeInternalApis = mergeInternalApis,
-            profile           = None,
-            versions          = 'VK_VERSION_1_0',
-            emitversions      = 'VK_VERSION_1_0',
-            defaultExtensions = None,
-            addExtensions     = None,
-            removeExtensions  = None,
-            emitExtensions    = None,
-            prefixText        = prefixStrings + vkPrefixStrings,
-            genFuncPointers   = True,
-            protectFile       = protectFile,
-            protectFeature    = False,
-            protectProto      = '#ifndef',
-            protectProtoStr   = 'VK_NO_PROTOTYPES',
-            apicall           = 'VKAPI_ATTR ',
-            apientry          = 'VKAPI_CALL ',
-            apientryp         = 'VKAPI_PTR *',
-            alignFuncParam    = 48,
-            misracstyle       = misracstyle,
-            misracppstyle     = misracppstyle)
-        ]
+    genOpts['vulkan10.h'] = lazyTarget(
+        'cgenerator.COutputGenerator',
+        'cgenerator.CGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'vulkan10.h',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = 'VK_VERSION_1_0',
+        emitversions      = 'VK_VERSION_1_0',
+        defaultExtensions = None,
+        addExtensions     = None,
+        removeExtensions  = None,
+        emitExtensions    = None,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        apicall           = 'VKAPI_ATTR ',
+        apientry          = 'VKAPI_CALL ',
+        apientryp         = 'VKAPI_PTR *',
+        alignFuncParam    = 48,
+        misracstyle       = misracstyle,
+        misracppstyle     = misracppstyle)
 
     # Video header target - combines all video extension dependencies into a
     # single header, at present.
-    genOpts['vk_video.h'] = [
-          COutputGenerator,
-          CGeneratorOptions(
-            conventions       = conventions,
-            filename          = 'vk_video.h',
-            directory         = directory,
-            genpath           = None,
-            apiname           = 'vulkan',
-            profile           = None,
-            versions          = None,
-            emitversions      = None,
-            defaultExtensions = defaultExtensions,
-            addExtensions     = addExtensionsPat,
-            removeExtensions  = removeExtensionsPat,
-            emitExtensions    = emitExtensionsPat,
-            prefixText        = prefixStrings + vkPrefixStrings,
-            genFuncPointers   = True,
-            protectFile       = protectFile,
-            protectFeature    = False,
-            protectProto      = '#ifndef',
-            protectProtoStr   = 'VK_NO_PROTOTYPES',
-            apicall           = '',
-            apientry          = '',
-            apientryp         = '',
-            alignFuncParam    = 48,
-            misracstyle       = misracstyle,
-            misracppstyle     = misracppstyle)
-    ]
+    genOpts['vk_video.h'] = lazyTarget(
+        'cgenerator.COutputGenerator',
+        'cgenerator.CGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'vk_video.h',
+        directory         = directory,
+        genpath           = None,
+        apiname           = 'vulkan',
+        profile           = None,
+        versions          = None,
+        emitversions      = None,
+        defaultExtensions = defaultExtensions,
+        addExtensions     = addExtensionsPat,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        apicall           = '',
+        apientry          = '',
+        apientryp         = '',
+        alignFuncParam    = 48,
+        misracstyle       = misracstyle,
+        misracppstyle     = misracppstyle)
 
     # Video extension 'Std' interfaces, each in its own header files
     # These are not Vulkan extensions, or a part of the Vulkan API at all.
@@ -968,7 +967,9 @@ def makeGenOpts(args):
         # Consider all of the codecs 'extensions', but only emit this one
         emitExtensionRE = makeREstring([codec])
 
-        opts = CGeneratorOptions(
+        genOpts[headername] = lazyTarget(
+            'cgenerator.COutputGenerator',
+            'cgenerator.CGeneratorOptions',
             conventions       = conventions,
             filename          = headername,
             directory         = directory,
@@ -988,74 +989,70 @@ def makeGenOpts(args):
             protectFile       = protectFile,
             protectFeature    = False,
             alignFuncParam    = 48,
-            )
-
-        genOpts[headername] = [ COutputGenerator, opts ]
+        )
 
     # Unused - vulkan11.h target.
     # It is possible to generate a header with just the Vulkan 1.0 +
     # extension interfaces defined, but since the promoted KHR extensions
     # are now defined in terms of the 1.1 interfaces, such a header is very
     # similar to vulkan_core.h.
-    genOpts['vulkan11.h'] = [
-          COutputGenerator,
-          CGeneratorOptions(
-            conventions       = conventions,
-            filename          = 'vulkan11.h',
-            directory         = directory,
-            genpath           = None,
-            apiname           = defaultAPIName,
-            mergeInternalApis = mergeInternalApis,
-            profile           = None,
-            versions          = '^VK_VERSION_1_[01]$',
-            emitversions      = '^VK_VERSION_1_[01]$',
-            defaultExtensions = None,
-            addExtensions     = None,
-            removeExtensions  = None,
-            emitExtensions    = None,
-            prefixText        = prefixStrings + vkPrefixStrings,
-            genFuncPointers   = True,
-            protectFile       = protectFile,
-            protectFeature    = False,
-            protectProto      = '#ifndef',
-            protectProtoStr   = 'VK_NO_PROTOTYPES',
-            apicall           = 'VKAPI_ATTR ',
-            apientry          = 'VKAPI_CALL ',
-            apientryp         = 'VKAPI_PTR *',
-            alignFuncParam    = 48,
-            misracstyle       = misracstyle,
-            misracppstyle     = misracppstyle)
-        ]
-
-    genOpts['alias.h'] = [
-          COutputGenerator,
-          CGeneratorOptions(
-            conventions       = conventions,
-            filename          = 'alias.h',
-            directory         = directory,
-            genpath           = None,
-            apiname           = defaultAPIName,
-            profile           = None,
-            versions          = featuresPat,
-            emitversions      = featuresPat,
-            defaultExtensions = defaultExtensions,
-            addExtensions     = None,
-            removeExtensions  = removeExtensionsPat,
-            emitExtensions    = emitExtensionsPat,
-            prefixText        = None,
-            genFuncPointers   = False,
-            protectFile       = False,
-            protectFeature    = False,
-            protectProto      = '',
-            protectProtoStr   = '',
-            apicall           = '',
-            apientry          = '',
-            apientryp         = '',
-            alignFuncParam    = 36)
-        ]
-
-
-def genTarget(args):
+    genOpts['vulkan11.h'] = lazyTarget(
+        'cgenerator.COutputGenerator',
+        'cgenerator.CGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'vulkan11.h',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        mergeInternalApis = mergeInternalApis,
+        profile           = None,
+        versions          = '^VK_VERSION_1_[01]$',
+        emitversions      = '^VK_VERSION_1_[01]$',
+        defaultExtensions = None,
+        addExtensions     = None,
+        removeExtensions  = None,
+        emitExtensions    = None,
+        prefixText        = prefixStrings + vkPrefixStrings,
+        genFuncPointers   = True,
+        protectFile       = protectFile,
+        protectFeature    = False,
+        protectProto      = '#ifndef',
+        protectProtoStr   = 'VK_NO_PROTOTYPES',
+        apicall           = 'VKAPI_ATTR ',
+        apientry          = 'VKAPI_CALL ',
+        apientryp         = 'VKAPI_PTR *',
+        alignFuncParam    = 48,
+        misracstyle       = misracstyle,
+        misracppstyle     = misracppstyle)
+
+    genOpts['alias.h'] = lazyTarget(
+        'cgenerator.COutputGenerator',
+        'cgenerator.CGeneratorOptions',
+        conventions       = conventions,
+        filename          = 'alias.h',
+        directory         = directory,
+        genpath           = None,
+        apiname           = defaultAPIName,
+        profile           = None,
+        versions          = featuresPat,
+        emitversions      = featuresPat,
+        defaultExtensions = defaultExtensions,
+        addExtensions     = None,
+        removeExtensions  = removeExtensionsPat,
+        emitExtensions    = emitExtensionsPat,
+        prefixText        = None,
+        genFuncPointers   = False,
+        protectFile       = False,
+        protectFeature    = False,
+        protectProto      = '',
+        protectProtoStr   = '',
+        apicall           = '',
+        apientry          = '',
+        apientryp         = '',
+        alignFuncParam    = 36)
+
+
+def genTarget(args, errFile=None, diagFile=None):
     """Create an API generator and corresponding generator options based on
     the requested target and command line options.
 
@@ -1066,7 +1063,11 @@ def genTarget(args):
     - target - target to generate
     - directory - directory to generate it in
     - protect - True if re-inclusion wrappers should be created
-    - extensions - list of additional extensions to include in generated interfaces"""
+    - extensions - list of additional extensions to include in generated interfaces
+
+    The errFile parameter is the file errors and warnings are written to,
+    by default sys.stderr, and diagFile is the file diagnostics are written
+    to, or None."""
 
     # Create generator options with parameters specified on command line
     makeGenOpts(args)
@@ -1087,20 +1088,407 @@ def genTarget(args):
         logDiag('* options.emitSpirv         =', options.emitSpirv)
         logDiag('* options.emitFormats       =', options.emitFormats)
 
-        gen = createGenerator(errFile=errWarn,
-                              warnFile=errWarn,
-                              diagFile=diag)
+        gen = createGenerator(errFile=errFile or sys.stderr,
+                              warnFile=errFile or sys.stderr,
+                              diagFile=diagFile)
         return (gen, options)
     else:
         logErr('No generator options for unknown target:', args.target)
         return None
 
 
+# Targets generated by -all-doc-targets, with the subdirectories of the -o
+# directory they are generated in, following the layout of the Makefile.
+docTargets = [
+    ('apimap.cjs', '.'),
+    ('apimap.py', '.'),
+    ('apimap.rb', '.'),
+    ('apiinc', 'api'),
+    ('validinc', 'validity'),
+    ('hostsyncinc', 'hostsynctable'),
+    ('extinc', 'meta'),
+    ('interfaceinc', 'interfaces'),
+    ('requirementsinc', '.'),
+    ('spirvcapinc', 'spirvcap'),
+    ('formatsinc', 'formats'),
+    ('syncinc', 'sync'),
+]
+
+# Targets which import the output of another target from the -genpath
+# directory, so must be generated after it
+targetDependencies = {
+    'apiinc': 'apimap.py',
+}
+
+
+def batchTargets(args):
+    """Return a list of (target, directory) tuples for the targets to
+    generate in batch mode, in the order they were specified.
+
+    The args parameter is a parsed argument object containing the following
+    fields that are used:
+
+    - target - a single target to generate, or None
+    - targets - list of comma-separated target lists. Each target may be
+      followed by '=directory' to generate it in that directory.
+    - allDocTargets - True if all targets used to build the specification
+      should be generated
+    - directory - directory to generate targets in, by default"""
+    batch = []
+    if args.target:
+        batch.append((args.target, args.directory))
+    for arg in args.targets:
+        for target in arg.split(','):
+            if target:
+                (target, _, directory) = target.partition('=')
+                batch.append((target, directory or args.directory))
+    if args.allDocTargets:
+        batch.extend((target, os.path.normpath(os.path.join(args.directory, subdirectory)))
+                     for (target, subdirectory) in docTargets)
+    return batch
+
+
+# List of jobs generating the targets of genBatch(), each an (args, errFile,
+# diagFile, targets) tuple of the genBatch() parameters and a list of
+# (target, registry, generator function, generator options) tuples for
+# targets generated together. Forked worker processes inherit it.
+batchJobs = []
+
+
+def makeEscape(path):
+    """Escape a path for use in a makefile rule."""
+    return path.replace('$', '$$').replace('#', '\\#').replace(' ', '\\ ')
+
+
+def writeDependencies(args, inputFiles, outputFiles):
+    """Write the -depfile and -manifest files, if requested.
+
+    The depfile is a makefile rule making every output file depend on every
+    input file. The manifest is a JSON object with 'inputs' and 'outputs'
+    objects, mapping paths to SHA-256 hex digests of the file contents.
+
+    - args - parsed argument object; the registry, depfile and manifest
+      fields are used
+    - inputFiles - list of input files read by generators, in addition to
+      the registry
+    - outputFiles - dictionary of SHA-256 hex digests of output files,
+      indexed by path"""
+
+    if not args.depfile and not args.manifest:
+        return
+
+    inputs = {}
+    for path in [args.registry] + inputFiles:
+        path = os.path.normpath(path)
+        if path not in inputs:
+            with open(path, 'rb') as fp:
+                inputs[path] = hashlib.sha256(fp.read()).hexdigest()
+    outputs = {os.path.normpath(path): digest for (path, digest) in sorted(outputFiles.items())}
+
+    if args.depfile:
+        rule = ' \\\n  '.join(makeEscape(path) for path in outputs)
+        rule += ': \\\n  ' + ' \\\n  '.join(makeEscape(path) for path in inputs)
+        writeFileIfChanged(args.depfile, f'{rule}\n', newline = '\n')
+    if args.manifest:
+        manifest = {'inputs': inputs, 'outputs': outputs}
+        writeFileIfChanged(args.manifest, json.dumps(manifest, indent = 2) + '\n', newline = '\n')
+
+
+def writeTrace(args):
+    """Write the phases timed for -trace to a Chrome trace file, and a
+    summary of them to stderr.
+
+    - args - parsed argument object; the trace field is used"""
+    if args.trace and phaseprofile.profiler is not None:
+        phaseprofile.profiler.writeTrace(args.trace)
+        sys.stderr.write(phaseprofile.profiler.summary())
+
+
+def genBatchJob(index):
+    """Generate the targets of a job in batchJobs using their registry,
+    which may have been used to generate other targets already.
+
+    This is the function run by worker processes in genBatch().
+    Returns an (inputFiles, outputFiles, events) tuple merging the input
+    and output files of the generators, with the phases timed for the job,
+    if phases are timed."""
+    (args, errFile, diagFile, job) = batchJobs[index]
+    reg = job[0][1]
+    targets = ' '.join(target for (target, *_) in job)
+    profiler = phaseprofile.profiler
+    firstEvent = len(profiler.events) if profiler else 0
+    outputs = []
+    for (target, _, createGenerator, options) in job:
+        gen = createGenerator(errFile=errFile or sys.stderr,
+                              warnFile=errFile or sys.stderr,
+                              diagFile=diagFile)
+        outputs.append((gen, options))
+
+    startTimer(args.time)
+    with phaseprofile.phase(targets):
+        if len(outputs) == 1:
+            reg.setGenerator(*outputs[0])
+            reg.apiGen()
+        else:
+            reg.apiGenMulti(outputs)
+    endTimer(args.time, f"* Time to generate {targets} =")
+
+    inputFiles = []
+    outputFiles = {}
+    for ((target, *_), (gen, options)) in zip(job, outputs):
+        if not args.quiet:
+            logDiag(f'* Files written for {target} =', gen.outputCounts['written'],
+                    'unchanged =', gen.outputCounts['unchanged'])
+        inputFiles += gen.inputFiles
+        outputFiles.update(gen.outputFiles)
+    return (inputFiles, outputFiles, profiler.events[firstEvent:] if profiler else [])
+
+
+def genBatch(args, batch, registries=None, errFile=None, diagFile=None):
+    """Generate several targets, loading the registry XML only once.
+
+    Targets for the same API share a Registry, which is reset before each
+    target is generated, and targets for other APIs use views of it.
+    With more than one job, worker processes are forked after the
+    registries are loaded, so they share them copy-on-write. The outputs
+    are the same as when each target is generated by a separate genvk.py
+    invocation.
+
+    C header targets sharing a registry, such as vulkan_core.h and the
+    platform headers, are generated together by Registry.apiGenMulti(),
+    which tags the features they require once for all of them.
+
+    The args parameter is a parsed argument object, as for genTarget().
+    The following additional fields are used:
+
+    - jobs - number of targets to generate concurrently
+
+    The batch parameter is a list of (target, directory) tuples, as
+    returned by batchTargets().
+
+    The registries parameter is a dictionary of the registries already
+    loaded, which is updated with those loaded for the batch. It is keyed
+    by the registry path and the options affecting parsing. If None, the
+    registries are only kept for the batch.
+
+    The errFile and diagFile parameters are the files messages of the
+    generators are written to, as for genTarget()."""
+    from cgenerator import CGeneratorOptions
+
+    global batchJobs
+    targetJobs = []
+    headerJobs = {}
+
+    if registries is None:
+        registries = {}
+    path = os.path.abspath(args.registry)
+    for (target, directory) in batch:
+        os.makedirs(directory, exist_ok = True)
+        makeGenOpts(argparse.Namespace(**dict(vars(args), directory = directory)))
+        if target not in genOpts:
+            logErr('No generator options for unknown target:', target)
+        (createGenerator, options) = genOpts[target]
+
+        # Options affecting parsing select the registry
+        key = (path, options.apiname, options.mergeApiNames, options.mergeInternalApis)
+        if key not in registries:
+            sources = [reg for (other, reg) in registries.items() if other[0] == path]
+            if sources:
+                reg = sources[0].apiView(options)
+            else:
+                reg = Registry(None, options)
+                startTimer(args.time)
+                reg.loadFile(args.registry, cacheDir = args.cachedir)
+                endTimer(args.time, '* Time to load registry =')
+            registries[key] = reg
+
+        job = (target, registries[key], createGenerator, options)
+        if isinstance(options, CGeneratorOptions):
+            # Headers generated together must select features alike
+            headerKey = (key, options.profile, options.requireDepends, options.requireCommandAliases)
+            if headerKey in headerJobs:
+                headerJobs[headerKey].append(job)
+                continue
+            headerJobs[headerKey] = [job]
+            targetJobs.append(headerJobs[headerKey])
+        else:
+            targetJobs.append([job])
+    batchJobs = [(args, errFile, diagFile, job) for job in targetJobs]
+
+    if args.jobs <= 1 or len(batchJobs) <= 1:
+        results = [genBatchJob(index) for index in range(len(batchJobs))]
+    elif 'fork' not in multiprocessing.get_all_start_methods():
+        logWarn('Cannot fork worker processes, generating targets sequentially')
+        results = [genBatchJob(index) for index in range(len(batchJobs))]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = args.jobs,
+                mp_context = multiprocessing.get_context('fork')) as executor:
+            # Futures of the jobs, indexed by the targets they generate
+            futures = {}
+            deferred = []
+            for (index, job) in enumerate(targetJobs):
+                if any(targetDependencies.get(target) in futures for (target, *_) in job):
+                    deferred.append(index)
+                else:
+                    future = executor.submit(genBatchJob, index)
+                    futures.update((target, future) for (target, *_) in job)
+            for index in deferred:
+                for (target, *_) in targetJobs[index]:
+                    if target in targetDependencies:
+                        futures[targetDependencies[target]].result()
+                future = executor.submit(genBatchJob, index)
+                futures.update((target, future) for (target, *_) in targetJobs[index])
+            results = [futures[job[0][0]].result() for job in targetJobs]
+
+            # Add the phases timed in the worker processes
+            if phaseprofile.profiler:
+                for (_, _, events) in results:
+                    phaseprofile.profiler.events += events
+
+    inputFiles = []
+    outputFiles = {}
+    for (jobInputs, jobOutputs, _) in results:
+        inputFiles += jobInputs
+        outputFiles.update(jobOutputs)
+    writeDependencies(args, inputFiles, outputFiles)
+
+
+def refreshRegistries(args, registries, stamps, path):
+    """Reload the registries loaded from a registry XML file, if it has
+    changed since they were loaded. The file contents are only hashed
+    when its modification time or size have changed.
+
+    - args - parsed argument object; the time field is used
+    - registries - dictionary of registries, as for genBatch()
+    - stamps - dictionary of registry paths mapped to ((modification
+      time, size), content hash) tuples, updated by this function
+    - path - absolute path of the registry XML file"""
+    status = os.stat(path)
+    stamp = (status.st_mtime_ns, status.st_size)
+    previous = stamps.get(path)
+    if previous is not None and previous[0] == stamp:
+        return
+
+    with open(path, 'rb') as fp:
+        digest = hashlib.sha256(fp.read()).hexdigest()
+    if previous is not None and previous[1] != digest:
+        for (key, reg) in registries.items():
+            if key[0] == path:
+                startTimer(args.time)
+                updated = reg.reloadFile(path)
+                endTimer(args.time, f"* Time to {'update' if updated else 'reload'} registry =")
+    stamps[path] = (stamp, digest)
+
+
+def serveRequest(request, registries, stamps):
+    """Generate the targets for a genvkclient.py request.
+
+    - request - dictionary with the 'cwd' directory of the client and the
+      'args' list of genvk.py arguments
+    - registries, stamps - dictionaries kept between requests, as for
+      refreshRegistries()
+
+    Returns a (status, output) tuple of the exit status and the messages
+    written while generating the targets."""
+    output = io.StringIO()
+    status = 0
+    cwd = os.getcwd()
+    logFiles = (reflib.errFile, reflib.warnFile, reflib.diagFile)
+    reflib.errFile = reflib.warnFile = output
+    reflib.diagFile = None
+    errWarn = output
+    diag = None
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            os.chdir(request['cwd'])
+            args = parseArgs(request['args'])
+            errWarn = open(args.errfile, 'w', encoding='utf-8') if args.errfile else output
+            if args.diagfile:
+                diag = open(args.diagfile, 'w', encoding='utf-8')
+            if args.time:
+                setLogFile(setDiag = True, setWarn = True, filename = '-')
+
+            if args.trace:
+                phaseprofile.enable()
+            refreshRegistries(args, registries, stamps, os.path.abspath(args.registry))
+            genBatch(args, batchTargets(args), registries, errWarn, diag)
+            writeTrace(args)
+    except SystemExit as exception:
+        # Raised by argument parsing errors
+        if exception.code:
+            status = exception.code if isinstance(exception.code, int) else 1
+    except Exception:
+        output.write(traceback.format_exc())
+        status = 1
+    finally:
+        phaseprofile.disable()
+        os.chdir(cwd)
+        (reflib.errFile, reflib.warnFile, reflib.diagFile) = logFiles
+        for fp in (errWarn, diag):
+            if fp not in (None, output):
+                fp.close()
+    return (status, output.getvalue())
+
+
+class GenvkRequestHandler(socketserver.StreamRequestHandler):
+    """Handler for a genvkclient.py request, which is a line of JSON
+    answered by a line of JSON."""
+
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        (status, output) = serveRequest(request, self.server.registries, self.server.stamps)
+        self.wfile.write(json.dumps({'status': status, 'output': output}).encode() + b'\n')
+
+
+def serve(socketPath):
+    """Generate targets for genvkclient.py requests until interrupted,
+    keeping the parsed registries loaded between requests.
+
+    - socketPath - path of the UNIX socket to listen on"""
+    # Clients only connect to sockets in private directories
+    directory = os.path.dirname(os.path.abspath(socketPath))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not isPrivateDirectory(directory):
+        logErr('The directory of the genvk.py server socket,', directory,
+               'must be owned by the current user and not writable by others')
+
+    if os.path.exists(socketPath):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socketPath)
+            except OSError:
+                # Left behind by a server which did not exit cleanly
+                os.unlink(socketPath)
+            else:
+                logErr('A genvk.py server is already listening on', socketPath)
+
+    # The socket is created with no access for other users, rather than
+    # changing its mode after it is bound
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(socketPath, GenvkRequestHandler)
+    finally:
+        os.umask(umask)
+    with server:
+        server.registries = {}
+        server.stamps = {}
+        print('Serving genvk.py requests on', socketPath, file=sys.stderr)
+        # Remove the socket when terminated, as when interrupted
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socketPath)
+
+
 # -feature name
 # -extension name
 # For both, "name" may be a single name, or a space-separated list
 # of names, or a regular expression.
-if __name__ == '__main__':
+def makeArgParser():
+    """Return the command line argument parser for genvk.py."""
     parser = argparse.ArgumentParser()
 
     parser.add_argument('-apiname', action='store',
@@ -1147,15 +1535,35 @@ if __name__ == '__main__':
     parser.add_argument('-registry', action='store',
                         default='vk.xml',
                         help='Use specified registry file instead of vk.xml')
+    parser.add_argument('-cachedir', action='store',
+                        default=None,
+                        help='Cache parsed registries in the specified directory')
     parser.add_argument('-time', action='store_true',
                         help='Enable timing')
+    parser.add_argument('-trace', action='store',
+                        default=None,
+                        help='Write a Chrome trace JSON file of the time spent in registry and generator phases to the specified file, and a summary of them to stderr')
     parser.add_argument('-genpath', action='store', default='gen',
                         help='Path to generated files')
     parser.add_argument('-o', action='store', dest='directory',
                         default='.',
                         help='Create target and related files in specified directory')
+    parser.add_argument('-depfile', action='store',
+                        default=None,
+                        help='Write a makefile rule making the files generated depend on the files read to the specified file')
+    parser.add_argument('-manifest', action='store',
+                        default=None,
+                        help='Write a JSON manifest of the files read and generated, with their SHA-256 hashes, to the specified file')
     parser.add_argument('target', metavar='target', nargs='?',
                         help='Specify target')
+    parser.add_argument('-targets', action='append',
+                        default=[],
+                        help='Specify a comma-separated list of targets to generate from a single registry load. A target may be followed by =directory to generate it in that directory instead of the -o directory')
+    parser.add_argument('-all-doc-targets', dest='allDocTargets', action='store_true',
+                        help='Generate all targets used to build the specification, in subdirectories of the -o directory')
+    parser.add_argument('-j', dest='jobs', action='store', type=int,
+                        default=1,
+                        help='Number of targets to generate concurrently with -targets or -all-doc-targets')
     parser.add_argument('-quiet', action='store_true', default=True,
                         help='Suppress script output during normal execution.')
     parser.add_argument('-verbose', action='store_false', dest='quiet', default=True,
@@ -1171,12 +1579,31 @@ if __name__ == '__main__':
     parser.add_argument('-no-internal-api-merging', dest='mergeInternalApis', action='store_false',
                         default=True,
                         help='Disable merging of internal APIs into public APIs')
+    parser.add_argument('--serve', action='store', nargs='?',
+                        const=defaultSocketPath(), default=None, metavar='socket',
+                        help='Run as a server for genvkclient.py, listening on the specified UNIX socket, and keeping parsed registries between requests')
+    return parser
+
+
+def parseArgs(argv=None):
+    """Parse genvk.py command line arguments, returning the parsed argument
+    object.
 
-    args = parser.parse_args()
+    - argv - list of arguments. Defaults to the arguments of the script."""
+    args = makeArgParser().parse_args(argv)
 
     # This splits arguments which are space-separated lists
     args.feature = [name for arg in args.feature for name in arg.split()]
     args.extension = [name for arg in args.extension for name in arg.split()]
+    return args
+
+
+if __name__ == '__main__':
+    args = parseArgs()
+
+    if args.serve:
+        serve(args.serve)
+        sys.exit(0)
 
     # create error/warning & diagnostic files
     if args.errfile:
@@ -1193,22 +1620,44 @@ if __name__ == '__main__':
         # Log diagnostics and warnings
         setLogFile(setDiag = True, setWarn = True, filename = '-')
 
+    if args.trace:
+        phaseprofile.enable()
+
+    if args.targets or args.allDocTargets:
+        # Generate several targets from one registry load
+        genBatch(args, batchTargets(args), errFile = errWarn, diagFile = diag)
+        writeTrace(args)
+        sys.exit(0)
+
     # Create the API generator & generator options
-    (gen, options) = genTarget(args)
+    (gen, options) = genTarget(args, errWarn, diag)
+
+    # Processor time used so far covers interpreter startup, module imports,
+    # and creating the options for the target
+    if args.time:
+        logDiag('* Time to start up =', time.process_time())
 
     # Create the registry object with the specified generator and generator
     # options. The options are set before XML loading as they may affect it.
     reg = Registry(gen, options)
 
-    # Parse the specified registry XML into an ElementTree object
-    startTimer(args.time)
-    tree = etree.parse(args.registry)
-    endTimer(args.time, '* Time to make ElementTree =')
+    if args.cachedir:
+        # Load the parsed registry from the cache, or parse the registry
+        # XML and add it to the cache
+        startTimer(args.time)
+        reg.loadFile(args.registry, cacheDir = args.cachedir)
+        endTimer(args.time, '* Time to load registry =')
+    else:
+        # Parse the specified registry XML into an ElementTree object
+        startTimer(args.time)
+        with phaseprofile.phase('read XML'):
+            tree = etree.parse(args.registry)
+        endTimer(args.time, '* Time to make ElementTree =')
 
-    # Load the XML tree into the registry object
-    startTimer(args.time)
-    reg.loadElementTree(tree)
-    endTimer(args.time, '* Time to parse ElementTree =')
+        # Load the XML tree into the registry object
+        startTimer(args.time)
+        reg.loadElementTree(tree)
+        endTimer(args.time, '* Time to parse ElementTree =')
 
     if args.dump:
         logDiag('* Dumping registry to regdump.txt')
@@ -1216,11 +1665,18 @@ if __name__ == '__main__':
 
     # Finally, use the output generator to create the requested target
     if args.debug:
+        import pdb
         pdb.run('reg.apiGen()')
     else:
         startTimer(args.time)
-        reg.apiGen()
+        with phaseprofile.phase(args.target):
+            reg.apiGen()
         endTimer(args.time, f"* Time to generate {options.filename} =")
 
     if not args.quiet:
         logDiag('* Generated', options.filename)
+        logDiag('* Files written =', gen.outputCounts['written'],
+                'unchanged =', gen.outputCounts['unchanged'])
+
+    writeDependencies(args, gen.inputFiles, gen.outputFiles)
+    writeTrace(args)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+#
+# Copyright 2025 The Khronos Group Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Thin client for a genvk.py server started with 'genvk.py --serve'.
+
+Usage: genvkclient.py [-socket path] [genvk.py arguments]
+
+The arguments and the current directory are passed to the server, which
+generates the targets from the registries it keeps loaded, and the
+server's messages and exit status are passed back. If no server is
+listening on the socket, genvk.py is run directly with the same
+arguments, so the client can always be used in place of genvk.py.
+
+Another user able to create the socket could answer requests in place of
+the server, so the socket is only used in a directory owned by the
+current user, which other users cannot write to. By default this is
+$XDG_RUNTIME_DIR, or a per-user directory in the temporary directory.
+
+This script only imports standard library modules, so it starts quickly."""
+
+import getpass
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+
+
+def defaultSocketPath():
+    """Return the path of the socket used by a genvk.py server and its
+    clients when no path is specified."""
+    runtimeDir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtimeDir:
+        return os.path.join(runtimeDir, 'genvk.sock')
+    return os.path.join(tempfile.gettempdir(), f'genvk-{getpass.getuser()}', 'genvk.sock')
+
+
+def isPrivateDirectory(directory):
+    """Return True if a directory exists, is owned by the current user, and
+    cannot be written to by other users.
+
+    - directory - path of the directory"""
+    try:
+        st = os.stat(directory)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode) or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return False
+    # There is no owner to check on Windows
+    return not hasattr(os, 'getuid') or st.st_uid == os.getuid()
+
+
+def sendRequest(socketPath, argv, cwd):
+    """Ask a genvk.py server to generate targets.
+
+    - socketPath - path of the server socket
+    - argv - list of genvk.py command line arguments
+    - cwd - directory relative paths in argv are relative to
+
+    Returns a (status, output) tuple of the genvk.py exit status and its
+    messages, or None if no server is listening on socketPath, or if the
+    directory containing it is not private to the current user."""
+    if not isPrivateDirectory(os.path.dirname(os.path.abspath(socketPath))):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with sock:
+        try:
+            sock.connect(socketPath)
+        except OSError:
+            return None
+        sock.sendall(json.dumps({'cwd': cwd, 'args': argv}).encode() + b'\n')
+        sock.shutdown(socket.SHUT_WR)
+        data = b''.join(iter(lambda: sock.recv(65536), b''))
+    reply = json.loads(data)
+    return (reply['status'], reply['output'])
+
+
+if __name__ == '__main__':
+    argv = sys.argv[1:]
+    socketPath = defaultSocketPath()
+    if argv[:1] == ['-socket'] and len(argv) > 1:
+        socketPath = argv[1]
+        argv = argv[2:]
+
+    reply = sendRequest(socketPath, argv, os.getcwd())
+    if reply is None:
+        # No server is running, so generate the targets here
+        genvk = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'genvk.py')
+        os.execv(sys.executable, [sys.executable, genvk] + argv)
+
+    (status, output) = reply
+    sys.stderr.write(output)
+    sys.exit(status)
@@ -26,13 +26,17 @@ class HostSynchronizationOutputGenerator(OutputGenerator):
     endFile()"""
     # Generate Host Synchronized Parameters in a table at the top of the spec
 
-    threadsafety = {
-        'parameters': ValidityCollection(),
-        'members': ValidityCollection(),
-        'parameterlists': ValidityCollection(),
-        'memberlists': ValidityCollection(),
-        'implicit': ValidityCollection()
-    }
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Collections are per generator, so that a process can generate
+        # the target more than once
+        self.threadsafety = {
+            'parameters': ValidityCollection(),
+            'members': ValidityCollection(),
+            'parameterlists': ValidityCollection(),
+            'memberlists': ValidityCollection(),
+            'implicit': ValidityCollection()
+        }
 
     def makeParameterName(self, name):
         return f"pname:{name}"
@@ -52,7 +56,7 @@ class HostSynchronizationOutputGenerator(OutputGenerator):
         assert self.genOpts
         filename = Path(self.genOpts.directory) / basename
         self.logMsg('diag', '# Generating include file:', filename)
-        with open(filename, 'w', encoding='utf-8') as fp:
+        with self.openFile(filename) as fp:
             write(self.genOpts.conventions.warning_comment, file=fp)
 
             if contents:
@@ -645,9 +645,7 @@ class JSONCOutputGenerator(OutputGenerator):
 
                 #TODO: Some enums have no offset. How to handle those?
                 elif enum.get('extends') and enum.get("extnumber") and enum.get("offset"):
-                    extNumber = int(enum.get("extnumber"))
-                    offset = int(enum.get("offset"))
-                    enumVal = self.extBase + (extNumber - 1) * self.extBlockSize + offset
+                    enumVal = self.registry.getEnumValue(enum).numVal
                     body += f"    case {str(enumVal)}: return \"{enum.get('name')}\";\n"
 
         body += "   }\n"
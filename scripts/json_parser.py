@@ -891,6 +891,7 @@ class JSONParserGenerator(OutputGenerator):
             enumExtends = enum.get('extends')
             enumExtension = enum.get('extnumber')
             enumOffset = enum.get('offset')
+            valueElem = enum
 
             # Handle aliases by looking up their aliased type
             if enum.get('alias'):
@@ -898,6 +899,7 @@ class JSONParserGenerator(OutputGenerator):
                     if allEnums.get("name") == groupName:
                         for baseEnum in allEnums.findall('enum'):
                             if (enum.get('alias') == baseEnum.get('name')):
+                                valueElem = baseEnum
                                 enumBit = baseEnum.get('bitpos')
                                 enumValue = baseEnum.get('value')
                                 enumExtends = baseEnum.get('extends')
@@ -914,9 +916,7 @@ class JSONParserGenerator(OutputGenerator):
                     body += f"    std::make_pair(\"{enumName}\", 1UL << {enumBit}),\n"
 
             elif enumExtends and enumExtension and enumOffset:
-                extNumber = int(enumExtension)
-                offset = int(enumOffset)
-                enumVal = self.extBase + (extNumber - 1) * self.extBlockSize + offset
+                enumVal = self.registry.getEnumValue(valueElem).numVal
                 body += f"    std::make_pair(\"{enumName}\", {str(enumVal)}),\n"
 
         body += "};\n"
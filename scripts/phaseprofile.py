@@ -0,0 +1,199 @@
+#!/usr/bin/env python3 -i
+#
+# Copyright 2025 The Khronos Group Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Hierarchical timing of registry loading and generation phases.
+
+Phases are timed by the `phase()` context manager, the `timed()`
+decorator, and `lap()`, which times consecutive sections of a phase
+without nesting them in blocks. `instrument()` times methods of an
+object, such as the callbacks of an output generator. Phases nest, so
+each is recorded with the path of the phases enclosing it.
+
+Nothing is timed unless `enable()` has been called, and the disabled
+functions do as little as possible, so the instrumentation can stay in
+the registry and generator code.
+
+The phases recorded can be written as a Chrome trace event JSON file,
+which can be loaded by chrome://tracing or https://ui.perfetto.dev, and
+summarized as text, with the calls and total time of each phase."""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+profiler = None
+"PhaseProfiler recording phases, or None if they are not timed"
+
+_noPhase = contextlib.nullcontext()
+
+
+class PhaseProfiler:
+    """Records the start time and duration of nested phases."""
+
+    def __init__(self):
+        self.events = []
+        """list of (path, start, duration, pid, tid) tuples of completed
+        phases, where path is a tuple of the names of the enclosing phases
+        and the phase, and times are in nanoseconds"""
+
+        self.stack = []
+        """list of (name, start, isLap) tuples of the phases begun and not
+        yet ended, innermost last"""
+
+    def begin(self, name, isLap=False):
+        """Begin a phase nested in the current one.
+
+        - name - name of the phase
+        - isLap - True if the phase is ended by the next lap() or by the
+          end of the enclosing phase"""
+        self.stack.append((name, time.perf_counter_ns(), isLap))
+
+    def end(self):
+        """End the current phase, and any laps of it."""
+        while self.stack[-1][2]:
+            self.endPhase()
+        self.endPhase()
+
+    def endPhase(self):
+        """End the innermost phase or lap."""
+        (name, start, _) = self.stack[-1]
+        path = tuple(name for (name, _, _) in self.stack)
+        self.stack.pop()
+        self.events.append((path, start, time.perf_counter_ns() - start,
+                            os.getpid(), threading.get_ident()))
+
+    def lap(self, name):
+        """End the lap of the current phase begun by the last lap(), if any,
+        and begin another one.
+
+        - name - name of the lap"""
+        if self.stack and self.stack[-1][2]:
+            self.endPhase()
+        self.begin(name, isLap = True)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Context manager timing a phase.
+
+        - name - name of the phase"""
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def traceEvents(self):
+        """Return a list of Chrome trace complete events for the phases."""
+        events = []
+        for pid in sorted(set(event[3] for event in self.events)):
+            events.append({'name': 'process_name', 'ph': 'M', 'pid': pid,
+                           'args': {'name': f'genvk.py {pid}'}})
+        for (path, start, duration, pid, tid) in self.events:
+            events.append({'name': path[-1], 'cat': path[0], 'ph': 'X',
+                           'ts': start / 1000, 'dur': duration / 1000,
+                           'pid': pid, 'tid': tid})
+        return events
+
+    def writeTrace(self, filename):
+        """Write the phases to a Chrome trace event JSON file.
+
+        - filename - path of the file"""
+        with open(filename, 'w', encoding='utf-8') as fp:
+            json.dump({'traceEvents': self.traceEvents(), 'displayTimeUnit': 'ms'}, fp)
+
+    def summary(self):
+        """Return a text summary of the phases, with the number of calls,
+        total time, and time not spent in nested phases of each, indented
+        to show their nesting."""
+        totals = {}
+        firstStarts = {}
+        for (path, start, duration, _, _) in self.events:
+            (total, calls) = totals.get(path, (0, 0))
+            totals[path] = (total + duration, calls + 1)
+            firstStarts[path] = min(start, firstStarts.get(path, start))
+
+        # Phases are listed in the order they were first begun
+        children = {}
+        for path in sorted(totals, key = firstStarts.get):
+            children.setdefault(path[:-1], []).append(path)
+
+        lines = [f"{'Phase':<52} {'Calls':>8} {'Total (s)':>11} {'Self (s)':>11}"]
+
+        def addLines(parent):
+            for path in children.get(parent, []):
+                (total, calls) = totals[path]
+                nested = sum(totals[child][0] for child in children.get(path, []))
+                name = '  ' * (len(path) - 1) + path[-1]
+                lines.append(f'{name:<52} {calls:>8} {total / 1e9:>11.4f} {(total - nested) / 1e9:>11.4f}')
+                addLines(path)
+
+        addLines(())
+        return '\n'.join(lines) + '\n'
+
+
+def enable():
+    """Start timing phases, and return the PhaseProfiler recording them."""
+    global profiler
+    profiler = PhaseProfiler()
+    return profiler
+
+
+def disable():
+    """Stop timing phases."""
+    global profiler
+    profiler = None
+
+
+def phase(name):
+    """Return a context manager timing a phase, if phases are timed.
+
+    - name - name of the phase"""
+    if profiler is None:
+        return _noPhase
+    return profiler.phase(name)
+
+
+def lap(name):
+    """Time a section of the current phase until the next lap() or the end
+    of the phase, if phases are timed.
+
+    - name - name of the section"""
+    if profiler is not None:
+        profiler.lap(name)
+
+
+def timed(name):
+    """Return a decorator timing each call of a function as a phase, if
+    phases are timed.
+
+    - name - name of the phase"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if profiler is None:
+                return function(*args, **kwargs)
+            with profiler.phase(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrument(obj, names):
+    """Time each call of methods of an object as a phase, if phases are
+    timed. The object is unchanged if they are not.
+
+    - obj - object whose methods are timed
+    - names - names of the methods, which are timed as phases of the same
+      name"""
+    if profiler is None:
+        return
+    for name in names:
+        method = getattr(obj, name, None)
+        if method is not None:
+            setattr(obj, name, timed(name)(method))
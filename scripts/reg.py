@@ -12,8 +12,11 @@ import sys
 import xml.etree.ElementTree as etree
 from collections import defaultdict, deque, namedtuple
 
-from generator import GeneratorOptions, OutputGenerator, noneStr, write
+from generator import EXT_BASE, EXT_BLOCK_SIZE, GeneratorOptions, OutputGenerator, noneStr, write
 from apiconventions import APIConventions
+from regcache import RegistryCache
+import phaseprofile
+from spec_tools.util import getElemType
 
 def apiNameMatch(str, supported):
     """Return whether a required api name matches a pattern specified for an
@@ -166,7 +169,227 @@ def mergeAPIs(tree, fromApiNames, toApiName):
                                 variant.set('api', toApiName)
 
 
-def mergeInternalFeatures(tree, apiName):
+class FeatureDependencies:
+    """Dependency graph of the `<feature>` Elements for an API, built from
+    their 'depends' attributes.
+
+    The graph is built once per registry, and provides a topological order
+    of the features and the transitive closure of their dependencies, so
+    that dependency queries are dictionary lookups rather than searches."""
+
+    def __init__(self, tree, apiName):
+        """Constructor.
+
+        - tree - Element at the root of the hierarchy (typically <registry>)
+        - apiName - the API name whose features are included in the graph"""
+
+        self.names = []
+        "list of feature names, in document order"
+
+        self.internal = set()
+        "set of names of internal API features (apitype='internal')"
+
+        self.depends = {}
+        """dictionary of feature names mapped to the set of names in their
+        'depends' attribute"""
+
+        for feature in tree.findall('feature'):
+            # Only include features matching the target API
+            if apiName not in feature.get('api', '').split(','):
+                continue
+
+            name = feature.get('name')
+            self.names.append(name)
+            if feature.get('apitype', '') == 'internal':
+                self.internal.add(name)
+
+            # Dependencies can be like "VK_VERSION_1_0" or
+            # "VK_VERSION_1_0+VK_KHR_feature". Only the names matter here,
+            # so split on both + and ,
+            deps = set()
+            for dep in feature.get('depends', '').replace('+', ',').split(','):
+                dep = dep.strip()
+                if dep:
+                    deps.add(dep)
+            self.depends[name] = deps
+
+        self.closure = {}
+        """dictionary of feature names mapped to the set of all names they
+        depend on, directly or through other features in the graph"""
+
+        self.order = []
+        """list of feature names in topological order, so that each
+        feature follows the features it depends on. Features not ordered
+        by dependencies remain in document order."""
+
+        # Depth-first walk in document order, both for the topological
+        # order and for the closure. A dependency cycle (which should not
+        # happen) is broken at the feature first reached again.
+        visiting = set()
+        for name in self.names:
+            self._visit(name, visiting)
+
+        self.dependents = {}
+        """dictionary of names mapped to the list of features depending on
+        them, directly or transitively, in document order"""
+        for name in self.names:
+            for dep in self.closure[name]:
+                self.dependents.setdefault(dep, []).append(name)
+
+    def _visit(self, name, visiting):
+        """Compute the closure of a feature and add it to the order after
+        its dependencies. Intended for internal use only."""
+        if name in self.closure or name in visiting:
+            return
+        visiting.add(name)
+        closure = set(self.depends[name])
+        for dep in self.depends[name]:
+            if dep in self.depends:
+                self._visit(dep, visiting)
+                closure |= self.closure.get(dep, ())
+        visiting.discard(name)
+        self.closure[name] = closure
+        self.order.append(name)
+
+    def dependsOn(self, name, target):
+        """Return whether a feature depends on target, directly or
+        transitively.
+
+        - name - name of a feature in the graph
+        - target - feature or extension name"""
+        return target in self.closure.get(name, ())
+
+    def firstPublicDependent(self, target):
+        """Return the name of the first public feature, in document order,
+        depending on target, or None if there is none.
+
+        - target - feature or extension name"""
+        for name in self.dependents.get(target, ()):
+            if name not in self.internal:
+                return name
+        return None
+
+
+class RegistryReferences:
+    """Reverse reference indexes of a parsed registry, answering "what
+    refers to this name" questions with dictionary lookups.
+
+    The indexes are built in one pass over the Info dictionaries after
+    parsing, and describe the registry as parsed. They are not updated by
+    the API-specific pruning done in Registry.apiGen(), so callers
+    generating a subset of the API must filter the names returned."""
+
+    def __init__(self, typedict, cmddict, featuredicts):
+        """Constructor.
+
+        - typedict - dictionary of TypeInfo objects keyed by type name
+        - cmddict - dictionary of CmdInfo objects keyed by command name
+        - featuredicts - sequence of dictionaries of FeatureInfo objects
+          keyed by feature or extension name"""
+
+        structsUsingType = {}
+        commandsUsingType = {}
+        structsExtendedBy = {}
+        handleCommands = {}
+        featureRequires = {}
+        requiringFeatures = {}
+
+        def add(index, key, value):
+            values = index.setdefault(key, [])
+            if not values or values[-1] != value:
+                values.append(value)
+
+        for (name, typeinfo) in typedict.items():
+            if typeinfo.elem.get('category') not in ('struct', 'union'):
+                continue
+            for member in typeinfo.getMembers():
+                add(structsUsingType, getElemType(member), name)
+            for parent in typeinfo.structextends:
+                add(structsExtendedBy, parent, name)
+
+        for (name, cmdinfo) in cmddict.items():
+            params = cmdinfo.getParams()
+            for param in params:
+                add(commandsUsingType, getElemType(param), name)
+            if params:
+                firstType = getElemType(params[0])
+                if firstType in typedict and typedict[firstType].elem.get('category') == 'handle':
+                    add(handleCommands, firstType, name)
+
+        for featuredict in featuredicts:
+            for (name, featureinfo) in featuredict.items():
+                required = []
+                for require in featureinfo.elem.findall('require'):
+                    for elem in require:
+                        if elem.tag in ('type', 'enum', 'command'):
+                            required.append(elem.get('name'))
+                            add(requiringFeatures, elem.get('name'), name)
+                featureRequires[name] = tuple(required)
+
+        def freeze(index):
+            return {key: tuple(values) for (key, values) in index.items()}
+
+        self._structsUsingType = freeze(structsUsingType)
+        self._commandsUsingType = freeze(commandsUsingType)
+        self._structsExtendedBy = freeze(structsExtendedBy)
+        self._structsExtending = {name: typeinfo.structextends
+                                  for (name, typeinfo) in typedict.items()
+                                  if typeinfo.structextends}
+        self._handleCommands = freeze(handleCommands)
+        self._featureRequires = featureRequires
+        self._requiringFeatures = freeze(requiringFeatures)
+
+    def structsUsingType(self, typeName):
+        """Return a tuple of the structures and unions with a member of
+        the given type, in document order.
+
+        - typeName - type name"""
+        return self._structsUsingType.get(typeName, ())
+
+    def commandsUsingType(self, typeName):
+        """Return a tuple of the commands with a parameter of the given
+        type, in document order, including command aliases.
+
+        - typeName - type name"""
+        return self._commandsUsingType.get(typeName, ())
+
+    def structsExtending(self, structName):
+        """Return a tuple of the structures which the given structure may
+        extend, from its 'structextends' attribute.
+
+        - structName - structure name"""
+        return self._structsExtending.get(structName, ())
+
+    def structsExtendedBy(self, structName):
+        """Return a tuple of the structures which may extend the given
+        structure, in document order.
+
+        - structName - structure name"""
+        return self._structsExtendedBy.get(structName, ())
+
+    def handleCommands(self, handleName):
+        """Return a tuple of the commands whose first parameter is the
+        given handle type, in document order, including command aliases.
+
+        - handleName - handle type name"""
+        return self._handleCommands.get(handleName, ())
+
+    def featureRequires(self, featureName):
+        """Return a tuple of the names of the types, enums, and commands
+        required by a feature or extension, in document order.
+
+        - featureName - feature or extension name"""
+        return self._featureRequires.get(featureName, ())
+
+    def requiringFeatures(self, name):
+        """Return a tuple of the features and extensions requiring the
+        given type, enum, or command, features first, in document order.
+
+        - name - type, enum, or command name"""
+        return self._requiringFeatures.get(name, ())
+
+
+def mergeInternalFeatures(tree, apiName, dependencies = None):
     """Merge internal API features (apitype='internal') into their public dependents.
 
     This processes the tree to find features marked with apitype='internal' and merges
@@ -175,95 +398,31 @@ def mergeInternalFeatures(tree, apiName):
 
         tree - Element at the root of the hierarchy (typically <registry>)
         apiName - the API name to process (e.g., 'vulkan', 'vulkansc')
+        dependencies - FeatureDependencies for the tree and apiName. If
+            None, it is built here.
     """
-    import copy
-
-    # Find all features in the tree
-    features = tree.findall('feature')
+    if dependencies is None:
+        dependencies = FeatureDependencies(tree, apiName)
 
-    # Separate internal and public features
-    internal_features = []
-    public_features = []
+    features = {}
+    for feature in tree.findall('feature'):
+        if apiName in feature.get('api', '').split(','):
+            features[feature.get('name')] = feature
 
-    for feature in features:
-        api = feature.get('api', '')
-        apitype = feature.get('apitype', '')
-
-        # Only process features matching the target API
-        if apiName not in api.split(','):
+    # For each internal feature, find its first public dependent and merge
+    for internal_name in dependencies.names:
+        if internal_name not in dependencies.internal:
             continue
+        target_name = dependencies.firstPublicDependent(internal_name)
 
-        if apitype == 'internal':
-            internal_features.append(feature)
-        else:
-            public_features.append(feature)
-
-    # Build a simple dependency map from the 'depends' attributes
-    def get_dependencies(feature):
-        """Extract all dependencies from a feature's depends attribute."""
-        depends = feature.get('depends', '')
-        if not depends:
-            return set()
-        # Parse the depends expression - for simplicity, extract feature names
-        # Dependencies can be like "VK_VERSION_1_0" or "VK_VERSION_1_0+VK_KHR_feature"
-        deps = set()
-        # Split on + and , to get individual dependencies
-        for dep in depends.replace('+', ',').split(','):
-            dep = dep.strip()
-            if dep:
-                deps.add(dep)
-        return deps
-
-    def has_dependency(feature, target_name, all_features_map, visited=None):
-        """Check if feature depends on target_name (directly or transitively)."""
-        if visited is None:
-            visited = set()
-
-        feature_name = feature.get('name')
-        if feature_name in visited:
-            return False
-        visited.add(feature_name)
-
-        deps = get_dependencies(feature)
-        if target_name in deps:
-            return True
-
-        # Check transitive dependencies
-        for dep_name in deps:
-            if dep_name in all_features_map:
-                if has_dependency(all_features_map[dep_name], target_name, all_features_map, visited):
-                    return True
-        return False
+        if target_name is not None:
+            internal_feature = features[internal_name]
+            target_feature = features[target_name]
 
-    # Create a map of all features for dependency lookups
-    all_features_map = {f.get('name'): f for f in public_features + internal_features}
-
-    # For each internal feature, find its first public dependent and merge
-    for internal_feature in internal_features:
-        internal_name = internal_feature.get('name')
-        target_feature = None
-
-        # Find the first public feature that depends on this internal feature
-        for public_feature in public_features:
-            if has_dependency(public_feature, internal_name, all_features_map):
-                target_feature = public_feature
-                break
-
-        if target_feature is not None:
-            # Merge require blocks
-            for require in internal_feature.findall('require'):
-                require_copy = copy.deepcopy(require)
-                target_feature.append(require_copy)
-
-            # Merge deprecate blocks
-            for deprecate in internal_feature.findall('deprecate'):
-                deprecate_copy = copy.deepcopy(deprecate)
-                target_feature.append(deprecate_copy)
-
-            # Merge remove blocks
-            for remove in internal_feature.findall('remove'):
-                remove_copy = copy.deepcopy(remove)
-                target_feature.append(remove_copy)
+            # Merge require, deprecate, and remove blocks, in that order
+            for tag in ('require', 'deprecate', 'remove'):
+                for elem in internal_feature.findall(tag):
+                    target_feature.append(copy.deepcopy(elem))
 
             # Remove the internal feature from the tree
             tree.remove(internal_feature)
@@ -296,6 +455,215 @@ def stripNonmatchingAPIs(tree, apiName, actuallyDelete = True):
                     parent.remove(child)
 
 
+def splitAttribute(elem, name):
+    """Return the comma-separated components of an Element attribute as a
+    tuple, which is empty if the attribute is missing or empty.
+
+        elem - Element (or attribute dictionary) to look in
+        name - attribute name"""
+    value = elem.get(name)
+    if not value:
+        return ()
+    return tuple(value.split(','))
+
+
+MemberAttributes = namedtuple('MemberAttributes',
+                              ['name',          # Contents of the <name> tag
+                               'len',           # Components of the 'len' attribute
+                               'altlen',        # 'altlen' attribute, or None
+                               'optional',      # Booleans for components of the 'optional' attribute
+                               'externsync',    # Components of the 'externsync' attribute
+                               'selector'])     # 'selector' attribute, or None
+MemberAttributes.__doc__ = """Parsed attributes of a `<member>` or `<param>` Element."""
+
+
+def parseMemberAttributes(elem):
+    """Return the MemberAttributes for a `<member>` or `<param>` Element."""
+    nameElem = elem.find('name')
+    return MemberAttributes(
+        None if nameElem is None else nameElem.text,
+        splitAttribute(elem, 'len'),
+        elem.get('altlen'),
+        tuple(value == 'true' for value in splitAttribute(elem, 'optional')),
+        splitAttribute(elem, 'externsync'),
+        elem.get('selector'))
+
+
+EnumValue = namedtuple('EnumValue',
+                       ['group',        # Name of the <enums> group extended or containing the enum, or None
+                        'name',         # 'name' attribute
+                        'source',       # 'value', 'bitpos', 'offset', or 'alias': the attribute defining the value, or None
+                        'numVal',       # Integer value, or None for an alias or a non-integer value
+                        'value',        # String representation of the value, or the aliased name
+                        'bitwidth',     # 'bitwidth' attribute of the group, or 32
+                        'alias',        # 'alias' attribute, or None
+                        'feature'])     # Name of the version or extension defining the enum, or None
+EnumValue.__doc__ = """Value of an `<enum>` Element, as precomputed by Registry.parseEnumValues()."""
+
+
+def parseEnumValue(elem, group = None, bitwidth = 32, feature = None):
+    """Return the EnumValue for an `<enum>` Element.
+
+    The value and its string representation are those returned by
+    OutputGenerator.enumToValue() without a bitwidth or suffix.
+
+    - elem - `<enum>` Element
+    - group - name of the group containing or extended by the enum
+    - bitwidth - bitwidth of the group
+    - feature - name of the version or extension defining the enum"""
+    name = elem.get('name')
+    alias = elem.get('alias')
+    value = elem.get('value')
+    if value is not None:
+        try:
+            numVal = int(value, 0)
+        except ValueError:
+            # Non-integer constants, such as (~0U) or 1000.0F
+            numVal = None
+        return EnumValue(group, name, 'value', numVal, value, bitwidth, alias, feature)
+    bitpos = elem.get('bitpos')
+    if bitpos is not None:
+        bitpos = int(bitpos, 0)
+        numVal = 1 << bitpos
+        value = f'0x{numVal:08x}'
+        if bitpos >= 32:
+            value = f'{value}ULL'
+        return EnumValue(group, name, 'bitpos', numVal, value, bitwidth, alias, feature)
+    offset = elem.get('offset')
+    if offset is not None:
+        # The enumerant value, as defined in the "Layers and Extensions"
+        # appendix of the spec.
+        numVal = EXT_BASE + (int(elem.get('extnumber'), 0) - 1) * EXT_BLOCK_SIZE + int(offset, 0)
+        if elem.get('dir') is not None:
+            numVal *= -1
+        return EnumValue(group, name, 'offset', numVal, '%d' % numVal, bitwidth, alias, feature)
+    if alias is not None:
+        return EnumValue(group, name, 'alias', None, alias, bitwidth, alias, feature)
+    return EnumValue(group, name, None, None, None, bitwidth, alias, feature)
+
+
+def copyAPITree(elem, apiName = None):
+    """Return a copy of an Element tree, omitting Elements with 'api'
+    attributes not matching apiName, together with their children.
+
+    This is equivalent to copying the tree and then calling
+    stripNonmatchingAPIs() on the copy, but is done in a single pass and
+    leaves the original tree unmodified, so that several API views can be
+    made from the same parsed tree. Each Element in the result is a new
+    object, since generators modify Elements in place; only the text and
+    attribute strings are shared with the original tree.
+
+        elem - Element at the root of the hierarchy to copy.
+        apiName - string which must match a comma-separated component of
+            the 'api' attribute of copied Elements. If None, all Elements
+            are copied."""
+
+    copied = etree.Element(elem.tag, elem.attrib)
+    copied.text = elem.text
+    copied.tail = elem.tail
+
+    children = []
+    for child in elem:
+        api = child.get('api')
+        if api is None or apiName is None or apiName in api.split(','):
+            children.append(copyAPITree(child, apiName))
+    if children:
+        copied.extend(children)
+
+    return copied
+
+
+def aliasCommandElem(elem, name, alias, export):
+    """Return a `<command>` Element for a command alias, sharing the
+    subelements of the aliased command other than its `<proto>`.
+
+    The result looks like a copy of the aliased command Element with the
+    `<proto><name>` text and 'name' attribute replaced with the alias
+    name, but only the `<command>`, `<proto>`, and `<proto><name>` Elements
+    are new objects, so it is much cheaper than a deep copy.
+
+        elem - `<command>` Element for the aliased command
+        name - name of the alias
+        alias - name of the aliased command
+        export - 'export' attribute of the alias. If None, the result has
+            no 'export' attribute, even if the aliased command has one."""
+
+    cmdElem = etree.Element(elem.tag, elem.attrib)
+    cmdElem.text = elem.text
+    cmdElem.tail = elem.tail
+    cmdElem.set('name', name)
+    cmdElem.set('alias', alias)
+    if export is not None:
+        # Replicate the command's 'export' attribute
+        cmdElem.set('export', export)
+    elif cmdElem.get('export') is not None:
+        # Remove the 'export' attribute, if the aliased command has one but
+        # the alias does not.
+        del cmdElem.attrib['export']
+
+    children = []
+    for child in elem:
+        if child.tag == 'proto':
+            proto = etree.Element(child.tag, child.attrib)
+            proto.text = child.text
+            proto.tail = child.tail
+            for protoChild in child:
+                if protoChild.tag == 'name':
+                    nameElem = etree.Element(protoChild.tag, protoChild.attrib)
+                    nameElem.text = name
+                    nameElem.tail = protoChild.tail
+                    proto.append(nameElem)
+                else:
+                    proto.append(protoChild)
+            child = proto
+        children.append(child)
+    cmdElem.extend(children)
+
+    return cmdElem
+
+
+def elementsEqual(elem, other):
+    """Return whether two Element trees have the same tags, attributes,
+    text, and tails, recursively.
+
+        elem, other - Elements at the root of the trees to compare"""
+    # Since the numbers of children are compared, the trees are walked in
+    # step, without recursion
+    for (node, otherNode) in zip(elem.iter(), other.iter()):
+        if (node.tag != otherNode.tag or node.text != otherNode.text or
+                node.tail != otherNode.tail or node.attrib != otherNode.attrib or
+                len(node) != len(otherNode)):
+            return False
+    return True
+
+
+def elementKey(elem):
+    """Return a key identifying an Element among its siblings, made of its
+    tag, name, and 'api' attribute. The name is taken from the 'name'
+    attribute or, for `<type>` and `<command>`, the nested name tag.
+
+        elem - Element to identify"""
+    name = elem.get('name')
+    if name is None:
+        nameElem = elem.find('proto/name' if elem.tag == 'command' else 'name')
+        if nameElem is not None:
+            name = nameElem.text
+    return (elem.tag, name, elem.get('api'))
+
+
+def definedEnums(feature):
+    """Return a list of the `<enum>` Elements defining values in the
+    `<require>` blocks of a `<feature>` or `<extension>`, rather than
+    referring to enums defined elsewhere.
+
+        feature - `<feature>` or `<extension>` Element"""
+    return [enum
+            for require in feature.findall('require')
+            for enum in require.findall('enum')
+            if enum.get('extends') is not None or enum.get('value') or
+               enum.get('bitpos') or enum.get('alias')]
+
+
 class BaseInfo:
     """Base class for information about a registry feature
     (type/group/enum/command/API/extension).
@@ -319,10 +687,13 @@ class BaseInfo:
         self.deprecatedlink = None
 
     def resetState(self):
-        """Reset required/declared to initial values. Used
-        prior to generating a new API interface."""
+        """Reset required/declared and deprecation state to initial values.
+        Used prior to generating a new API interface."""
         self.required = False
         self.declared = False
+        self.deprecatedbyversion = None
+        self.deprecatedbyextensions = []
+        self.deprecatedlink = None
 
     def compareKeys(self, info, key, required = False):
         """Return True if self.elem and info.elem have the same attribute
@@ -367,14 +738,28 @@ class BaseInfo:
 
 
 class TypeInfo(BaseInfo):
-    """Registry information about a type. No additional state
-      beyond BaseInfo is required."""
+    """Registry information about a type."""
 
     def __init__(self, elem):
         BaseInfo.__init__(self, elem)
         self.additionalValidity = []
         self.removedValidity = []
 
+        self.structextends = splitAttribute(elem, 'structextends')
+        """tuple of structure names in the 'structextends' attribute.
+        Unsupported structures are removed by apiGen()."""
+
+        self.memberAttributes = tuple(parseMemberAttributes(member) for member in self.getMembers())
+        "tuple of MemberAttributes for the elements returned by getMembers()"
+
+        self.subtypes = tuple(subtype.text for subtype in elem.findall('.//type'))
+        """tuple of the names of types used in defining this type, in nested
+        `<type>` tags, in document order"""
+
+        self.subenums = tuple(subenum.text for subenum in elem.findall('.//enum'))
+        """tuple of the names of enums used in defining this type, in nested
+        `<enum>` tags, in document order"""
+
     def getMembers(self):
         """Get a collection of all member elements for this type, if any."""
         return self.elem.findall('member')
@@ -396,7 +781,7 @@ class GroupInfo(BaseInfo):
 class EnumInfo(BaseInfo):
     """Registry information about an enum"""
 
-    def __init__(self, elem):
+    def __init__(self, elem, required = False):
         BaseInfo.__init__(self, elem)
         self.type = elem.get('type')
         """numeric type of the value of the <enum> tag
@@ -404,6 +789,15 @@ class EnumInfo(BaseInfo):
         if self.type is None:
             self.type = ''
 
+        self.requiredByGroup = required
+        """True if the enum is required because it is defined in an
+        enumerated type, rather than by a version or extension"""
+        self.required = required
+
+    def resetState(self):
+        BaseInfo.resetState(self)
+        self.required = self.requiredByGroup
+
 
 class CmdInfo(BaseInfo):
     """Registry information about a command"""
@@ -413,6 +807,21 @@ class CmdInfo(BaseInfo):
         self.additionalValidity = []
         self.removedValidity = []
 
+        self.successcodes = splitAttribute(elem, 'successcodes')
+        """tuple of enum names in the 'successcodes' attribute.
+        Unsupported enums are removed by apiGen()."""
+
+        self.errorcodes = splitAttribute(elem, 'errorcodes')
+        """tuple of enum names in the 'errorcodes' attribute.
+        Unsupported enums are removed by apiGen()."""
+
+        self.paramAttributes = tuple(parseMemberAttributes(param) for param in self.getParams())
+        "tuple of MemberAttributes for the elements returned by getParams()"
+
+        self.subtypes = tuple(subtype.text for subtype in elem.findall('.//type'))
+        """tuple of the names of types used by this command, in nested
+        `<type>` tags, in document order"""
+
     def getParams(self):
         """Get a collection of all param elements for this command, if any."""
         return self.elem.findall('param')
@@ -472,6 +881,10 @@ class FeatureInfo(BaseInfo):
 
             self.supported = elem.get('supported', 'disabled')
 
+    def resetState(self):
+        BaseInfo.resetState(self)
+        self.emit = False
+
 class SpirvInfo(BaseInfo):
     """Registry information about an API <spirvextensions>
     or <spirvcapability>."""
@@ -512,6 +925,29 @@ class SyncPipelineInfo(BaseInfo):
 class Registry:
     """Object representing an API registry, loaded from an XML file."""
 
+    parsedAttributes = (
+        'typedict',
+        'groupdict',
+        'enumdict',
+        'cmddict',
+        'aliasdict',
+        'enumvaluedict',
+        'apidict',
+        'extensions',
+        'extdict',
+        'spirvextdict',
+        'spirvcapdict',
+        'formatsdict',
+        'syncstagedict',
+        'syncaccessdict',
+        'syncpipelinedict',
+        'featureDependencies',
+        'references',
+        'enumValues',
+    )
+    """Names of attributes constructed by parseTree(), other than the tree
+    itself. These are saved and restored by the parsed registry cache."""
+
     def __init__(self, gen=None, genOpts=None):
         if gen is None:
             # If not specified, give a default object so messaging will work
@@ -536,7 +972,12 @@ class Registry:
         self.mergeInternalApis = getattr(self.genOpts, 'mergeInternalApis', True)
 
         self.tree = None
-        "ElementTree containing the root `<registry>`"
+        "ElementTree containing the root `<registry>`, after API selection"
+
+        self.sourceRoot = None
+        """root `<registry>` Element as loaded, before API selection.
+        Not modified by parseTree(), so that apiView() can make other API
+        views of the same registry without reparsing it."""
 
         self.typedict = {}
         "dictionary of TypeInfo objects keyed by type name"
@@ -559,6 +1000,25 @@ class Registry:
         self.apidict = {}
         "dictionary of FeatureInfo objects for `<feature>` elements keyed by feature name"
 
+        self.featureDependencies = None
+        """FeatureDependencies graph of the `<feature>` Elements for the
+        API, including internal API features, even if they have been
+        merged into public features"""
+
+        self.references = None
+        """RegistryReferences indexes of the parsed registry, for looking
+        up which structures, commands, and features refer to a name"""
+
+        self.enumValues = {}
+        """dictionary of EnumValue tuples keyed by `<enum>` Element, for the
+        `<enum>` Elements in groups, and constants in the `<require>` tags of
+        features and extensions"""
+
+        self.declCache = {}
+        """dictionary of dictionaries of declarations made by generators,
+        keyed by OutputGenerator.declarationStyle(), so generators making
+        declarations alike share them"""
+
         self.extensions = []
         "list of `<extension>` Elements"
 
@@ -596,6 +1056,37 @@ class Registry:
 
         self.requiredextensions = []  # Hack - can remove it after validity generator goes away
 
+        self.featureBits = {}
+        """dictionary of version and extension names mapped to single-bit
+        integers, indexing the bitsets built by apiGen()"""
+
+        self.enumSelection = 0
+        """bitset of versions and extensions whose `<enum>`s extending
+        enumerated types are selected by the generator options"""
+
+        self.removedEnums = []
+        """list of (parent, index, elem) tuples for `<enum>` Elements
+        removed from `<enums>` groups by markEnumRequired(), so apiReset()
+        can restore them"""
+
+        self.declaredInfos = []
+        """list of *Info objects in the order generateFeature() declared
+        them, so apiGenMulti() can forget declarations"""
+
+        self.undeclaredInfos = []
+        """list of *Info objects generateFeature() did not declare because
+        they were not required, so apiGenMulti() can tell which
+        declarations depend on their tags"""
+
+        self.featureTags = None
+        """list to which the mark*Required() methods append (info, required)
+        tuples for the *Info objects they tag, while apiGenMulti() records
+        the tags of a feature, or None"""
+
+        self.strippedAttributes = []
+        """list of (info, attribute, value) tuples for attributes modified
+        by stripUnsupportedAPIs(), so apiReset() can restore them"""
+
         # ** Global types for automatic source generation **
         # Length Member data
         self.commandextensiontuple = namedtuple('commandextensiontuple',
@@ -609,22 +1100,346 @@ class Registry:
         self.filename     = None
 
     def loadElementTree(self, tree):
-        """Load ElementTree into a Registry object and parse it."""
+        """Load ElementTree into a Registry object and parse it.
+
+        The tree is not modified; self.tree is replaced by a copy holding
+        only the Elements for the selected API."""
         self.tree = tree
+        self.sourceRoot = tree.getroot()
         self.parseTree()
 
-    def loadFile(self, file):
-        """Load an API registry XML file into a Registry object and parse it"""
+    def loadFile(self, file, cacheDir=None):
+        """Load an API registry XML file into a Registry object and parse it
+
+        - file - path to the registry XML file
+        - cacheDir - if not None, directory of a persistent cache of parsed
+          registries. If the cache has an entry for the same file contents
+          and parsing options, it is loaded instead of parsing the XML.
+          Otherwise the parsed registry is added to the cache."""
+        self.filename = file
+        self.sourceRoot = None
+        if cacheDir is None:
+            with phaseprofile.phase('read XML'):
+                self.tree = etree.parse(file)
+            self.sourceRoot = self.tree.getroot()
+            self.parseTree()
+            return
+
+        cache = RegistryCache(cacheDir)
+        with open(file, 'rb') as fp:
+            data = fp.read()
+        # The parsed state also depends on the generator, conventions, and
+        # utility modules reg.py imports
+        sources = [__file__] + [sys.modules[name].__file__ for name in
+                                ('generator', 'apiconventions', APIConventions.__module__,
+                                 'spec_tools.util', RegistryCache.__module__)]
+        key = cache.makeKey(data, self.genOpts, sources = sources)
+
+        with phaseprofile.phase('load cache'):
+            cached = cache.load(key)
+        if cached is not None:
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'Loaded parsed registry from cache', cache.path(key))
+            (root, state) = cached
+            self.tree = etree.ElementTree(root)
+            self.reg = root
+            for name, value in state.items():
+                setattr(self, name, value)
+            self.declCache = {}
+            self.checkEnumValues()
+            return
+
+        with phaseprofile.phase('read XML'):
+            self.tree = etree.ElementTree(etree.fromstring(data))
+        self.sourceRoot = self.tree.getroot()
+        self.parseTree()
+        with phaseprofile.phase('store cache'):
+            cache.store(key, self.reg, {name: getattr(self, name) for name in self.parsedAttributes})
+
+    def apiView(self, genOpts, gen=None):
+        """Return a new Registry for another API or set of merged APIs,
+        made from the same source tree as this one.
+
+        Neither this Registry nor its source tree are modified, so a single
+        process can generate outputs for several APIs (such as 'vulkan',
+        'vulkansc', and 'vulkanbase') while reading the XML only once.
+
+        - genOpts - GeneratorOptions for the view. Its apiname,
+          mergeApiNames, and mergeInternalApis select the Elements of the
+          view, as for a Registry loaded from the same file.
+        - gen - output generator for the view, as for the Registry
+          constructor."""
+        if self.sourceRoot is None:
+            # A registry restored from the parsed registry cache does not
+            # keep its source tree, so it is parsed again here.
+            if self.filename is None:
+                raise RuntimeError("Source tree not available!")
+            self.sourceRoot = etree.parse(self.filename).getroot()
+
+        view = Registry(gen, genOpts)
+        view.filename = self.filename
+        view.sourceRoot = self.sourceRoot
+        view.parseTree()
+        return view
+
+    def reloadFile(self, file=None):
+        """Reload an edited registry XML file into this Registry, reparsing
+        only the elements which changed when possible.
+
+        The new file is compared with the source tree of the registry,
+        element by element below the toplevel `<types>`, `<commands>`, and
+        `<extensions>` tags. If only `<type>`, `<command>`, and
+        `<extension>` Elements were modified, the registry Elements, the
+        dictionaries, and the reverse reference indexes are updated in
+        place. Any other change, such as adding or removing Elements or
+        editing a `<feature>`, falls back to parsing the whole registry.
+
+        Dictionary entries of enums defined by a modified `<extension>`
+        are moved to the end of their dictionaries; otherwise the result
+        is the same as loading the new file.
+
+        - file - path to the registry XML file. Defaults to the file the
+          registry was loaded from.
+
+        Returns True if the registry was updated in place, or False if it
+        was parsed again."""
+        if file is None:
+            file = self.filename
+        root = etree.parse(file).getroot()
         self.filename = file
-        self.tree = etree.parse(file)
+
+        # Undo the changes made to registry Elements by apiGen(), which
+        # would otherwise be reapplied to replaced Elements
+        self.apiReset()
+
+        if self.sourceRoot is not None and self.updateTree(root):
+            return True
+
+        if self.gen.diag_enabled:
+            self.gen.logMsg('diag', 'Reparsing registry', file)
+        self.tree = etree.ElementTree(root)
+        self.sourceRoot = root
         self.parseTree()
+        return False
+
+    def updateTree(self, root):
+        """Update the registry in place from a new source tree, when the
+        differences from the current source tree are limited to modified
+        `<type>`, `<command>`, and `<extension>` Elements.
+
+        Intended for internal use only. Called by reloadFile().
+
+        - root - new root `<registry>` Element
+
+        Returns False, without modifying the registry, if the differences
+        cannot be applied in place."""
+        apiName = self.genOpts.apiname
+        if self.genOpts.mergeApiNames:
+            return False
+
+        sections = list(self.sourceRoot)
+        if (root.tag != self.sourceRoot.tag or root.attrib != self.sourceRoot.attrib or
+                len(root) != len(sections)):
+            return False
+
+        # Find the modified Elements and their counterparts in self.reg,
+        # checking that each one can be replaced in place
+        changes = []
+        for (section, newSection) in zip(sections, root):
+            if section.tag not in ('types', 'commands', 'extensions'):
+                if not elementsEqual(section, newSection):
+                    return False
+                continue
+            if (section.get('api') is not None or newSection.tag != section.tag or
+                    newSection.attrib != section.attrib or newSection.text != section.text or
+                    newSection.tail != section.tail or len(newSection) != len(section)):
+                return False
+
+            # Other toplevel tags may have been removed from self.reg,
+            # but not these
+            sameTag = [other for other in sections if other.tag == section.tag]
+            regSection = self.reg.findall(section.tag)[sameTag.index(section)]
+
+            regIndex = None
+            for (elem, newElem) in zip(section, newSection):
+                if elementsEqual(elem, newElem):
+                    continue
+                key = elementKey(elem)
+                if key != elementKey(newElem) or elem.tag not in ('type', 'command', 'extension'):
+                    return False
+                api = elem.get('api')
+                if api is not None and apiName not in api.split(','):
+                    # Not part of this API, so only the source tree changes
+                    continue
+                if regIndex is None:
+                    regIndex = {elementKey(regElem): index for (index, regElem) in enumerate(regSection)}
+                if key not in regIndex:
+                    return False
+                regElem = regSection[regIndex[key]]
+                newRegElem = copyAPITree(newElem, apiName)
+                if not self.canReplaceElement(key[1], regElem, newRegElem):
+                    return False
+                changes.append((regSection, regIndex[key], key[1], newRegElem))
+
+        if self.gen.diag_enabled:
+            self.gen.logMsg('diag', 'Updating', len(changes), 'registry elements in place')
+
+        for (regSection, index, name, newRegElem) in changes:
+            self.replaceElement(regSection, index, name, newRegElem)
+
+        # Rebuild aliased command Elements from the commands they alias
+        changedCommands = set(name for (_, _, name, elem) in changes if elem.tag == 'command')
+        if changedCommands:
+            for cmd in self.reg.findall('commands/command'):
+                alias = cmd.get('alias')
+                name = cmd.get('name')
+                if name in changedCommands or alias in changedCommands:
+                    if alias is None:
+                        continue
+                    if alias in self.cmddict:
+                        cmdElem = aliasCommandElem(self.cmddict[alias].elem, name, alias, cmd.get('export'))
+                        self.cmddict[name] = CmdInfo(cmdElem)
+                    else:
+                        self.gen.logMsg('warn', 'No matching <command> found for command',
+                                        name, 'alias', alias)
+
+        self.extensions = self.reg.findall('extensions/extension')
+        self.sourceRoot = root
+        self.references = RegistryReferences(self.typedict, self.cmddict,
+                                             (self.apidict, self.extdict))
+        self.parseEnumValues()
+        self.declCache = {}
+        return True
+
+    def canReplaceElement(self, name, elem, newElem):
+        """Return whether a `<type>`, `<command>`, or `<extension>` Element
+        can be replaced in place by updateTree().
+
+        Intended for internal use only.
+
+        - name - name of the Element
+        - elem - Element in self.reg
+        - newElem - replacement Element, already filtered for the API"""
+        if elem.tag == 'type':
+            info = self.typedict.get(name)
+            # Type aliases also affect the enumvaluedict
+            return (info is not None and info.elem is elem and
+                    elem.get('alias') == newElem.get('alias'))
+        if elem.tag == 'command':
+            info = self.cmddict.get(name)
+            return (info is not None and elem.get('alias') == newElem.get('alias') and
+                    (elem.get('alias') is not None or info.elem is elem))
+
+        info = self.extdict.get(name)
+        if info is None or info.elem is not elem:
+            return False
+        enums = definedEnums(elem)
+        oldEnums = set(enums)
+        for enum in enums + definedEnums(newElem):
+            # Format and synchronization conditions depend on all the
+            # features and extensions defining an enum
+            if enum.get('extends') in ('VkFormat', 'VkPipelineStageFlagBits2', 'VkAccessFlagBits2'):
+                return False
+            enumName = enum.get('name')
+            enumInfo = self.enumdict.get(enumName)
+            if enumInfo is not None and enumInfo.elem not in oldEnums:
+                return False
+            # The enum must not also be defined by another feature
+            for featureName in self.references.requiringFeatures(enumName):
+                if featureName == name:
+                    continue
+                featureInfo = self.apidict.get(featureName) or self.extdict.get(featureName)
+                if any(other.get('name') == enumName for other in definedEnums(featureInfo.elem)):
+                    return False
+        return True
+
+    def replaceElement(self, section, index, name, elem):
+        """Replace a `<type>`, `<command>`, or `<extension>` Element in
+        self.reg, and its entries in the dictionaries.
 
-    def setGenerator(self, gen):
+        Intended for internal use only. Aliased commands are updated
+        separately, by updateTree().
+
+        - section - parent Element in self.reg
+        - index - index of the replaced Element in section
+        - name - name of the Element
+        - elem - replacement Element, already filtered for the API"""
+        oldElem = section[index]
+        section[index] = elem
+        elem.set('name', name)
+
+        if elem.tag == 'type':
+            self.typedict[name] = TypeInfo(elem)
+            return
+        if elem.tag == 'command':
+            self.cmddict[name] = CmdInfo(elem)
+            return
+
+        # Remove the enums defined by the old <extension> from the
+        # dictionaries and from the groups they extend
+        groupIndex = {}
+        for enum in definedEnums(oldElem):
+            enumName = enum.get('name')
+            self.enumdict.pop(enumName, None)
+            self.enumvaluedict.pop(enumName, None)
+            if enum.get('alias'):
+                self.aliasdict.pop(enumName, None)
+            groupName = enum.get('extends')
+            if groupName in self.groupdict and groupName not in groupIndex:
+                group = self.groupdict[groupName].elem
+                copies = [child for child in group if child.get('extname') == name]
+                groupIndex[groupName] = list(group).index(copies[0]) if copies else None
+                for child in copies:
+                    group.remove(child)
+
+        featureInfo = FeatureInfo(elem)
+        self.extdict[name] = featureInfo
+        self.addExtensionEnums(featureInfo, lambda formatName, featureName: None, {}, {})
+
+        # addExtensionEnums() appends the enums to the groups they extend,
+        # but they follow the enums of earlier extensions only
+        extensionOrder = {ext.get('name'): order for (order, ext) in enumerate(self.reg.findall('extensions/extension'))}
+        for groupName in set(enum.get('extends') for enum in definedEnums(elem)):
+            if groupName not in self.groupdict:
+                continue
+            group = self.groupdict[groupName].elem
+            copies = [child for child in group if child.get('extname') == name]
+            for child in copies:
+                group.remove(child)
+            index = groupIndex.get(groupName)
+            if index is None:
+                index = len(group)
+                for (position, child) in enumerate(group):
+                    if extensionOrder.get(child.get('extname'), -1) > extensionOrder[name]:
+                        index = position
+                        break
+            group[index:index] = copies
+
+    def setGenerator(self, gen, genOpts=None):
         """Specify output generator object.
 
-        `None` restores the default generator."""
+        `None` restores the default generator.
+
+        - gen - output generator
+        - genOpts - if not None, GeneratorOptions to use for following
+          apiGen() calls, so that one Registry can generate several
+          targets. Options affecting parsing must be the same as those the
+          registry was loaded with; use apiView() for targets needing a
+          different API."""
+        if genOpts is not None:
+            for option in ('apiname', 'mergeApiNames'):
+                if getattr(genOpts, option) != getattr(self.genOpts, option):
+                    raise RuntimeError(f"Cannot change generator option '{option}' of a loaded registry")
+            if getattr(genOpts, 'mergeInternalApis', True) != self.mergeInternalApis:
+                raise RuntimeError("Cannot change generator option 'mergeInternalApis' of a loaded registry")
+            self.genOpts = genOpts
+            self.genOpts.registry = self
+
+        if gen is None:
+            gen = OutputGenerator()
         self.gen = gen
         self.gen.setRegistry(self)
+        self.gen.genOpts = self.genOpts
 
     def addElementInfo(self, elem, info, infoName, dictionary):
         """Add information about an element to the corresponding dictionary.
@@ -687,37 +1502,126 @@ class Registry:
         else:
             self.enumvaluedict[value] = type_name
 
+    def addExtensionEnums(self, featureInfo, addFormatCondition, syncStageCondition, syncAccessCondition):
+        """Add the enums defined by an `<extension>` to the corresponding
+        groups and to the enum dictionary.
+
+        Intended for internal use only.
+
+        - featureInfo - FeatureInfo for the `<extension>`
+        - addFormatCondition - function recording that a format is
+          defined by a feature or extension
+        - syncStageCondition, syncAccessCondition - dictionaries of
+          pipeline stage and access flag names mapped to the features
+          and extensions defining them, updated by this method"""
+        # Add additional enums defined only in <extension> tags
+        # to the corresponding core type.
+        # Algorithm matches that of enums in a "feature" tag in parseTree().
+        #
+        # This code also adds a 'extnumber' attribute containing the
+        # extension number, used for enumerant value calculation.
+        for elem in featureInfo.elem.findall('require'):
+            for enum in elem.findall('enum'):
+                addEnumInfo = False
+                groupName = enum.get('extends')
+                if groupName is not None:
+                    # self.gen.logMsg('diag', 'Found extension enum',
+                    #     enum.get('name'))
+
+                    # Add <extension> block's extension number attribute to
+                    # the <enum> element unless specified explicitly, such
+                    # as when redefining an enum in another extension.
+                    extnumber = enum.get('extnumber')
+                    if not extnumber:
+                        enum.set('extnumber', str(featureInfo.number))
+
+                    enum.set('extname', featureInfo.name)
+                    enum.set('supported', noneStr(featureInfo.supported))
+                    # Look up the GroupInfo with matching groupName
+                    if groupName in self.groupdict:
+                        # self.gen.logMsg('diag', 'Matching group',
+                        #     groupName, 'found, adding element...')
+                        gi = self.groupdict[groupName]
+                        gi.elem.append(copy.deepcopy(enum))
+                    else:
+                        self.gen.logMsg('warn', 'NO matching group',
+                                        groupName, 'for enum', enum.get('name'), 'found.')
+                    # This is Vulkan-specific
+                    if groupName == "VkFormat":
+                        format_name = enum.get('name')
+                        if enum.get('alias'):
+                            format_name = enum.get('alias')
+                        addFormatCondition(format_name, featureInfo.name)
+                    elif groupName == "VkPipelineStageFlagBits2":
+                        stage_flag = enum.get('name')
+                        if enum.get('alias'):
+                            stage_flag = enum.get('alias')
+                        featureName = elem.get('depends') if elem.get('depends') is not None else featureInfo.name
+                        if stage_flag in syncStageCondition:
+                            syncStageCondition[stage_flag] += f",{featureName}"
+                        else:
+                            syncStageCondition[stage_flag] = featureName
+                    elif groupName == "VkAccessFlagBits2":
+                        access_flag = enum.get('name')
+                        if enum.get('alias'):
+                            access_flag = enum.get('alias')
+                        featureName = elem.get('depends') if elem.get('depends') is not None else featureInfo.name
+                        if access_flag in syncAccessCondition:
+                            syncAccessCondition[access_flag] += f",{featureName}"
+                        else:
+                            syncAccessCondition[access_flag] = featureName
+
+                    addEnumInfo = True
+                elif enum.get('value') or enum.get('bitpos') or enum.get('alias'):
+                    # self.gen.logMsg('diag', 'Adding extension constant "enum"',
+                    #     enum.get('name'))
+                    addEnumInfo = True
+                if addEnumInfo:
+                    enumInfo = EnumInfo(enum)
+                    self.addElementInfo(enum, enumInfo, 'enum', self.enumdict)
+                    self.addEnumValue(enum, groupName)
+
+    @phaseprofile.timed('parseTree')
     def parseTree(self):
         """Parse the registry Element, once created"""
         # This must be the Element for the root <registry>
-        if self.tree is None:
-            raise RuntimeError("Tree not initialized!")
-        self.reg = self.tree.getroot()
+        if self.sourceRoot is None:
+            if self.tree is None:
+                raise RuntimeError("Tree not initialized!")
+            self.sourceRoot = self.tree.getroot()
 
-        # Preprocess the tree in one of the following ways:
+        # Make a copy of the source tree for the requested API, in one of
+        # the following ways:
         # - either merge a set of APIs to another API based on their 'api' attributes
         # - or remove all elements with non-matching 'api' attributes
-        # The preprocessing happens through a breath-first tree traversal.
         # This is a blunt hammer, but eliminates the need to track and test
         # the apis deeper in processing to select the correct elements and
         # avoid duplicates.
         # Schema validation should prevent duplicate elements with
         # overlapping api attributes, or where one element has an api
         # attribute and the other does not.
+        # The source tree itself is left unmodified, so that apiView() can
+        # make views for other APIs from it.
 
+        phaseprofile.lap('copy API tree')
         if self.genOpts.mergeApiNames:
+            self.reg = copyAPITree(self.sourceRoot)
             mergeAPIs(self.reg, self.genOpts.mergeApiNames.split(','), self.genOpts.apiname)
         else:
-            stripNonmatchingAPIs(self.reg, self.genOpts.apiname, actuallyDelete = True)
+            self.reg = copyAPITree(self.sourceRoot, self.genOpts.apiname)
+        self.tree = etree.ElementTree(self.reg)
 
+        phaseprofile.lap('merge internal APIs')
         # Merge internal features (apitype="internal") into their public dependents
         # This happens after API merging/stripping so we work with the correct API
+        self.featureDependencies = FeatureDependencies(self.reg, self.genOpts.apiname)
         if self.mergeInternalApis:
-            mergeInternalFeatures(self.reg, self.genOpts.apiname)
+            mergeInternalFeatures(self.reg, self.genOpts.apiname, self.featureDependencies)
 
         self.aliasdict = {}
         self.enumvaluedict = {}
 
+        phaseprofile.lap('types')
         # Create dictionary of registry types from toplevel <types> tags
         # and add 'name' attribute to each <type> tag (where missing)
         # based on its <name> element.
@@ -742,6 +1646,7 @@ class Registry:
             if alias:
                 self.aliasdict[name] = alias
 
+        phaseprofile.lap('enum groups')
         # Create dictionary of registry enum groups from <enums> tags.
         #
         # Required <enums> attributes: 'name'. If no name is given, one is
@@ -751,6 +1656,7 @@ class Registry:
         for group in self.reg.findall('enums'):
             self.addElementInfo(group, GroupInfo(group), 'group', self.groupdict)
 
+        phaseprofile.lap('enums')
         # Create dictionary of registry enums from <enum> tags
         #
         # <enums> tags usually define different namespaces for the values
@@ -767,11 +1673,11 @@ class Registry:
             # Enum values are defined only for the type that is not aliased to something else.
             assert(type_name not in self.aliasdict)
             for enum in enums.findall('enum'):
-                enumInfo = EnumInfo(enum)
-                enumInfo.required = required
+                enumInfo = EnumInfo(enum, required)
                 self.addElementInfo(enum, enumInfo, 'enum', self.enumdict)
                 self.addEnumValue(enum, type_name)
 
+        phaseprofile.lap('commands')
         # Create dictionary of registry commands from <command> tags
         # and add 'name' attribute to each <command> tag (where missing)
         # based on its <proto><name> element.
@@ -799,27 +1705,17 @@ class Registry:
                 cmdAlias.append([name, alias, cmd])
                 self.aliasdict[name] = alias
 
-        # Now loop over aliases, injecting a copy of the aliased command's
-        # Element with the aliased prototype name replaced with the command
-        # name - if it exists.
+        # Now loop over aliases, injecting an Element for the aliased
+        # command with the aliased prototype name replaced with the command
+        # name - if it exists. The Element shares the aliased command's
+        # parameters, rather than copying them.
         # Copy the 'export' sttribute (whether it exists or not) from the
         # original, aliased command, since that can be different for a
         # command and its alias.
         for (name, alias, cmd) in cmdAlias:
             if alias in self.cmddict:
                 aliasInfo = self.cmddict[alias]
-                cmdElem = copy.deepcopy(aliasInfo.elem)
-                cmdElem.find('proto/name').text = name
-                cmdElem.set('name', name)
-                cmdElem.set('alias', alias)
-                export = cmd.get('export')
-                if export is not None:
-                    # Replicate the command's 'export' attribute
-                    cmdElem.set('export', export)
-                elif cmdElem.get('export') is not None:
-                    # Remove the 'export' attribute, if the alias has one but
-                    # the command does not.
-                    del cmdElem.attrib['export']
+                cmdElem = aliasCommandElem(aliasInfo.elem, name, alias, cmd.get('export'))
                 ci = CmdInfo(cmdElem)
                 # Replace the dictionary entry for the CmdInfo element
                 self.cmddict[name] = ci
@@ -830,6 +1726,7 @@ class Registry:
                 self.gen.logMsg('warn', 'No matching <command> found for command',
                                 cmd.get('name'), 'alias', alias)
 
+        phaseprofile.lap('features and extensions')
         # Create dictionaries of API and extension interfaces
         #   from toplevel <api> and <extension> tags.
         self.apidict = {}
@@ -906,75 +1803,14 @@ class Registry:
             featureInfo = FeatureInfo(feature)
             self.addElementInfo(feature, featureInfo, 'extension', self.extdict)
 
-            # Add additional enums defined only in <extension> tags
-            # to the corresponding core type.
-            # Algorithm matches that of enums in a "feature" tag as above.
-            #
-            # This code also adds a 'extnumber' attribute containing the
-            # extension number, used for enumerant value calculation.
-            for elem in feature.findall('require'):
-                for enum in elem.findall('enum'):
-                    addEnumInfo = False
-                    groupName = enum.get('extends')
-                    if groupName is not None:
-                        # self.gen.logMsg('diag', 'Found extension enum',
-                        #     enum.get('name'))
-
-                        # Add <extension> block's extension number attribute to
-                        # the <enum> element unless specified explicitly, such
-                        # as when redefining an enum in another extension.
-                        extnumber = enum.get('extnumber')
-                        if not extnumber:
-                            enum.set('extnumber', str(featureInfo.number))
-
-                        enum.set('extname', featureInfo.name)
-                        enum.set('supported', noneStr(featureInfo.supported))
-                        # Look up the GroupInfo with matching groupName
-                        if groupName in self.groupdict:
-                            # self.gen.logMsg('diag', 'Matching group',
-                            #     groupName, 'found, adding element...')
-                            gi = self.groupdict[groupName]
-                            gi.elem.append(copy.deepcopy(enum))
-                        else:
-                            self.gen.logMsg('warn', 'NO matching group',
-                                            groupName, 'for enum', enum.get('name'), 'found.')
-                        # This is Vulkan-specific
-                        if groupName == "VkFormat":
-                            format_name = enum.get('name')
-                            if enum.get('alias'):
-                                format_name = enum.get('alias')
-                            addFormatCondition(format_name, featureInfo.name)
-                        elif groupName == "VkPipelineStageFlagBits2":
-                            stage_flag = enum.get('name')
-                            if enum.get('alias'):
-                                stage_flag = enum.get('alias')
-                            featureName = elem.get('depends') if elem.get('depends') is not None else featureInfo.name
-                            if stage_flag in sync_pipeline_stage_condition:
-                                sync_pipeline_stage_condition[stage_flag] += f",{featureName}"
-                            else:
-                                sync_pipeline_stage_condition[stage_flag] = featureName
-                        elif groupName == "VkAccessFlagBits2":
-                            access_flag = enum.get('name')
-                            if enum.get('alias'):
-                                access_flag = enum.get('alias')
-                            featureName = elem.get('depends') if elem.get('depends') is not None else featureInfo.name
-                            if access_flag in sync_access_condition:
-                                sync_access_condition[access_flag] += f",{featureName}"
-                            else:
-                                sync_access_condition[access_flag] = featureName
-
-                        addEnumInfo = True
-                    elif enum.get('value') or enum.get('bitpos') or enum.get('alias'):
-                        # self.gen.logMsg('diag', 'Adding extension constant "enum"',
-                        #     enum.get('name'))
-                        addEnumInfo = True
-                    if addEnumInfo:
-                        enumInfo = EnumInfo(enum)
-                        self.addElementInfo(enum, enumInfo, 'enum', self.enumdict)
-                        self.addEnumValue(enum, groupName)
+            self.addExtensionEnums(featureInfo, addFormatCondition,
+                                   sync_pipeline_stage_condition, sync_access_condition)
 
+        phaseprofile.lap('SPIR-V, formats, and sync')
         # Parse out all spirv tags in dictionaries
         # Use addElementInfo to catch duplicates
+        self.spirvextdict = {}
+        self.spirvcapdict = {}
         for spirv in self.reg.findall('spirvextensions/spirvextension'):
             spirvInfo = SpirvInfo(spirv)
             self.addElementInfo(spirv, spirvInfo, 'spirvextension', self.spirvextdict)
@@ -982,6 +1818,7 @@ class Registry:
             spirvInfo = SpirvInfo(spirv)
             self.addElementInfo(spirv, spirvInfo, 'spirvcapability', self.spirvcapdict)
 
+        self.formatsdict = {}
         for format in self.reg.findall('formats/format'):
             condition = None
             format_name = format.get('name')
@@ -990,6 +1827,9 @@ class Registry:
             formatInfo = FormatInfo(format, condition)
             self.addElementInfo(format, formatInfo, 'format', self.formatsdict)
 
+        self.syncstagedict = {}
+        self.syncaccessdict = {}
+        self.syncpipelinedict = {}
         for stage in self.reg.findall('sync/syncstage'):
             condition = None
             stage_flag = stage.get('name')
@@ -1010,6 +1850,100 @@ class Registry:
             syncInfo = SyncPipelineInfo(pipeline)
             self.addElementInfo(pipeline, syncInfo, 'syncpipeline', self.syncpipelinedict)
 
+        phaseprofile.lap('references')
+        self.references = RegistryReferences(self.typedict, self.cmddict,
+                                             (self.apidict, self.extdict))
+
+        phaseprofile.lap('enum values')
+        self.parseEnumValues()
+        self.declCache = {}
+
+    def parseEnumValues(self):
+        """Compute the values of the `<enum>` Elements in groups, and of
+        constants in the `<require>` tags of features and extensions, in
+        enumValues, and report duplicate and conflicting values in
+        enumerated types.
+
+        The values are computed once for all generators, rather than each
+        time an enum is emitted.
+
+        Intended for internal use only."""
+        self.enumValues = {}
+        for group in self.reg.findall('enums'):
+            groupName = group.get('name')
+            bitwidth = self.groupBitwidth(group)
+            for elem in group.findall('enum'):
+                feature = elem.get('extname') or elem.get('version')
+                self.enumValues[elem] = parseEnumValue(elem, groupName, bitwidth, feature)
+
+        # Constants defined in <require> tags. Generators use the copies of
+        # <enum> Elements extending groups added to the groups instead.
+        for dictionary in (self.apidict, self.extdict):
+            for feature in dictionary.values():
+                for elem in feature.elem.findall('require/enum'):
+                    if elem.get('extends') is None:
+                        self.enumValues[elem] = parseEnumValue(elem, feature = feature.name)
+
+        self.checkEnumValues()
+
+    def checkEnumValues(self):
+        """Report duplicate and conflicting values in enumerated types, from
+        the values in enumValues.
+
+        This is done when the values are computed, and again when the
+        registry is loaded from the parsed registry cache, so the messages
+        are reported each time the registry is loaded.
+
+        Intended for internal use only."""
+        for group in self.reg.findall('enums'):
+            if group.get('type') not in ('enum', 'bitmask'):
+                continue
+            # Entries indexed by name and numeric value
+            nameMap = {}
+            valueMap = {}
+            for elem in group.findall('enum'):
+                entry = self.enumValues[elem]
+                other = nameMap.get(entry.name)
+                if other is not None:
+                    # Duplicate enum values for the same name are benign.
+                    # This happens when defining the same enum
+                    # conditionally in several extension blocks.
+                    if not (other.value == entry.value or (entry.numVal is not None
+                                                           and entry.numVal == other.numVal)):
+                        self.gen.logMsg('warn', f'checkEnumValues: Duplicate enum ({entry.name}) found with different values:',
+                                        entry.value, 'and', other.value)
+                    continue
+                if entry.numVal in valueMap:
+                    # Aliases have no numeric value, so this is an error
+                    self.gen.logMsg('error', 'checkEnumValues: Two enums found with the same value:',
+                                    entry.name, '=', valueMap[entry.numVal].name, '=', entry.value)
+                nameMap[entry.name] = entry
+                if entry.numVal is not None:
+                    valueMap[entry.numVal] = entry
+
+    def groupBitwidth(self, group):
+        """Return the 'bitwidth' attribute of an `<enums>` Element, or 32 if
+        it is missing or invalid. Invalid values are reported when the group
+        is generated.
+
+        Intended for internal use only.
+
+        - group - `<enums>` Element"""
+        try:
+            return int(group.get('bitwidth', 32))
+        except ValueError:
+            return 32
+
+    def getEnumValue(self, elem):
+        """Return the EnumValue for an `<enum>` Element, which is computed
+        if it is not in the registry.
+
+        - elem - `<enum>` Element"""
+        entry = self.enumValues.get(elem)
+        if entry is None:
+            entry = parseEnumValue(elem, elem.get('extends'))
+        return entry
+
     def dumpReg(self, maxlen=120, filehandle=sys.stdout):
         """Dump all the dictionaries constructed from the Registry object.
 
@@ -1060,55 +1994,76 @@ class Registry:
         - typename - name of type
         - required - boolean (to tag features as required or not)
         """
-        self.gen.logMsg('diag', 'tagging type:', typename, '-> required =', required)
+        self.markTypesRequired((typename,), required)
 
-        # Get TypeInfo object for <type> tag corresponding to typename
-        typeinfo = self.lookupElementInfo(typename, self.typedict)
-        if typeinfo is not None:
-            if required:
-                # Tag type dependencies in 'alias' and 'required' attributes as
-                # required. This does not un-tag dependencies in a <remove>
-                # tag. See comments in markRequired() below for the reason.
-                for attrib_name in ['requires', 'alias']:
-                    depname = typeinfo.elem.get(attrib_name)
-                    if depname:
-                        self.gen.logMsg('diag', 'Generating dependent type',
-                                        depname, 'for', attrib_name, 'type', typename)
-                        # Do not recurse on self-referential structures.
-                        if typename != depname:
-                            self.markTypeRequired(depname, required)
-                        else:
-                            self.gen.logMsg('diag', 'type', typename, 'is self-referential')
-                # Tag types used in defining this type (e.g. in nested
-                # <type> tags)
-                # Look for <type> in entire <command> tree,
-                # not just immediate children
-                for subtype in typeinfo.elem.findall('.//type'):
-                    self.gen.logMsg('diag', 'markRequired: type requires dependent <type>', subtype.text)
-                    if typename != subtype.text:
-                        self.markTypeRequired(subtype.text, required)
-                    else:
-                        self.gen.logMsg('diag', 'type', typename, 'is self-referential')
-                # Tag enums used in defining this type, for example in
-                #   <member><name>member</name>[<enum>MEMBER_SIZE</enum>]</member>
-                for subenum in typeinfo.elem.findall('.//enum'):
-                    self.gen.logMsg('diag', 'markRequired: type requires dependent <enum>', subenum.text)
-                    self.markEnumRequired(subenum.text, required)
-                # Tag type dependency in 'bitvalues' attributes as
-                # required. This ensures that the bit values for a flag
-                # are emitted
-                depType = typeinfo.elem.get('bitvalues')
-                if depType:
+    def markTypesRequired(self, typenames, required):
+        """Require (along with their dependencies) or remove (but not their dependencies) types.
+
+        Dependencies are followed through the type and enum names
+        precomputed in each TypeInfo, using a worklist in which each type
+        is visited only once.
+
+        - typenames - sequence of type names
+        - required - boolean (to tag features as required or not)
+        """
+        # Visit types in depth-first order, as a recursive walk would
+        worklist = list(reversed(typenames))
+        visited = set()
+        visitedEnums = set()
+        while worklist:
+            typename = worklist.pop()
+            if typename in visited:
+                continue
+            visited.add(typename)
+
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'tagging type:', typename, '-> required =', required)
+
+            # Get TypeInfo object for <type> tag corresponding to typename
+            typeinfo = self.lookupElementInfo(typename, self.typedict)
+            if typeinfo is None:
+                if '.h' not in typename:
+                    self.gen.logMsg('warn', 'type:', typename, 'IS NOT DEFINED')
+                continue
+
+            typeinfo.required = required
+            if self.featureTags is not None:
+                self.featureTags.append((typeinfo, required))
+            if not required:
+                continue
+
+            # Tag type dependencies in 'alias' and 'required' attributes as
+            # required. This does not un-tag dependencies in a <remove>
+            # tag. See comments in markRequired() below for the reason.
+            # Then tag types used in defining this type (e.g. in nested
+            # <type> tags), anywhere in the <type> tree.
+            depnames = [typeinfo.elem.get('requires'), typeinfo.elem.get('alias')]
+            depnames.extend(typeinfo.subtypes)
+
+            # Tag enums used in defining this type, for example in
+            #   <member><name>member</name>[<enum>MEMBER_SIZE</enum>]</member>
+            for subenum in typeinfo.subenums:
+                if subenum not in visitedEnums:
+                    visitedEnums.add(subenum)
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', 'markRequired: type requires dependent <enum>', subenum)
+                    self.markEnumRequired(subenum, required)
+
+            # Tag type dependency in 'bitvalues' attributes as
+            # required. This ensures that the bit values for a flag
+            # are emitted
+            depType = typeinfo.elem.get('bitvalues')
+            if depType:
+                if self.gen.diag_enabled:
                     self.gen.logMsg('diag', 'Generating bitflag type',
                                     depType, 'for type', typename)
-                    self.markTypeRequired(depType, required)
-                    group = self.lookupElementInfo(depType, self.groupdict)
-                    if group is not None:
-                        group.flagType = typeinfo
+                depnames.append(depType)
+                group = self.lookupElementInfo(depType, self.groupdict)
+                if group is not None:
+                    group.flagType = typeinfo
 
-            typeinfo.required = required
-        elif '.h' not in typename:
-            self.gen.logMsg('warn', 'type:', typename, 'IS NOT DEFINED')
+            worklist.extend(depname for depname in reversed(depnames)
+                            if depname and depname not in visited)
 
     def markEnumRequired(self, enumname, required):
         """Mark an enum as required or not.
@@ -1116,7 +2071,8 @@ class Registry:
         - enumname - name of enum
         - required - boolean (to tag features as required or not)"""
 
-        self.gen.logMsg('diag', 'markEnumRequired: tagging enum:', enumname, '-> required =', required)
+        if self.gen.diag_enabled:
+            self.gen.logMsg('diag', 'markEnumRequired: tagging enum:', enumname, '-> required =', required)
         enum = self.lookupElementInfo(enumname, self.enumdict)
         if enum is not None:
             # If the enum is part of a group, and is being removed, then
@@ -1126,7 +2082,8 @@ class Registry:
             if not required:
                 groupName = enum.elem.get('extends')
                 if groupName is not None:
-                    self.gen.logMsg('diag', f'markEnumRequired: Removing extending enum {enum.elem.get("name")}')
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', f'markEnumRequired: Removing extending enum {enum.elem.get("name")}')
 
                     # Look up the Info with matching groupName
                     if groupName in self.groupdict:
@@ -1134,6 +2091,7 @@ class Registry:
                         gienum = gi.elem.find(f"enum[@name='{enumname}']")
                         if gienum is not None:
                             # Remove copy of this enum from the group
+                            self.removedEnums.append((gi.elem, list(gi.elem).index(gienum), gienum))
                             gi.elem.remove(gienum)
                         else:
                             self.gen.logMsg('warn', 'markEnumRequired: Cannot remove enum',
@@ -1150,7 +2108,8 @@ class Registry:
 
                     enumName = enum.elem.get('name')
 
-                    self.gen.logMsg('diag', f'markEnumRequired: Removing non-extending enum {enumName}')
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', f'markEnumRequired: Removing non-extending enum {enumName}')
 
                     count = 0
                     for enums in self.reg.findall('enums'):
@@ -1158,17 +2117,21 @@ class Registry:
                             if thisEnum.get('name') == enumName:
                                 # Actually remove it
                                 count = count + 1
+                                self.removedEnums.append((enums, list(enums).index(thisEnum), thisEnum))
                                 enums.remove(thisEnum)
 
                     if count == 0:
                         self.gen.logMsg('warn', f'markEnumRequired: {enumName}) not found in any <enums> tag')
 
             enum.required = required
+            if self.featureTags is not None:
+                self.featureTags.append((enum, required))
             # Tag enum dependencies in 'alias' attribute as required
             depname = enum.elem.get('alias')
             if depname:
-                self.gen.logMsg('diag', 'markEnumRequired: Generating dependent enum',
-                                depname, 'for alias', enumname, 'required =', enum.required)
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'markEnumRequired: Generating dependent enum',
+                                    depname, 'for alias', enumname, 'required =', enum.required)
                 self.markEnumRequired(depname, required)
         else:
             self.gen.logMsg('warn', f'markEnumRequired: {enumname} IS NOT DEFINED')
@@ -1178,10 +2141,13 @@ class Registry:
 
         - cmdname - name of command
         - required - boolean (to tag features as required or not)"""
-        self.gen.logMsg('diag', 'tagging command:', cmdname, '-> required =', required)
+        if self.gen.diag_enabled:
+            self.gen.logMsg('diag', 'tagging command:', cmdname, '-> required =', required)
         cmd = self.lookupElementInfo(cmdname, self.cmddict)
         if cmd is not None:
             cmd.required = required
+            if self.featureTags is not None:
+                self.featureTags.append((cmd, required))
 
             # Tag command dependencies in 'alias' attribute as required
             #
@@ -1195,8 +2161,9 @@ class Registry:
             if self.genOpts.requireCommandAliases:
                 depname = cmd.elem.get('alias')
                 if depname:
-                    self.gen.logMsg('diag', 'Generating dependent command',
-                                    depname, 'for alias', cmdname)
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', 'Generating dependent command',
+                                        depname, 'for alias', cmdname)
                     self.markCmdRequired(depname, required)
 
             # Tag all parameter types of this command as required.
@@ -1205,11 +2172,11 @@ class Registry:
             # We could be more clever and reference count types,
             # instead of using a boolean.
             if required:
-                # Look for <type> in entire <command> tree,
-                # not just immediate children
-                for type_elem in cmd.elem.findall('.//type'):
-                    self.gen.logMsg('diag', 'markRequired: command implicitly requires dependent type', type_elem.text)
-                    self.markTypeRequired(type_elem.text, required)
+                # Types in the entire <command> tree, not just immediate
+                # children, were found when the CmdInfo was created.
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'markRequired: command implicitly requires dependent types', cmd.subtypes)
+                self.markTypesRequired(cmd.subtypes, required)
         else:
             self.gen.logMsg('warn', 'command:', cmdname, 'IS NOT DEFINED')
 
@@ -1219,7 +2186,8 @@ class Registry:
         - featurename - name of the feature
         - feature - Element for `<require>` or `<remove>` tag
         - required - boolean (to tag features as required or not)"""
-        self.gen.logMsg('diag', 'markRequired (feature = <too long to print>, required =', required, ')')
+        if self.gen.diag_enabled:
+            self.gen.logMsg('diag', 'markRequired (feature = <too long to print>, required =', required, ')')
 
         # Loop over types, enums, and commands in the tag
         # @@ It would be possible to respect 'api' and 'profile' attributes
@@ -1480,33 +2448,41 @@ class Registry:
           XML <require> tag, False if it is a dependency of an explicit
           requirement."""
 
-        self.gen.logMsg('diag', 'generateFeature: generating', ftype, fname)
+        if self.gen.diag_enabled:
+            self.gen.logMsg('diag', 'generateFeature: generating', ftype, fname)
 
         if not (explicit or self.genOpts.requireDepends):
-            self.gen.logMsg('diag', 'generateFeature: NOT generating', ftype, fname, 'because generator does not require dependencies')
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'generateFeature: NOT generating', ftype, fname, 'because generator does not require dependencies')
             return
 
         f = self.lookupElementInfo(fname, dictionary)
         if f is None:
             # No such feature. This is an error, but reported earlier
-            self.gen.logMsg('diag', 'No entry found for feature', fname,
-                            'returning!')
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'No entry found for feature', fname,
+                                'returning!')
             return
 
         # If feature is not required, or has already been declared, return
         if not f.required:
-            self.gen.logMsg('diag', 'Skipping', ftype, fname, '(not required)')
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'Skipping', ftype, fname, '(not required)')
+            self.undeclaredInfos.append(f)
             return
         if f.declared:
-            self.gen.logMsg('diag', 'Skipping', ftype, fname, '(already declared)')
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'Skipping', ftype, fname, '(already declared)')
             return
         # Always mark feature declared, as though actually emitted
         f.declared = True
+        self.declaredInfos.append(f)
 
         # Determine if this is an alias, and of what, if so
         alias = f.elem.get('alias')
         if alias:
-            self.gen.logMsg('diag', fname, 'is an alias of', alias)
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', fname, 'is an alias of', alias)
 
         # Pull in dependent declaration(s) of the feature.
         # For types, there may be one type in the 'requires' attribute of
@@ -1525,36 +2501,39 @@ class Registry:
                 self.generateFeature(alias, 'type', self.typedict)
             requires = f.elem.get('requires')
             if requires:
-                self.gen.logMsg('diag', 'Generating required dependent type',
-                                requires)
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'Generating required dependent type',
+                                    requires)
                 self.generateFeature(requires, 'type', self.typedict)
 
             # Generate types used in defining this type (e.g. in nested
-            # <type> tags)
-            # Look for <type> in entire <command> tree,
-            # not just immediate children
-            for subtype in f.elem.findall('.//type'):
-                self.gen.logMsg('diag', 'Generating required dependent <type>',
-                                subtype.text)
-                self.generateFeature(subtype.text, 'type', self.typedict)
+            # <type> tags anywhere in the <type> tree)
+            for subtype in f.subtypes:
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'Generating required dependent <type>',
+                                    subtype)
+                self.generateFeature(subtype, 'type', self.typedict)
 
             # Generate enums used in defining this type, for example in
             #   <member><name>member</name>[<enum>MEMBER_SIZE</enum>]</member>
-            for subtype in f.elem.findall('.//enum'):
-                self.gen.logMsg('diag', 'Generating required dependent <enum>',
-                                subtype.text)
-                self.generateFeature(subtype.text, 'enum', self.enumdict)
+            for subenum in f.subenums:
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'Generating required dependent <enum>',
+                                    subenum)
+                self.generateFeature(subenum, 'enum', self.enumdict)
 
             # If the type is an enum group, look up the corresponding
             # group in the group dictionary and generate that instead.
             if f.elem.get('category') == 'enum':
-                self.gen.logMsg('diag', 'Type', fname, 'is an enum group, so generate that instead')
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'Type', fname, 'is an enum group, so generate that instead')
                 group = self.lookupElementInfo(fname, self.groupdict)
                 if alias is not None:
                     # An alias of another group name.
                     # Pass to genGroup with 'alias' parameter = aliased name
-                    self.gen.logMsg('diag', 'Generating alias', fname,
-                                    'for enumerated type', alias)
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', 'Generating alias', fname,
+                                        'for enumerated type', alias)
                     # Now, pass the *aliased* GroupInfo to the genGroup, but
                     # with an additional parameter which is the alias name.
                     genProc = self.gen.genGroup
@@ -1580,7 +2559,8 @@ class Registry:
 
                     enums = group.elem.findall('enum')
 
-                    self.gen.logMsg('diag', 'generateFeature: checking enums for group', fname)
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', 'generateFeature: checking enums for group', fname)
 
                     # Check for required enums, including aliases
                     # LATER - Check for, report, and remove duplicates?
@@ -1588,24 +2568,10 @@ class Registry:
                     for elem in enums:
                         name = elem.get('name')
 
-                        required = False
-
-                        extname = elem.get('extname')
-                        version = elem.get('version')
-                        if extname is not None:
-                            # 'supported' attribute was injected when the <enum> element was
-                            # moved into the <enums> group in Registry.parseTree()
-                            supported_list = elem.get('supported').split(",")
-                            if self.genOpts.defaultExtensions in supported_list:
-                                required = True
-                            elif re.match(self.genOpts.addExtensions, extname) is not None:
-                                required = True
-                        elif version is not None:
-                            required = re.match(self.genOpts.emitversions, version) is not None
-                        else:
-                            required = True
+                        required = self.isEnumSelected(elem)
 
-                        self.gen.logMsg('diag', '* required =', required, 'for', name)
+                        if self.gen.diag_enabled:
+                            self.gen.logMsg('diag', '* required =', required, 'for', name)
                         if required:
                             # Mark this element as required (in the element, not the EnumInfo)
                             elem.set('required', 'true')
@@ -1613,11 +2579,16 @@ class Registry:
                             enumAlias = elem.get('alias')
                             if enumAlias:
                                 enumAliases.append(enumAlias)
+                        else:
+                            # Clear any mark from a previous interface
+                            # generated by apiGenMulti()
+                            elem.attrib.pop('required', None)
                     for elem in enums:
                         name = elem.get('name')
                         if name in enumAliases:
                             elem.set('required', 'true')
-                            self.gen.logMsg('diag', '* also need to require alias', name)
+                            if self.gen.diag_enabled:
+                                self.gen.logMsg('diag', '* also need to require alias', name)
             if f is None:
                 raise RuntimeError("Should not get here")
             if f.elem.get('category') == 'bitmask':
@@ -1628,10 +2599,10 @@ class Registry:
                 self.generateFeature(alias, 'command', self.cmddict)
 
             genProc = self.gen.genCmd
-            for type_elem in f.elem.findall('.//type'):
-                depname = type_elem.text
-                self.gen.logMsg('diag', 'Generating required parameter type',
-                                depname)
+            for depname in f.subtypes:
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'Generating required parameter type',
+                                    depname)
                 self.generateFeature(depname, 'type', self.typedict)
         elif ftype == 'enum':
             # Generate enum dependencies in 'alias' attribute
@@ -1641,19 +2612,75 @@ class Registry:
 
         # Actually generate the type only if emitting declarations
         if self.emitFeatures:
-            self.gen.logMsg('diag', 'Emitting', ftype, 'decl for', fname)
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'Emitting', ftype, 'decl for', fname)
             if genProc is None:
                 raise RuntimeError("genProc is None when we should be emitting")
             genProc(f, fname, alias)
         else:
-            self.gen.logMsg('diag', 'Skipping', ftype, fname,
-                            '(should not be emitted)')
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'Skipping', ftype, fname,
+                                '(should not be emitted)')
 
         if followupFeature:
-            self.gen.logMsg('diag', 'Generating required bitvalues <enum>',
-                            followupFeature)
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'Generating required bitvalues <enum>',
+                                followupFeature)
             self.generateFeature(followupFeature, "type", self.typedict)
 
+    @phaseprofile.timed('select enums')
+    def selectEnumFeatures(self):
+        """Resolve which versions and extensions have their `<enum>`s
+        extending enumerated types selected by the generator options, into
+        the self.enumSelection bitset.
+
+        This is done once per apiGen(), so that isEnumSelected() is a bit
+        test rather than regexp matches for each `<enum>`. A version is
+        selected if it matches emitversions. An extension is selected if
+        its 'supported' attribute matches defaultExtensions, or its name
+        matches addExtensions."""
+        regEmitVersions = re.compile(self.genOpts.emitversions)
+        regAddExtensions = re.compile(self.genOpts.addExtensions)
+
+        self.featureBits = {}
+        self.enumSelection = 0
+        for fi in self.apidict.values():
+            bit = self.featureBits[fi.name] = 1 << len(self.featureBits)
+            if regEmitVersions.match(fi.version) is not None:
+                self.enumSelection |= bit
+        for ei in self.extdict.values():
+            bit = self.featureBits[ei.name] = 1 << len(self.featureBits)
+            if (self.genOpts.defaultExtensions in noneStr(ei.supported).split(',') or
+                    regAddExtensions.match(ei.name) is not None):
+                self.enumSelection |= bit
+
+    def isEnumSelected(self, elem):
+        """Return whether an `<enum>` in an `<enums>` group is selected by
+        the generator options, based on the version or extension which
+        added it to the group.
+
+        - elem - `<enum>` Element. The 'extname' or 'version' attribute
+          added in parseTree(), if any, names the extension or version.
+          Enums with neither attribute are always selected."""
+        extname = elem.get('extname')
+        origin = extname if extname is not None else elem.get('version')
+        if origin is None:
+            return True
+
+        bit = self.featureBits.get(origin)
+        if bit is not None:
+            return (self.enumSelection & bit) != 0
+
+        # The version or extension is not in this registry
+        if extname is not None:
+            # 'supported' attribute was injected when the <enum> element was
+            # moved into the <enums> group in Registry.parseTree()
+            supported_list = elem.get('supported').split(",")
+            if self.genOpts.defaultExtensions in supported_list:
+                return True
+            return re.match(self.genOpts.addExtensions, extname) is not None
+        return re.match(self.genOpts.emitversions, origin) is not None
+
     def generateRequiredInterface(self, interface):
         """Generate all interfaces required by an API version or extension.
 
@@ -1675,8 +2702,9 @@ class Registry:
 
     def generateSpirv(self, spirv, dictionary):
         if spirv is None:
-            self.gen.logMsg('diag', 'No entry found for element', name,
-                            'returning!')
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'No entry found for element', name,
+                                'returning!')
             return
 
         name = spirv.elem.get('name')
@@ -1689,17 +2717,18 @@ class Registry:
     def stripUnsupportedAPIs(self, dictionary, attribute, supportedDictionary):
         """Strip unsupported APIs from attributes of APIs.
            dictionary - *Info dictionary of APIs to be updated
-           attribute - attribute name to look for in each API
+           attribute - attribute name to look for in each API. The *Info
+            objects must have a tuple member of the same name, holding the
+            parsed attribute, which is updated as well as the Element.
            supportedDictionary - dictionary in which to look for supported
             API elements in the attribute"""
 
         for key in dictionary:
             eleminfo = dictionary[key]
-            attribstring = eleminfo.elem.get(attribute)
-            if attribstring is not None:
+            if eleminfo.elem.get(attribute) is not None:
                 apis = []
                 stripped = False
-                for api in attribstring.split(','):
+                for api in getattr(eleminfo, attribute):
                     ##print('Checking API {} referenced by {}'.format(api, key))
                     if api in supportedDictionary and supportedDictionary[api].required:
                         apis.append(api)
@@ -1710,7 +2739,9 @@ class Registry:
                 # Update the attribute after stripping stuff.
                 # Could sort apis before joining, but it is not a clear win
                 if stripped:
+                    self.strippedAttributes.append((eleminfo, attribute, eleminfo.elem.get(attribute)))
                     eleminfo.elem.set(attribute, ','.join(apis))
+                    setattr(eleminfo, attribute, tuple(apis))
 
     def stripUnsupportedAPIsFromList(self, dictionary, supportedDictionary):
         """Strip unsupported APIs from attributes of APIs.
@@ -1738,8 +2769,9 @@ class Registry:
 
     def generateFormat(self, format, dictionary):
         if format is None:
-            self.gen.logMsg('diag', 'No entry found for format element',
-                            'returning!')
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', 'No entry found for format element',
+                                'returning!')
             return
 
         name = format.elem.get('name')
@@ -1769,33 +2801,205 @@ class Registry:
         for typeinfo in self.typedict.values():
             type_elem = typeinfo.elem
             if typeinfo.required and type_elem.get('category') == 'struct':
-                struct_extends = type_elem.get('structextends')
-                if struct_extends is not None:
-                    for parent in struct_extends.split(','):
-                        # self.gen.logMsg('diag', type_elem.get('name'), 'extends', parent)
-                        self.validextensionstructs[parent].append(type_elem.get('name'))
+                for parent in typeinfo.structextends:
+                    # self.gen.logMsg('diag', type_elem.get('name'), 'extends', parent)
+                    self.validextensionstructs[parent].append(type_elem.get('name'))
 
         # Sort the lists so they do not depend on the XML order
         for parent in self.validextensionstructs:
             self.validextensionstructs[parent].sort()
 
+    @phaseprofile.timed('apiGen')
     def apiGen(self):
         """Generate interface for specified versions using the current
         generator and generator options"""
 
-        self.gen.logMsg('diag', '*******************************************')
-        self.gen.logMsg('diag', '  Registry.apiGen file:', self.genOpts.filename,
-                        'api:', self.genOpts.apiname,
-                        'profile:', self.genOpts.profile)
-        self.gen.logMsg('diag', '*******************************************')
-
-        # Could reset required/declared flags for all features here.
-        # This has been removed as never used. The initial motivation was
-        # the idea of calling apiGen() repeatedly for different targets, but
-        # this has never been done. The 20% or so build-time speedup that
-        # might result is not worth the effort to make it actually work.
-        #
-        # self.apiReset()
+        if self.gen.diag_enabled:
+            self.gen.logMsg('diag', '*******************************************')
+            self.gen.logMsg('diag', '  Registry.apiGen file:', self.genOpts.filename,
+                            'api:', self.genOpts.apiname,
+                            'profile:', self.genOpts.profile)
+            self.gen.logMsg('diag', '*******************************************')
+
+        # Reset all state from any previous apiGen(), so that the same
+        # Registry can generate any number of targets.
+        self.apiReset()
+
+        self.selectFeatures()
+        self.selectEnumFeatures()
+
+        # Order the features list, if a sort procedure is defined
+        orderedFeatures = list(self.genFeatures.keys())
+        if self.genOpts.sortProcedure:
+            self.genOpts.sortProcedure(orderedFeatures, self.genFeatures)
+
+        self.tagFeatures(orderedFeatures)
+
+        # Pass 3: loop over specified API versions and extensions printing
+        #   declarations for required things which have not already been
+        #   generated.
+        if self.gen.diag_enabled:
+            self.gen.logMsg('diag', 'PASS 3: GENERATE INTERFACES FOR FEATURES')
+        with phaseprofile.phase('PASS 3: generate'):
+            self.gen.beginFile(self.genOpts)
+            for name in orderedFeatures:
+                self.generateFeatureInterface(self.genFeatures[name])
+            self.generateOtherElements()
+            self.gen.endFile()
+
+    @phaseprofile.timed('apiGenMulti')
+    def apiGenMulti(self, outputs):
+        """Generate several interfaces for the same API, tagging the
+        features required by all of them in a single pass, and generating
+        each from the declarations of the features it shares with the
+        interface generated before it.
+
+        Each interface is the same as when generated by apiGen(). This is
+        intended for headers, such as vulkan_core.h and the platform
+        headers, which differ only in the versions and extensions they
+        select. Generators which use the tagging of features outside the
+        interface they generate, such as the documentation generators,
+        must use apiGen().
+
+        - outputs - list of (gen, genOpts) tuples of output generators and
+          their generator options, as for setGenerator(). Their apiname,
+          profile, requireDepends, and requireCommandAliases options must
+          be the same."""
+
+        for (gen, genOpts) in outputs[1:]:
+            for option in ('apiname', 'profile', 'requireDepends', 'requireCommandAliases'):
+                if getattr(genOpts, option) != getattr(outputs[0][1], option):
+                    raise RuntimeError(f"Cannot generate interfaces with different '{option}' options together")
+
+        self.apiReset()
+
+        # Select the features of each interface
+        selections = []
+        genFeatures = {}
+        requiredextensions = []
+        for (gen, genOpts) in outputs:
+            self.setGenerator(gen, genOpts)
+            if self.gen.diag_enabled:
+                self.gen.logMsg('diag', '*******************************************')
+                self.gen.logMsg('diag', '  Registry.apiGenMulti file:', self.genOpts.filename,
+                                'api:', self.genOpts.apiname,
+                                'profile:', self.genOpts.profile)
+                self.gen.logMsg('diag', '*******************************************')
+
+            self.requiredextensions = []
+            self.selectFeatures()
+            requiredextensions += (name for name in self.requiredextensions
+                                   if name not in requiredextensions)
+            orderedFeatures = list(self.genFeatures.keys())
+            if self.genOpts.sortProcedure:
+                self.genOpts.sortProcedure(orderedFeatures, self.genFeatures)
+            emit = {name: self.genFeatures[name].emit for name in orderedFeatures}
+            selections.append((gen, genOpts, self.genFeatures, orderedFeatures, emit))
+            genFeatures.update(self.genFeatures)
+
+        # <enum> Elements removed by a feature are removed from the
+        # registry, rather than only tagged, so the interfaces can only
+        # share tagging if they all select the features removing them.
+        for f in genFeatures.values():
+            if any(matchAPIProfile(self.genOpts.apiname, self.genOpts.profile, remove)
+                   and remove.find('enum') is not None
+                   for remove in f.elem.findall('remove')):
+                if not all(f.name in features for (_, _, features, _, _) in selections):
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', 'apiGenMulti: generating interfaces separately, since only some of them select', f.name)
+                    for (gen, genOpts) in outputs:
+                        self.setGenerator(gen, genOpts)
+                        self.apiGen()
+                    return
+
+        # Tag the union of the features once, recording the tags of each
+        featureTags = {}
+        self.genFeatures = genFeatures
+        self.requiredextensions = requiredextensions
+        self.tagFeatures(list(genFeatures.keys()), fillFeatureDictionary = False,
+                         featureTags = featureTags)
+        taggedInfos = {id(info): info for tags in featureTags.values()
+                       for (info, _) in tags[0] + tags[1]}
+        commandextensionsuccesses = self.commandextensionsuccesses
+        commandextensionerrors = self.commandextensionerrors
+
+        # Pass 3: generate each interface. Features at the start of the
+        # list of features of an interface which are the same as those of
+        # the previous interface, and which are not emitted, leave the same
+        # declarations if the elements generateFeature() visited for them
+        # are tagged the same, so are only generated once.
+        if self.gen.diag_enabled:
+            self.gen.logMsg('diag', 'PASS 3: GENERATE INTERFACES FOR FEATURES')
+        generated = []
+        for (gen, genOpts, features, orderedFeatures, emit) in selections:
+            phaseprofile.lap('PASS 3: generate')
+            self.setGenerator(gen, genOpts)
+            self.genFeatures = features
+            for name in orderedFeatures:
+                self.fillFeatureDictionary(features[name].elem, name,
+                                           self.genOpts.apiname, self.genOpts.profile)
+
+            # Replay the tags of the features of this interface, as
+            # tagFeatures() would tag them
+            for info in taggedInfos.values():
+                info.required = getattr(info, 'requiredByGroup', False)
+            for tagPass in (0, 1):
+                for name in orderedFeatures:
+                    for (info, required) in featureTags[name][tagPass]:
+                        info.required = required
+            order = {name: index for (index, name) in enumerate(orderedFeatures)}
+            self.commandextensionsuccesses = sorted(
+                (t for t in commandextensionsuccesses if t.extension in order),
+                key = lambda t: order[t.extension])
+            self.commandextensionerrors = sorted(
+                (t for t in commandextensionerrors if t.extension in order),
+                key = lambda t: order[t.extension])
+            self.restoreStrippedAttributes()
+            self.validextensionstructs = defaultdict(list)
+            self.stripUnrequiredAPIs()
+            self.selectEnumFeatures()
+
+            shared = 0
+            while (shared < len(generated) and shared < len(orderedFeatures) and
+                   generated[shared][0] == orderedFeatures[shared] and
+                   not emit[orderedFeatures[shared]]):
+                (_, declared, undeclared) = generated[shared]
+                (_, nextDeclared, nextUndeclared) = (generated[shared + 1]
+                    if shared + 1 < len(generated)
+                    else (None, len(self.declaredInfos), len(self.undeclaredInfos)))
+                if not (all(info.required for info in self.declaredInfos[declared:nextDeclared]) and
+                        not any(info.required for info in self.undeclaredInfos[undeclared:nextUndeclared])):
+                    break
+                shared += 1
+            if shared < len(generated):
+                # Forget the declarations of the other features
+                (_, declared, undeclared) = generated[shared]
+                for info in self.declaredInfos[declared:]:
+                    info.declared = False
+                del self.declaredInfos[declared:]
+                del self.undeclaredInfos[undeclared:]
+                del generated[shared:]
+
+            self.gen.beginFile(self.genOpts)
+            for (index, name) in enumerate(orderedFeatures):
+                f = features[name]
+                f.emit = emit[name]
+                if index < len(generated):
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', 'PASS 3: Already generated', name)
+                    self.gen.beginFeature(f.elem, f.emit)
+                    self.gen.endFeature()
+                else:
+                    generated.append((name, len(self.declaredInfos), len(self.undeclaredInfos)))
+                    self.generateFeatureInterface(f)
+            self.generateOtherElements()
+            self.gen.endFile()
+
+    @phaseprofile.timed('select features')
+    def selectFeatures(self):
+        """Select the versions and extensions to generate, by the current
+        generator options, into self.genFeatures, and set their emit
+        attributes."""
 
         # Compile regexps used to select versions & extensions
         regVersions = re.compile(self.genOpts.versions)
@@ -1803,8 +3007,6 @@ class Registry:
         regAddExtensions = re.compile(self.genOpts.addExtensions)
         regRemoveExtensions = re.compile(self.genOpts.removeExtensions)
         regEmitExtensions = re.compile(self.genOpts.emitExtensions)
-        regEmitSpirv = re.compile(self.genOpts.emitSpirv)
-        regEmitFormats = re.compile(self.genOpts.emitFormats)
 
         # Get all matching API feature names & add to list of FeatureInfo
         # Note we used to select on feature version attributes, not names.
@@ -1822,21 +3024,25 @@ class Registry:
                     fi.emit = (regEmitVersions.match(fi.name) is not None)
                     self.genFeatures[fi.name] = fi
                     if not fi.emit:
-                        self.gen.logMsg('diag', 'NOT tagging feature api =', api,
-                                        'name =', fi.name, 'version =', fi.version,
-                                        'for emission (does not match emitversions pattern)')
+                        if self.gen.diag_enabled:
+                            self.gen.logMsg('diag', 'NOT tagging feature api =', api,
+                                            'name =', fi.name, 'version =', fi.version,
+                                            'for emission (does not match emitversions pattern)')
                     else:
-                        self.gen.logMsg('diag', 'Including feature api =', api,
-                                        'name =', fi.name, 'version =', fi.version,
-                                        'for emission (matches emitversions pattern)')
+                        if self.gen.diag_enabled:
+                            self.gen.logMsg('diag', 'Including feature api =', api,
+                                            'name =', fi.name, 'version =', fi.version,
+                                            'for emission (matches emitversions pattern)')
                 else:
-                    self.gen.logMsg('diag', 'NOT including feature api =', api,
-                                    'name =', fi.name, 'version =', fi.version,
-                                    '(does not match requested versions)')
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', 'NOT including feature api =', api,
+                                        'name =', fi.name, 'version =', fi.version,
+                                        '(does not match requested versions)')
             else:
-                self.gen.logMsg('diag', 'NOT including feature api =', api,
-                                'name =', fi.name,
-                                '(does not match requested API)')
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'NOT including feature api =', api,
+                                    'name =', fi.name,
+                                    '(does not match requested API)')
         if not apiMatch:
             self.gen.logMsg('warn', 'No matching API versions found!')
 
@@ -1854,8 +3060,9 @@ class Registry:
             # exactly matched by the 'supported' attribute.
             if apiNameMatch(self.genOpts.defaultExtensions,
                             ei.elem.get('supported')):
-                self.gen.logMsg('diag', 'Including extension',
-                                extName, "(defaultExtensions matches the 'supported' attribute)")
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'Including extension',
+                                    extName, "(defaultExtensions matches the 'supported' attribute)")
                 include = True
 
             # Include additional extensions if the extension name matches
@@ -1865,20 +3072,23 @@ class Registry:
             # However, we still respect the 'supported' attribute.
             if regAddExtensions.match(extName) is not None:
                 if not apiNameMatch(self.genOpts.apiname, ei.elem.get('supported')):
-                    self.gen.logMsg('diag', 'NOT including extension',
-                                    extName, '(matches explicitly requested, but does not match the \'supported\' attribute)')
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', 'NOT including extension',
+                                        extName, '(matches explicitly requested, but does not match the \'supported\' attribute)')
                     include = False
                 else:
-                    self.gen.logMsg('diag', 'Including extension',
-                                    extName, '(matches explicitly requested extensions to add)')
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', 'Including extension',
+                                        extName, '(matches explicitly requested extensions to add)')
                     include = True
             # Remove extensions if the name matches the regexp specified
             # in generator options. This allows forcing removal of
             # extensions from an interface even if they are tagged that
             # way in the registry.
             if regRemoveExtensions.match(extName) is not None:
-                self.gen.logMsg('diag', 'Removing extension',
-                                extName, '(matches explicitly requested extensions to remove)')
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'Removing extension',
+                                    extName, '(matches explicitly requested extensions to remove)')
                 include = False
 
             # If the extension is to be included, add it to the
@@ -1888,42 +3098,32 @@ class Registry:
                 ei.emit = (regEmitExtensions.match(extName) is not None)
                 self.genFeatures[ei.name] = ei
                 if not ei.emit:
-                    self.gen.logMsg('diag', 'NOT tagging extension',
-                                    extName,
-                                    'for emission (does not match emitextensions pattern)')
+                    if self.gen.diag_enabled:
+                        self.gen.logMsg('diag', 'NOT tagging extension',
+                                        extName,
+                                        'for emission (does not match emitextensions pattern)')
 
                 # Hack - can be removed when validity generator goes away
                 # (Jon) I am not sure what this does, or if it should
                 # respect the ei.emit flag above.
                 self.requiredextensions.append(extName)
             else:
-                self.gen.logMsg('diag', 'NOT including extension',
-                                extName, '(does not match api attribute or explicitly requested extensions)')
-
-        # Add all spirv elements to list
-        # generators decide to emit them all or not
-        # Currently no filtering as no client of these elements needs filtering
-        spirvexts = []
-        for key in self.spirvextdict:
-            si = self.spirvextdict[key]
-            si.emit = (regEmitSpirv.match(key) is not None)
-            spirvexts.append(si)
-        spirvcaps = []
-        for key in self.spirvcapdict:
-            si = self.spirvcapdict[key]
-            si.emit = (regEmitSpirv.match(key) is not None)
-            spirvcaps.append(si)
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'NOT including extension',
+                                    extName, '(does not match api attribute or explicitly requested extensions)')
 
-        formats = []
-        for key in self.formatsdict:
-            si = self.formatsdict[key]
-            si.emit = (regEmitFormats.match(key) is not None)
-            formats.append(si)
+    def tagFeatures(self, orderedFeatures, fillFeatureDictionary=True, featureTags=None):
+        """Tag types / commands / features required and removed by the
+        selected versions and extensions.
 
-        # Order the features list, if a sort procedure is defined
-        orderedFeatures = list(self.genFeatures.keys())
-        if self.genOpts.sortProcedure:
-            self.genOpts.sortProcedure(orderedFeatures, self.genFeatures)
+        - orderedFeatures - names of the features in self.genFeatures, in
+          order
+        - fillFeatureDictionary - whether to fill the feature dictionary of
+          the current generator
+        - featureTags - if not None, dictionary in which to record the
+          tags of each feature, as a tuple of lists of the (info, required)
+          tuples tagged by its `<require>` and `<remove>` tags, indexed by
+          feature name"""
 
         # Passes 1+2: loop over requested API versions and extensions tagging
         #   types/commands/features as required (in an <require> block) or no
@@ -1932,18 +3132,37 @@ class Registry:
         # If a profile other than 'None' is being generated, it must
         #   match the profile attribute (if any) of the <require> and
         #   <remove> tags.
-        self.gen.logMsg('diag', 'PASS 1: TAG FEATURES')
-        for f in (self.genFeatures[name] for name in orderedFeatures):
-            self.gen.logMsg('diag', 'PASS 1: Tagging required and features for', f.name)
-            self.fillFeatureDictionary(f.elem, f.name, self.genOpts.apiname, self.genOpts.profile)
-            self.requireFeatures(f.elem, f.name, self.genOpts.apiname, self.genOpts.profile)
-            self.deprecateFeatures(f.elem, f.name, self.genOpts.apiname, self.genOpts.profile)
-            self.assignAdditionalValidity(f.elem, self.genOpts.apiname, self.genOpts.profile)
-
-        for f in (self.genFeatures[name] for name in orderedFeatures):
-            self.gen.logMsg('diag', 'PASS 2: Tagging removed features for', f.name)
-            self.removeFeatures(f.elem, f.name, self.genOpts.apiname, self.genOpts.profile)
-            self.removeAdditionalValidity(f.elem, self.genOpts.apiname, self.genOpts.profile)
+        if self.gen.diag_enabled:
+            self.gen.logMsg('diag', 'PASS 1: TAG FEATURES')
+        with phaseprofile.phase('PASS 1: tag'):
+            for f in (self.genFeatures[name] for name in orderedFeatures):
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'PASS 1: Tagging required and features for', f.name)
+                if fillFeatureDictionary:
+                    self.fillFeatureDictionary(f.elem, f.name, self.genOpts.apiname, self.genOpts.profile)
+                if featureTags is not None:
+                    self.featureTags = featureTags.setdefault(f.name, ([], []))[0]
+                self.requireFeatures(f.elem, f.name, self.genOpts.apiname, self.genOpts.profile)
+                self.featureTags = None
+                self.deprecateFeatures(f.elem, f.name, self.genOpts.apiname, self.genOpts.profile)
+                self.assignAdditionalValidity(f.elem, self.genOpts.apiname, self.genOpts.profile)
+
+        with phaseprofile.phase('PASS 2: remove'):
+            for f in (self.genFeatures[name] for name in orderedFeatures):
+                if self.gen.diag_enabled:
+                    self.gen.logMsg('diag', 'PASS 2: Tagging removed features for', f.name)
+                if featureTags is not None:
+                    self.featureTags = featureTags[f.name][1]
+                self.removeFeatures(f.elem, f.name, self.genOpts.apiname, self.genOpts.profile)
+                self.featureTags = None
+                self.removeAdditionalValidity(f.elem, self.genOpts.apiname, self.genOpts.profile)
+
+        self.stripUnrequiredAPIs()
+
+    @phaseprofile.timed('stripUnsupportedAPIs')
+    def stripUnrequiredAPIs(self):
+        """Strip references to APIs which are not tagged as required, and
+        construct the lists of valid extension structures."""
 
         # Now, strip references to APIs that are not required.
         # At present such references may occur in:
@@ -1964,47 +3183,96 @@ class Registry:
         #   <enable extension="VK_KHR_shader_draw_parameters"/>
         #   <enable property="VkPhysicalDeviceVulkan12Properties" member="shaderDenormPreserveFloat16" value="VK_TRUE" requires="VK_VERSION_1_2,VK_KHR_shader_float_controls"/>
 
-        # Pass 3: loop over specified API versions and extensions printing
-        #   declarations for required things which have not already been
-        #   generated.
-        self.gen.logMsg('diag', 'PASS 3: GENERATE INTERFACES FOR FEATURES')
-        self.gen.beginFile(self.genOpts)
-        for f in (self.genFeatures[name] for name in orderedFeatures):
+    def generateFeatureInterface(self, f):
+        """Generate the interface of a version or extension, or just tag
+        its elements as declared if it is not emitted.
+
+        - f - FeatureInfo or ExtensionInfo"""
+        if self.gen.diag_enabled:
             self.gen.logMsg('diag', 'PASS 3: Generating interface for',
                             f.name)
-            emit = self.emitFeatures = f.emit
-            if not emit:
+        emit = self.emitFeatures = f.emit
+        if not emit:
+            if self.gen.diag_enabled:
                 self.gen.logMsg('diag', 'PASS 3: NOT declaring feature',
                                 f.elem.get('name'), 'because it is not tagged for emission')
-            # Generate the interface (or just tag its elements as having been
-            # emitted, if they have not been).
-            self.gen.beginFeature(f.elem, emit)
-            self.generateRequiredInterface(f.elem)
-            self.gen.endFeature()
-        # Generate spirv elements
-        for s in spirvexts:
-            self.generateSpirv(s, self.spirvextdict)
-        for s in spirvcaps:
-            self.generateSpirv(s, self.spirvcapdict)
-        for s in formats:
-            self.generateFormat(s, self.formatsdict)
+        # Generate the interface (or just tag its elements as having been
+        # emitted, if they have not been).
+        self.gen.beginFeature(f.elem, emit)
+        self.generateRequiredInterface(f.elem)
+        self.gen.endFeature()
+
+    def generateOtherElements(self):
+        """Generate the SPIR-V, format, and synchronization elements
+        selected by the current generator options."""
+
+        # Add all spirv elements to list
+        # generators decide to emit them all or not
+        # Currently no filtering as no client of these elements needs filtering
+        regEmitSpirv = re.compile(self.genOpts.emitSpirv)
+        regEmitFormats = re.compile(self.genOpts.emitFormats)
+        for key in self.spirvextdict:
+            si = self.spirvextdict[key]
+            si.emit = (regEmitSpirv.match(key) is not None)
+            self.generateSpirv(si, self.spirvextdict)
+        for key in self.spirvcapdict:
+            si = self.spirvcapdict[key]
+            si.emit = (regEmitSpirv.match(key) is not None)
+            self.generateSpirv(si, self.spirvcapdict)
+        for key in self.formatsdict:
+            si = self.formatsdict[key]
+            si.emit = (regEmitFormats.match(key) is not None)
+            self.generateFormat(si, self.formatsdict)
         for s in self.syncstagedict:
             self.generateSyncStage(self.syncstagedict[s])
         for s in self.syncaccessdict:
             self.generateSyncAccess(self.syncaccessdict[s])
         for s in self.syncpipelinedict:
             self.generateSyncPipeline(self.syncpipelinedict[s])
-        self.gen.endFile()
 
+    def restoreStrippedAttributes(self):
+        """Undo the changes stripUnsupportedAPIs() made to attributes."""
+        for (info, attribute, value) in reversed(self.strippedAttributes):
+            info.elem.set(attribute, value)
+            setattr(info, attribute, splitAttribute(info.elem, attribute))
+        self.strippedAttributes = []
+
+    @phaseprofile.timed('apiReset')
     def apiReset(self):
-        """Reset type/enum/command dictionaries before generating another API.
-
-        Use between apiGen() calls to reset internal state."""
-        for datatype in self.typedict:
-            self.typedict[datatype].resetState()
-        for enum in self.enumdict:
-            self.enumdict[enum].resetState()
-        for cmd in self.cmddict:
-            self.cmddict[cmd].resetState()
-        for cmd in self.apidict:
-            self.apidict[cmd].resetState()
+        """Reset the registry to its state after parsing, before generating
+        another API interface.
+
+        This resets the state of all *Info objects, the lists and
+        dictionaries built by apiGen(), and the changes apiGen() makes to
+        the registry Elements. It is called by apiGen(), so that one
+        Registry can be used to generate any number of targets."""
+        for dictionary in (self.typedict, self.groupdict, self.enumdict,
+                           self.cmddict, self.apidict, self.extdict,
+                           self.spirvextdict, self.spirvcapdict,
+                           self.formatsdict, self.syncstagedict,
+                           self.syncaccessdict, self.syncpipelinedict):
+            for info in dictionary.values():
+                info.resetState()
+
+        self.genFeatures = {}
+        self.emitFeatures = False
+        self.requiredextensions = []
+        self.validextensionstructs = defaultdict(list)
+        self.commandextensionsuccesses = []
+        self.commandextensionerrors = []
+        self.featureBits = {}
+        self.enumSelection = 0
+        self.declaredInfos = []
+        self.undeclaredInfos = []
+
+        # Undo changes to Elements, most recent first
+        for (parent, index, elem) in reversed(self.removedEnums):
+            parent.insert(index, elem)
+        self.removedEnums = []
+
+        self.restoreStrippedAttributes()
+
+        # generateFeature() marks selected enums in <enums> groups
+        for group in self.groupdict.values():
+            for elem in group.elem.findall('enum'):
+                elem.attrib.pop('required', None)
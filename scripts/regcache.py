@@ -0,0 +1,232 @@
+#!/usr/bin/env python3 -i
+#
+# Copyright 2025 The Khronos Group Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Persistent on-disk cache of parsed registry state.
+
+Registry.parseTree() is run for every target generated from the XML, and
+most of its cost is in XML parsing and the API stripping / merging tree
+passes. The cache stores the state parseTree() produces so that later runs
+on an unchanged registry can restore it without parsing any XML.
+
+The element tree is stored as nested tuples serialized with `marshal`,
+which rebuilds much faster than either XML parsing or pickling Element
+objects. The Registry dictionaries are pickled, with references to
+Elements replaced by their index in a preorder walk of the stored trees.
+
+Cache entries are keyed by a hash of the registry file contents, the
+options affecting parseTree(), and the source of the parsing code itself,
+so a stale entry is never used. Entries are written to a temporary file
+in the cache directory and renamed into place, so concurrent readers and
+writers (as in a parallel make) never see a partial entry. Loading an
+entry marks it as recently used, and the least recently used entries are
+removed when there are more than maxEntries.
+
+The cache is only an optimization, so failing to write an entry is a
+warning rather than an error."""
+
+import gc
+import hashlib
+import io
+import marshal
+import os
+import pickle
+import sys
+import tempfile
+import xml.etree.ElementTree as etree
+
+CACHE_VERSION = 2
+"Version of the cache file layout. Increment on incompatible changes."
+
+CACHE_SUFFIX = '.regcache'
+
+
+def _encodeTree(elem, index):
+    """Return a nested tuple representation of an Element tree, suitable
+    for marshal, adding each element to the index dictionary in preorder.
+
+    Elements already in the index, such as parameters shared by command
+    aliases, are represented by their preorder number, so they are still
+    shared when the tree is decoded.
+
+    - elem - Element at the root of the tree
+    - index - dictionary mapping Elements to their preorder number"""
+    if elem in index:
+        return index[elem]
+    index[elem] = len(index)
+    children = tuple(_encodeTree(child, index) for child in elem)
+    return (elem.tag, elem.attrib or None, elem.text, elem.tail, children or None)
+
+
+def _decodeTree(node, elements):
+    """Rebuild an Element tree from the representation made by _encodeTree,
+    appending each Element to the elements list in preorder.
+
+    - node - nested tuple representation of the tree, or the preorder
+      number of an Element already decoded
+    - elements - list of Elements, indexed by preorder number"""
+    if isinstance(node, int):
+        return elements[node]
+    tag, attrib, text, tail, children = node
+    elem = etree.Element(tag, attrib) if attrib else etree.Element(tag)
+    elem.text = text
+    elem.tail = tail
+    elements.append(elem)
+    if children:
+        elem.extend([_decodeTree(child, elements) for child in children])
+    return elem
+
+
+class _StatePickler(pickle.Pickler):
+    """Pickler replacing Elements with their preorder numbers.
+
+    Elements not in the registry tree, such as the copies made for command
+    aliases, are encoded as additional detached trees."""
+
+    def __init__(self, file, index):
+        pickle.Pickler.__init__(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.index = index
+        self.detached = []
+
+    def persistent_id(self, obj):
+        if isinstance(obj, etree.Element):
+            if obj not in self.index:
+                self.detached.append(_encodeTree(obj, self.index))
+            return self.index[obj]
+        return None
+
+
+class _StateUnpickler(pickle.Unpickler):
+    """Unpickler restoring Elements from their preorder numbers."""
+
+    def __init__(self, file, elements):
+        pickle.Unpickler.__init__(self, file)
+        self.elements = elements
+
+    def persistent_load(self, pid):
+        return self.elements[pid]
+
+
+class RegistryCache:
+    """Directory of cached parsed registries."""
+
+    def __init__(self, directory, maxEntries=8):
+        """Constructor.
+
+        - directory - directory holding cache entries. Created on the first
+          store if it does not exist.
+        - maxEntries - number of entries kept when a new entry is stored"""
+        self.directory = directory
+        self.maxEntries = maxEntries
+
+    def makeKey(self, data, genOpts, sources=()):
+        """Return the cache key for a registry.
+
+        - data - contents of the registry XML file, as bytes
+        - genOpts - GeneratorOptions used to parse the registry. Only the
+          options affecting Registry.parseTree() are part of the key.
+        - sources - paths of source files implementing the parsing, so
+          changes to the scripts also invalidate the cache"""
+        digest = hashlib.sha256()
+        digest.update(f'{CACHE_VERSION}\0'.encode())
+        digest.update(data)
+        options = (genOpts.apiname,
+                   genOpts.mergeApiNames,
+                   getattr(genOpts, 'mergeInternalApis', True))
+        digest.update(repr(options).encode())
+        for source in sources:
+            with open(source, 'rb') as fp:
+                digest.update(fp.read())
+        return digest.hexdigest()
+
+    def path(self, key):
+        """Return the path of the cache entry for a key."""
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def load(self, key):
+        """Return the cached (root, state) for a key, or None if there is
+        no valid entry.
+
+        - root - root Element of the registry tree
+        - state - dictionary of Registry attribute names and values"""
+        # Decoding allocates many objects, none of them garbage, so cyclic
+        # garbage collection during the load is pure overhead.
+        gcEnabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.path(key), 'rb') as fp:
+                (version, entryKey, trees, state) = pickle.load(fp)
+            if version != CACHE_VERSION or entryKey != key:
+                return None
+            elements = []
+            (root, *_) = [_decodeTree(node, elements) for node in marshal.loads(trees)]
+            state = _StateUnpickler(io.BytesIO(state), elements).load()
+            os.utime(self.path(key))
+        except Exception:
+            # Missing, truncated, or incompatible entries are all misses
+            return None
+        finally:
+            if gcEnabled:
+                gc.enable()
+        return (root, state)
+
+    def store(self, key, root, state):
+        """Write a cache entry, and remove the least recently used entries
+        beyond maxEntries. A warning is printed if the entry cannot be
+        written.
+
+        - key - cache key from makeKey()
+        - root - root Element of the registry tree
+        - state - dictionary of Registry attribute names and values. May
+          refer to Elements inside or outside the tree under root."""
+        try:
+            index = {}
+            trees = [_encodeTree(root, index)]
+            statefile = io.BytesIO()
+            pickler = _StatePickler(statefile, index)
+            pickler.dump(state)
+            trees.extend(pickler.detached)
+
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as fp:
+                    pickle.dump((CACHE_VERSION, key, marshal.dumps(trees), statefile.getvalue()),
+                                fp, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpname, self.path(key))
+            except BaseException:
+                os.remove(tmpname)
+                raise
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as error:
+            # pickle raises any of the last three for objects which cannot
+            # be pickled
+            print(f'WARNING: Could not cache the parsed registry in {self.directory}: {error}',
+                  file=sys.stderr)
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries beyond maxEntries."""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError as error:
+            print(f'WARNING: Could not evict parsed registry cache entries in {self.directory}: {error}',
+                  file=sys.stderr)
+            return
+        for name in names:
+            if name.endswith(CACHE_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    # Removed by another process
+                    pass
+        entries.sort(reverse=True)
+        for (_, path) in entries[self.maxEntries:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -5,6 +5,7 @@
 # SPDX-License-Identifier: Apache-2.0
 """Utilities for working with attributes of the XML registry."""
 
+import functools
 import re
 
 _PARAM_REF_NAME_RE = re.compile(
@@ -77,7 +78,7 @@ class LengthEntry:
         len_str = param.get('len')
         if len_str is None:
             return None
-        return [LengthEntry(elt) for elt in len_str.split(',')]
+        return list(_parse_len(len_str))
 
 
 class ExternSyncEntry:
@@ -114,7 +115,7 @@ class ExternSyncEntry:
         sync_str = param.get('externsync')
         if sync_str is None:
             return None
-        return [ExternSyncEntry(elt) for elt in sync_str.split(',')]
+        return list(_parse_externsync(sync_str))
 
     def __repr__(self):
         "Formats an object for repr(), debugger display, etc."
@@ -131,10 +132,29 @@ def _parse_optional_elt(val):
     return val == _TRUE_STRING
 
 
+# The same attribute values occur many times in the registry, so each
+# distinct value is only parsed once. The parsed entries are not modified
+# by their users, so they can be shared.
+
+@functools.lru_cache(maxsize=None)
+def _parse_len(len_str):
+    return tuple(LengthEntry(elt) for elt in len_str.split(','))
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_externsync(sync_str):
+    return tuple(ExternSyncEntry(elt) for elt in sync_str.split(','))
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_optional(optional_str):
+    return tuple(_parse_optional_elt(elt) for elt in optional_str.split(','))
+
+
 def parse_optional_from_param(param):
     """Get a list of booleans from a param: always returns at least one element."""
     optional_str = param.get('optional', _FALSE_STRING)
-    return [_parse_optional_elt(elt) for elt in optional_str.split(',')]
+    return list(_parse_optional(optional_str))
 
 
 def has_any_optional_in_param(param):
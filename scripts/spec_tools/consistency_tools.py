@@ -395,7 +395,7 @@ class XMLChecker:
 
             # Check structextends attribute, if present.
             # For Vulkan, this may be a comma-separated list of multiple types
-            for type in info.elem.get("structextends", '').split(','):
+            for type in info.structextends:
                 self.check_referenced_type("'structextends' attribute", type)
 
             # Check parentstruct attribute, if present.
@@ -442,17 +442,8 @@ class XMLChecker:
         self.check_params(elem.findall('param'))
 
         # Some minimal return code checking
-        errorcodes = elem.get("errorcodes")
-        if errorcodes:
-            errorcodes = errorcodes.split(",")
-        else:
-            errorcodes = []
-
-        successcodes = elem.get("successcodes")
-        if successcodes:
-            successcodes = successcodes.split(",")
-        else:
-            successcodes = []
+        errorcodes = info.errorcodes
+        successcodes = info.successcodes
 
         if not successcodes and not errorcodes:
             # Early out if no return codes.
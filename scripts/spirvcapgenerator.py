@@ -209,7 +209,7 @@ class SpirvCapabilityOutputGenerator(OutputGenerator):
 
         filename = f"{self.genOpts.directory}/{basename}"
         self.logMsg('diag', '# Generating include file:', filename)
-        with open(filename, 'w', encoding='utf-8') as fp:
+        with self.openFile(filename) as fp:
             write(self.genOpts.conventions.warning_comment, file=fp)
 
             if len(contents) > 0:
@@ -62,7 +62,7 @@ class SyncOutputGenerator(OutputGenerator):
         dirname = os.path.dirname(filename)
         if not os.path.exists(dirname):
             os.makedirs(dirname)
-        with open(filename, 'w', encoding='utf-8') as fp:
+        with self.openFile(filename) as fp:
             write(self.genOpts.conventions.warning_comment, file=fp)
 
             if len(contents) > 0:
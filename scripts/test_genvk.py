@@ -0,0 +1,229 @@
+#!/usr/bin/env python3 -i
+#
+# Copyright 2025 The Khronos Group Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+
+registry_path = os.path.abspath((os.path.dirname(__file__)))
+sys.path.insert(0, registry_path)
+from genvkclient import sendRequest
+
+xml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'vk.xml'))
+genvk_path = os.path.join(registry_path, 'genvk.py')
+
+def compareDirectories(expected, actual):
+    files = sorted(os.path.relpath(os.path.join(root, name), expected)
+                   for (root, _, names) in os.walk(expected) for name in names)
+    assert files
+    (match, mismatch, errors) = filecmp.cmpfiles(expected, actual, files, shallow = False)
+    assert mismatch == [] and errors == []
+
+def testLazyTargets():
+    # Only the generator module of the selected target is imported
+    script = """if True:
+        import sys
+        import genvk
+        args = genvk.parseArgs(['-o', '.', 'vulkan_core.h'])
+        genvk.makeGenOpts(args)
+        assert 'cgenerator' not in sys.modules
+        (createGenerator, options) = genvk.genOpts['vulkan_core.h']
+        assert options.filename == 'vulkan_core.h'
+        assert 'cgenerator' in sys.modules
+        assert 'docgenerator' not in sys.modules
+        (createGenerator, options) = genvk.genOpts['apiinc']
+        assert createGenerator.__name__ == 'DocOutputGenerator'
+        assert genvk.genOpts['apiinc'][1] is options
+        """
+    subprocess.run([sys.executable, '-c', script], cwd = registry_path, check = True)
+
+def testUnchangedOutputs(tmp_path):
+    # Files whose contents do not change are not rewritten, except for the
+    # file used as the Makefile target
+    def generate():
+        subprocess.run([sys.executable, genvk_path, '-registry', xml_path,
+                        '-o', str(tmp_path), 'hostsyncinc'], check = True)
+
+    generate()
+    parameters = tmp_path / 'parameters.adoc'
+    contents = parameters.read_text(encoding = 'utf-8')
+    os.utime(parameters, ns = (0, 0))
+    os.utime(tmp_path / 'timeMarker', ns = (0, 0))
+    (tmp_path / 'implicit.adoc').write_text('edited', encoding = 'utf-8')
+
+    generate()
+    assert parameters.stat().st_mtime_ns == 0
+    assert (tmp_path / 'timeMarker').stat().st_mtime_ns != 0
+    assert (tmp_path / 'implicit.adoc').read_text(encoding = 'utf-8') != 'edited'
+    assert parameters.read_text(encoding = 'utf-8') == contents
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'implicit.adoc', 'parameterlists.adoc', 'parameters.adoc', 'timeMarker']
+
+    # A target generating a single file is not touched if it is unchanged
+    def generateHeader():
+        subprocess.run([sys.executable, genvk_path, '-registry', xml_path,
+                        '-o', str(tmp_path), 'vulkan_core.h'], check = True)
+
+    generateHeader()
+    header = tmp_path / 'vulkan_core.h'
+    os.utime(header, ns = (0, 0))
+    generateHeader()
+    assert header.stat().st_mtime_ns == 0
+
+def testDependencies(tmp_path):
+    # The depfile and manifest list the registry and every file generated
+    depfile = tmp_path / 'hostsync.d'
+    manifest = tmp_path / 'hostsync.json'
+    subprocess.run([sys.executable, genvk_path, '-registry', xml_path,
+                    '-o', str(tmp_path / 'hostsync'), '-targets', 'hostsyncinc',
+                    '-depfile', str(depfile), '-manifest', str(manifest)], check = True)
+
+    contents = json.loads(manifest.read_text(encoding = 'utf-8'))
+    assert list(contents['inputs']) == [xml_path]
+    outputs = sorted(str(path) for path in (tmp_path / 'hostsync').iterdir())
+    assert sorted(contents['outputs']) == outputs
+    for (path, digest) in contents['outputs'].items():
+        with open(path, 'rb') as fp:
+            assert hashlib.sha256(fp.read()).hexdigest() == digest
+
+    rule = depfile.read_text(encoding = 'utf-8').replace('\\\n', '')
+    (targets, inputs) = rule.split(':')
+    assert sorted(targets.split()) == outputs
+    assert inputs.split() == [xml_path]
+
+def testTrace(tmp_path):
+    # Phases of the registry and generators are timed in worker processes
+    trace = tmp_path / 'trace.json'
+    result = subprocess.run([sys.executable, genvk_path, '-registry', xml_path, '-j', '2',
+                             '-targets', f'hostsyncinc={tmp_path / "hostsync"},vulkan_core.h={tmp_path}',
+                             '-trace', str(trace)], check = True, capture_output = True, text = True)
+
+    events = json.loads(trace.read_text(encoding = 'utf-8'))['traceEvents']
+    phases = [event for event in events if event['ph'] == 'X']
+    names = set(event['name'] for event in phases)
+    for name in ('parseTree', 'apiGen', 'PASS 1: tag', 'PASS 3: generate', 'genCmd', 'write file'):
+        assert name in names
+    assert len(set(event['pid'] for event in phases)) == 3
+    assert all(event['dur'] >= 0 for event in phases)
+
+    # The summary nests callbacks in the phase which called them
+    summary = result.stderr.splitlines()
+    assert summary[0].split()[0] == 'Phase'
+    assert any(line.startswith('      genCmd ') for line in summary)
+
+def startServer(socketPath):
+    server = subprocess.Popen([sys.executable, genvk_path, '--serve', socketPath])
+    for _ in range(100):
+        if os.path.exists(socketPath):
+            break
+        time.sleep(0.1)
+    return server
+
+def testServe(tmp_path):
+    registry = tmp_path / 'vk.xml'
+    shutil.copy(xml_path, registry)
+    socketPath = str(tmp_path / 'genvk.sock')
+
+    def generate(directory):
+        (tmp_path / directory).mkdir()
+        subprocess.run([sys.executable, genvk_path, '-registry', str(registry),
+                        '-o', str(tmp_path / directory), 'hostsyncinc'], check = True)
+
+    server = startServer(socketPath)
+    try:
+        generate('fresh')
+        for directory in ('served', 'served-again'):
+            (status, output) = sendRequest(socketPath, ['-registry', 'vk.xml', '-o', directory, 'hostsyncinc'], str(tmp_path))
+            assert status == 0, output
+            compareDirectories(tmp_path / 'fresh', tmp_path / directory)
+
+        # An edited registry is reloaded
+        text = registry.read_text(encoding = 'utf-8')
+        registry.write_text(text.replace('<param externsync="true"><type>VkCommandBuffer</type> <name>commandBuffer</name></param>',
+                                         '<param><type>VkCommandBuffer</type> <name>commandBuffer</name></param>', 1),
+                            encoding = 'utf-8')
+        generate('fresh-edited')
+        (status, output) = sendRequest(socketPath, ['-registry', 'vk.xml', '-o', 'served-edited', 'hostsyncinc'], str(tmp_path))
+        assert status == 0, output
+        compareDirectories(tmp_path / 'fresh-edited', tmp_path / 'served-edited')
+        assert not filecmp.cmp(tmp_path / 'fresh' / 'parameters.adoc', tmp_path / 'fresh-edited' / 'parameters.adoc', shallow = False)
+
+        (status, output) = sendRequest(socketPath, ['-registry', 'vk.xml', 'nosuchtarget'], str(tmp_path))
+        assert status != 0 and 'nosuchtarget' in output
+    finally:
+        server.terminate()
+        server.wait()
+    assert not os.path.exists(socketPath)
+    assert sendRequest(socketPath, [], str(tmp_path)) is None
+
+def testServeSocketPermissions(tmp_path, monkeypatch):
+    import genvkclient
+
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path / 'runtime'))
+    assert genvkclient.defaultSocketPath() == str(tmp_path / 'runtime' / 'genvk.sock')
+    monkeypatch.delenv('XDG_RUNTIME_DIR')
+    assert os.path.dirname(os.path.dirname(genvkclient.defaultSocketPath())) == tempfile.gettempdir()
+
+    # The server creates a private directory for the socket, which only the current user can use
+    socketPath = str(tmp_path / 'private' / 'genvk.sock')
+    server = startServer(socketPath)
+    try:
+        assert stat.S_IMODE(os.stat(tmp_path / 'private').st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(socketPath).st_mode) == 0o600
+        assert sendRequest(socketPath, ['-registry', xml_path, 'nosuchtarget'], str(tmp_path))[0] != 0
+
+        # Clients do not use sockets in directories other users can write to
+        os.chmod(tmp_path / 'private', 0o777)
+        assert sendRequest(socketPath, ['-registry', xml_path, 'nosuchtarget'], str(tmp_path)) is None
+    finally:
+        server.terminate()
+        server.wait()
+
+    # Nor does the server
+    os.chmod(tmp_path / 'private', 0o777)
+    result = subprocess.run([sys.executable, genvk_path, '--serve', socketPath], capture_output = True, text = True)
+    assert result.returncode != 0 and 'not writable by others' in result.stderr
+
+def testServeApimap(tmp_path):
+    # apimap.py is loaded again for each request, so a regenerated apimap.py is used
+    socketPath = str(tmp_path / 'genvk.sock')
+    (tmp_path / 'gen').mkdir()
+    (tmp_path / 'gen' / 'apimap.py').write_text('requiredBy = {}\n', encoding = 'utf-8')
+
+    def generate(directory):
+        (tmp_path / directory).mkdir()
+        subprocess.run([sys.executable, genvk_path, '-registry', xml_path, '-genpath', 'gen',
+                        '-o', directory, 'apiinc'], cwd = tmp_path, check = True)
+
+    def serve(arguments):
+        (status, output) = sendRequest(socketPath, ['-registry', xml_path] + arguments, str(tmp_path))
+        assert status == 0, output
+
+    server = startServer(socketPath)
+    try:
+        generate('fresh-stub')
+        serve(['-genpath', 'gen', '-o', 'served-stub', 'apiinc'])
+        compareDirectories(tmp_path / 'fresh-stub', tmp_path / 'served-stub')
+
+        serve(['-o', 'gen', 'apimap.py'])
+        generate('fresh')
+        serve(['-genpath', 'gen', '-o', 'served', 'apiinc'])
+        compareDirectories(tmp_path / 'fresh', tmp_path / 'served')
+
+        files = [os.path.relpath(os.path.join(root, name), tmp_path / 'fresh')
+                 for (root, _, names) in os.walk(tmp_path / 'fresh') for name in names]
+        (_, mismatch, _) = filecmp.cmpfiles(tmp_path / 'fresh-stub', tmp_path / 'fresh', files, shallow = False)
+        assert mismatch
+    finally:
+        server.terminate()
+        server.wait()
+    assert 'apimap' not in sys.modules
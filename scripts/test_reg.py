@@ -0,0 +1,531 @@
+#!/usr/bin/env python3 -i
+#
+# Copyright 2025 The Khronos Group Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+import copy
+import filecmp
+import os
+import re
+import subprocess
+import sys
+import pytest
+from xml.etree import ElementTree
+
+registry_path = os.path.abspath((os.path.dirname(__file__)))
+sys.path.insert(0, registry_path)
+from generator import GeneratorOptions
+from reg import EnumValue, Registry, elementsEqual
+from regcache import RegistryCache
+
+xml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'vk.xml'))
+genvk_path = os.path.join(registry_path, 'genvk.py')
+
+def loadRegistry(cacheDir = None, apiname = 'vulkan', **kwargs):
+    reg = Registry(None, GeneratorOptions(apiname = apiname, **kwargs))
+    reg.gen.diagFile = None
+    reg.loadFile(xml_path, cacheDir = cacheDir)
+    return reg
+
+# Set genvk.genOpts from genvk.py command line options, writing to directory
+def makeGenOpts(directory, *options):
+    import genvk
+
+    genvk.makeGenOpts(genvk.makeArgParser().parse_args(
+        ['-o', str(directory), '-genpath', str(directory), *options]))
+
+def testRegistryCache(tmp_path):
+    reference = loadRegistry()
+    cold = loadRegistry(tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+    warm = loadRegistry(tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+
+    for reg in (cold, warm):
+        assert reg.tree.getroot() is reg.reg
+        assert ElementTree.tostring(reg.reg) == ElementTree.tostring(reference.reg)
+        for name in Registry.parsedAttributes:
+            value = getattr(reg, name)
+            expected = getattr(reference, name)
+            assert type(value) == type(expected)
+            if name == 'enumValues':
+                # Keyed by the Elements of each tree
+                assert list(value.values()) == list(expected.values())
+            elif isinstance(expected, dict):
+                assert list(value) == list(expected)
+
+        # Command aliases are not in the tree, but must still be restored
+        cmd = reg.cmddict['vkCmdDrawIndirectCountKHR']
+        assert cmd.elem.get('alias') == 'vkCmdDrawIndirectCount'
+        assert cmd.elem.find('proto/name').text == 'vkCmdDrawIndirectCountKHR'
+        assert cmd.getParams() == reg.cmddict['vkCmdDrawIndirectCount'].getParams()
+
+        # Infos must refer to the elements in the restored tree
+        group = reg.groupdict['VkResult'].elem
+        assert group in reg.reg.findall('enums')
+        assert reg.enumValues[group.find('enum')].name == 'VK_SUCCESS'
+
+def testRegistryCacheMessages(tmp_path):
+    # A vk.xml with a duplicate enum with a different value
+    with open(xml_path, encoding = 'utf-8') as fp:
+        data = fp.read()
+    group = '<enums name="VkImageTiling" type="enum">'
+    assert group in data
+    data = data.replace(group, group + '<enum value="2" name="VK_IMAGE_TILING_OPTIMAL"/>')
+    path = tmp_path / 'vk.xml'
+    path.write_text(data, encoding = 'utf-8')
+
+    # The warning is reported by cold and warm loads alike
+    for _ in range(2):
+        reg = Registry(None, GeneratorOptions(apiname = 'vulkan'))
+        reg.gen.diagFile = None
+        reg.gen.warnFile = None
+        records = reg.gen.recordMessages()
+        reg.loadFile(str(path), cacheDir = tmp_path / 'cache')
+        warnings = [record.args for record in records if record.level == 'warn']
+        assert any('VK_IMAGE_TILING_OPTIMAL' in args[0] for args in warnings)
+    assert len(os.listdir(tmp_path / 'cache')) == 1
+
+def testRegistryCacheKey(tmp_path):
+    cache = RegistryCache(tmp_path)
+    data = b'<registry/>'
+    key = cache.makeKey(data, GeneratorOptions(apiname = 'vulkan'))
+    assert key == cache.makeKey(data, GeneratorOptions(apiname = 'vulkan'))
+    assert key != cache.makeKey(b'<registry></registry>', GeneratorOptions(apiname = 'vulkan'))
+    assert key != cache.makeKey(data, GeneratorOptions(apiname = 'vulkansc'))
+    assert key != cache.makeKey(data, GeneratorOptions(apiname = 'vulkan', mergeApiNames = 'vulkansc'))
+    assert key != cache.makeKey(data, GeneratorOptions(apiname = 'vulkan', mergeInternalApis = False))
+
+def testRegistryCacheCorrupt(tmp_path):
+    cold = loadRegistry(tmp_path)
+    (entry,) = os.listdir(tmp_path)
+    with open(tmp_path / entry, 'wb') as fp:
+        fp.write(b'truncated')
+    reg = loadRegistry(tmp_path)
+    assert list(reg.typedict) == list(cold.typedict)
+
+def testRegistryCacheEviction(tmp_path):
+    cache = RegistryCache(tmp_path, maxEntries = 2)
+    for (mtime, key) in enumerate(['a', 'b', 'c']):
+        cache.store(key, ElementTree.Element('registry'), {})
+        os.utime(cache.path(key), (mtime, mtime))
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(cache.path(key)) for key in ('b', 'c')]
+
+    # Loading an entry makes it the most recently used
+    assert cache.load('b') is not None
+    cache.store('d', ElementTree.Element('registry'), {})
+    assert not os.path.exists(cache.path('c'))
+    assert os.path.exists(cache.path('b'))
+
+def testRegistryCacheStoreError(tmp_path, capsys):
+    # The cache directory cannot be created, but parsing still succeeds
+    (tmp_path / 'file').write_text('')
+    reg = loadRegistry(tmp_path / 'file' / 'cache')
+    assert 'VkInstance' in reg.typedict
+    assert 'WARNING: Could not cache the parsed registry' in capsys.readouterr().err
+
+def testAPIView():
+    vulkan = loadRegistry()
+    source = ElementTree.tostring(vulkan.sourceRoot)
+
+    for apiname, mergeApiNames in (('vulkansc', None), ('vulkanbase', 'vulkan'), ('vulkan', None)):
+        view = vulkan.apiView(GeneratorOptions(apiname = apiname, mergeApiNames = mergeApiNames))
+        reference = loadRegistry(apiname = apiname, mergeApiNames = mergeApiNames)
+        assert view.sourceRoot is vulkan.sourceRoot
+        assert ElementTree.tostring(view.reg) == ElementTree.tostring(reference.reg)
+        assert list(view.typedict) == list(reference.typedict)
+        assert list(view.cmddict) == list(reference.cmddict)
+
+    # Making views does not modify the source tree or the original view
+    assert ElementTree.tostring(vulkan.sourceRoot) == source
+    assert ElementTree.tostring(vulkan.reg) == ElementTree.tostring(loadRegistry().reg)
+
+def testFeatureDependencies():
+    reg = loadRegistry()
+    deps = reg.featureDependencies
+
+    assert 'VK_BASE_VERSION_1_0' in deps.internal
+    assert 'VK_VERSION_1_0' not in deps.internal
+    assert deps.dependsOn('VK_VERSION_1_0', 'VK_BASE_VERSION_1_0')
+    assert deps.dependsOn('VK_VERSION_1_2', 'VK_COMPUTE_VERSION_1_1')
+    assert not deps.dependsOn('VK_VERSION_1_0', 'VK_BASE_VERSION_1_1')
+    assert deps.firstPublicDependent('VK_BASE_VERSION_1_0') == 'VK_VERSION_1_0'
+    assert deps.firstPublicDependent('VK_GRAPHICS_VERSION_1_1') == 'VK_VERSION_1_1'
+
+    # Every feature follows its dependencies in the topological order
+    position = {name: index for (index, name) in enumerate(deps.order)}
+    assert sorted(position) == sorted(deps.names)
+    for name in deps.names:
+        for dep in deps.closure[name]:
+            if dep in position:
+                assert position[dep] < position[name]
+
+    # Internal features have been merged and removed from the tree
+    assert 'VK_BASE_VERSION_1_0' not in reg.apidict
+
+def testAliasCommands():
+    reg = loadRegistry()
+    aliases = [name for name, info in reg.cmddict.items() if info.elem.get('alias')]
+    assert aliases
+
+    for name in aliases:
+        alias = reg.cmddict[name].elem.get('alias')
+        aliasElem = reg.cmddict[alias].elem
+        cmdElem = reg.cmddict[name].elem
+
+        # Equivalent to a patched deep copy of the aliased command
+        expected = copy.deepcopy(aliasElem)
+        expected.find('proto/name').text = name
+        expected.set('name', name)
+        expected.set('alias', alias)
+        export = reg.reg.find(f"commands/command[@name='{name}']").get('export')
+        if export is not None:
+            expected.set('export', export)
+        elif expected.get('export') is not None:
+            del expected.attrib['export']
+        assert ElementTree.tostring(cmdElem) == ElementTree.tostring(expected)
+
+        # Parameters are shared, not copied
+        assert reg.cmddict[name].getParams() == reg.cmddict[alias].getParams()
+        assert aliasElem.find('proto/name').text == alias
+
+def testParsedAttributes():
+    reg = loadRegistry()
+
+    typeinfo = reg.typedict['VkPhysicalDeviceVulkan12Features']
+    assert typeinfo.structextends == ('VkPhysicalDeviceFeatures2', 'VkDeviceCreateInfo')
+    assert [member.name for member in typeinfo.memberAttributes] == \
+        [member.findtext('name') for member in typeinfo.getMembers()]
+    assert reg.typedict['VkExtent2D'].structextends == ()
+
+    cmdinfo = reg.cmddict['vkEnumeratePhysicalDevices']
+    assert cmdinfo.successcodes == ('VK_SUCCESS', 'VK_INCOMPLETE')
+    assert 'VK_ERROR_INITIALIZATION_FAILED' in cmdinfo.errorcodes
+    (instance, count, devices) = cmdinfo.paramAttributes
+    assert instance.name == 'instance' and instance.optional == ()
+    assert count.optional == (False, True)
+    assert devices.len == ('pPhysicalDeviceCount',)
+    assert devices.optional == (True,)
+
+    cmdinfo = reg.cmddict['vkCmdDrawIndirectCountKHR']
+    assert cmdinfo.paramAttributes == reg.cmddict['vkCmdDrawIndirectCount'].paramAttributes
+
+def testTypeDependencies():
+    reg = loadRegistry()
+
+    typeinfo = reg.typedict['VkPhysicalDeviceProperties']
+    assert typeinfo.subtypes == tuple(subtype.text for subtype in typeinfo.elem.findall('.//type'))
+    assert 'VkPhysicalDeviceLimits' in typeinfo.subtypes
+    assert typeinfo.subenums == ('VK_MAX_PHYSICAL_DEVICE_NAME_SIZE', 'VK_UUID_SIZE')
+    assert 'VkInstance' in reg.cmddict['vkCreateInstance'].subtypes
+
+    # Requiring a type requires its dependencies, transitively
+    reg.markTypeRequired('VkPhysicalDeviceProperties', True)
+    for name in ('VkPhysicalDeviceProperties', 'VkPhysicalDeviceLimits',
+                 'VkSampleCountFlags', 'VkSampleCountFlagBits', 'VkFlags', 'uint32_t'):
+        assert reg.typedict[name].required
+    assert reg.enumdict['VK_UUID_SIZE'].required
+
+    # Bitmask types with 'bitvalues' require their flag bits type
+    reg.markTypeRequired('VkMemoryBarrier2', True)
+    assert reg.typedict['VkPipelineStageFlagBits2'].required
+    assert reg.groupdict['VkPipelineStageFlagBits2'].flagType is reg.typedict['VkPipelineStageFlags2']
+
+    # Removing a type does not remove its dependencies
+    reg.markTypeRequired('VkPhysicalDeviceProperties', False)
+    assert not reg.typedict['VkPhysicalDeviceProperties'].required
+    assert reg.typedict['VkPhysicalDeviceLimits'].required
+
+def testEnumSelection():
+    def expectedSelected(reg, elem):
+        # Per-<enum> selection, as previously done in generateFeature()
+        extname = elem.get('extname')
+        if extname is not None:
+            return (reg.genOpts.defaultExtensions in elem.get('supported').split(',') or
+                    re.match(reg.genOpts.addExtensions, extname) is not None)
+        if elem.get('version') is not None:
+            return re.match(reg.genOpts.emitversions, elem.get('version')) is not None
+        return True
+
+    for options in (dict(defaultExtensions = 'vulkan', emitversions = '.*'),
+                    dict(defaultExtensions = None, addExtensions = 'VK_KHR_.*', emitversions = 'VK_VERSION_1_[01]'),
+                    dict(defaultExtensions = 'vulkan', addExtensions = 'VK_EXT_debug_utils', emitversions = None)):
+        reg = loadRegistry(**options)
+        reg.selectEnumFeatures()
+        elems = [elem for group in reg.reg.findall('enums') for elem in group.findall('enum')]
+        assert any(elem.get('extname') for elem in elems)
+        for elem in elems:
+            assert reg.isEnumSelected(elem) == expectedSelected(reg, elem), elem.get('name')
+
+def testEnumValues():
+    reg = loadRegistry()
+
+    def groupValue(groupName, name):
+        return reg.enumValues[reg.groupdict[groupName].elem.find(f"enum[@name='{name}']")]
+
+    value = groupValue('VkResult', 'VK_ERROR_NATIVE_WINDOW_IN_USE_KHR')
+    assert value == EnumValue('VkResult', 'VK_ERROR_NATIVE_WINDOW_IN_USE_KHR', 'offset',
+                              -1000000001, '-1000000001', 32, None, 'VK_KHR_surface')
+    value = groupValue('VkAccessFlagBits2', 'VK_ACCESS_2_SHADER_SAMPLED_READ_BIT')
+    assert (value.numVal, value.value, value.bitwidth) == (1 << 32, '0x100000000ULL', 64)
+    value = groupValue('VkAttachmentStoreOp', 'VK_ATTACHMENT_STORE_OP_NONE_KHR')
+    assert (value.source, value.numVal, value.alias) == ('alias', None, 'VK_ATTACHMENT_STORE_OP_NONE')
+    value = reg.getEnumValue(reg.enumdict['VK_KHR_SURFACE_SPEC_VERSION'].elem)
+    assert (value.group, value.numVal, value.feature) == (None, 25, 'VK_KHR_surface')
+
+    # Values are reported once for the registry, when the table is built
+    records = reg.gen.recordMessages()
+    group = reg.groupdict['VkImageTiling'].elem
+    group.append(ElementTree.Element('enum', name = 'VK_IMAGE_TILING_OPTIMAL', value = '2'))
+    reg.parseEnumValues()
+    assert [record.level for record in records] == ['warn']
+    group.append(ElementTree.Element('enum', name = 'VK_IMAGE_TILING_TEST', value = '1'))
+    with pytest.raises(UserWarning):
+        reg.parseEnumValues()
+
+def testMultipleTargets(tmp_path):
+    import genvk
+
+    # validinc modifies the most registry state, so it is generated first
+    targets = ['validinc', 'vulkan_core.h', 'hostsyncinc', 'vulkan_xlib.h', 'vulkan_beta.h']
+
+    # Reference outputs, each from a separate genvk.py process
+    for target in targets:
+        directory = tmp_path / 'fresh' / target
+        directory.mkdir(parents = True)
+        subprocess.run([sys.executable, genvk_path, '-registry', xml_path,
+                        '-o', str(directory), target], check = True)
+
+    # The same targets from a single Registry
+    reg = None
+    for target in targets:
+        directory = tmp_path / 'reused' / target
+        directory.mkdir(parents = True)
+        makeGenOpts(directory)
+        (createGenerator, options) = genvk.genOpts[target]
+        gen = createGenerator(diagFile = None)
+        if reg is None:
+            reg = Registry(gen, options)
+            reg.loadFile(xml_path)
+        else:
+            reg.setGenerator(gen, options)
+        reg.apiGen()
+
+    # The same targets from genvk.py batch mode, in worker processes
+    batch = ','.join(f'{target}={tmp_path / "batch" / target}' for target in targets)
+    subprocess.run([sys.executable, genvk_path, '-registry', xml_path,
+                    '-targets', batch, '-j', '2'], check = True)
+
+    for target in targets:
+        fresh = tmp_path / 'fresh' / target
+        files = sorted(os.path.relpath(os.path.join(root, name), fresh)
+                       for (root, _, names) in os.walk(fresh) for name in names)
+        assert files
+        for other in ('reused', 'batch'):
+            (match, mismatch, errors) = filecmp.cmpfiles(fresh, tmp_path / other / target, files, shallow = False)
+            assert mismatch == [] and errors == [], (other, target)
+
+def testDiagnostics(tmp_path):
+    import genvk
+    from cgenerator import COutputGenerator
+
+    makeGenOpts(tmp_path)
+    options = genvk.genOpts['vulkan_core.h'][1]
+
+    # Diagnostics are recorded when requested, even if not written
+    gen = COutputGenerator(diagFile = None)
+    assert not gen.diag_enabled
+    records = gen.recordMessages()
+    assert gen.diag_enabled
+    reg = Registry(gen, options)
+    reg.loadFile(xml_path)
+    reg.apiGen()
+    diags = [record.args for record in records if record.level == 'diag']
+    assert ('Emitting', 'command', 'decl for', 'vkCreateInstance') in diags
+    header = (tmp_path / 'vulkan_core.h').read_text()
+
+    # Otherwise, they are not even passed to logMsg
+    gen = COutputGenerator(diagFile = None)
+    levels = []
+    logMsg = gen.logMsg
+    def countingLogMsg(level, *args):
+        levels.append(level)
+        logMsg(level, *args)
+    gen.logMsg = countingLogMsg
+    reg.setGenerator(gen, options)
+    reg.apiGen()
+    assert 'diag' not in levels
+    assert (tmp_path / 'vulkan_core.h').read_text() == header
+
+def testSharedDeclarations(tmp_path):
+    import genvk
+
+    def generate(reg, target, directory, *options):
+        directory.mkdir()
+        makeGenOpts(directory, *options)
+        (createGenerator, options) = genvk.genOpts[target]
+        gen = createGenerator(diagFile = None)
+        if reg is None:
+            reg = Registry(gen, options)
+            reg.loadFile(xml_path)
+        else:
+            reg.setGenerator(gen, options)
+        reg.apiGen()
+        return (reg, gen)
+
+    (reg, gen) = generate(None, 'vulkan_core.h', tmp_path / 'first')
+    assert gen.declCache is None
+    assert len(reg.declCache) == 1
+    (decls,) = reg.declCache.values()
+    cmd = reg.cmddict['vkCreateInstance'].elem
+    assert ('makeCDecls', cmd) in decls
+
+    # Declarations are reused by later generators formatting them alike,
+    # and are copied so callers can modify them
+    (_, gen) = generate(reg, 'vulkan_core.h', tmp_path / 'second')
+    assert (tmp_path / 'first' / 'vulkan_core.h').read_text() == (tmp_path / 'second' / 'vulkan_core.h').read_text()
+    gen.declCache = decls
+    prototype = decls[('makeCDecls', cmd)][0]
+    gen.makeCDecls(cmd)[0] += 'modified'
+    assert gen.makeCDecls(cmd)[0] == prototype
+
+    # Other generators have their own declarations
+    generate(reg, 'vulkan_core.h', tmp_path / 'misra', '-misracppstyle')
+    generate(reg, 'apiinc', tmp_path / 'apiinc')
+    assert len(reg.declCache) == 3
+
+def testMultipleInterfaces(tmp_path):
+    import genvk
+
+    # vulkan_sci.h selects extensions which tag commands aliased in
+    # vulkan_sc_core.h as required
+    for (apiname, targets) in (('vulkan', ['vulkan_core.h', 'vulkan_xlib.h', 'vulkan_xlib_xrandr.h', 'vulkan_beta.h']),
+                               ('vulkansc', ['vulkan_sc_core.h', 'vulkan_sci.h'])):
+        reg = None
+        outputs = {}
+        for mode in ('separate', 'multi'):
+            (tmp_path / mode).mkdir(exist_ok = True)
+            args = genvk.parseArgs(['-apiname', apiname, '-registry', xml_path,
+                                    '-o', str(tmp_path / mode)])
+            genvk.makeGenOpts(args)
+            outputs[mode] = [(genvk.genOpts[target][0](diagFile = None), genvk.genOpts[target][1])
+                             for target in targets]
+            if reg is None:
+                reg = Registry(*outputs[mode][0])
+                reg.loadFile(xml_path)
+        for (gen, options) in outputs['separate']:
+            reg.setGenerator(gen, options)
+            reg.apiGen()
+        reg.apiGenMulti(outputs['multi'])
+
+        (match, mismatch, errors) = filecmp.cmpfiles(tmp_path / 'separate', tmp_path / 'multi', targets, shallow = False)
+        assert match == targets, (mismatch, errors)
+
+    # Interfaces must select features alike
+    otherOptions = copy.copy(options)
+    otherOptions.profile = 'other'
+    with pytest.raises(RuntimeError):
+        reg.apiGenMulti([(gen, options), (gen, otherOptions)])
+
+def testSetGeneratorOptions():
+    reg = loadRegistry()
+    with pytest.raises(RuntimeError):
+        reg.setGenerator(None, GeneratorOptions(apiname = 'vulkansc'))
+
+def testReferences():
+    reg = loadRegistry()
+    references = reg.references
+
+    assert 'VkImageCreateInfo' in references.structsUsingType('VkImageTiling')
+    assert 'vkGetPhysicalDeviceImageFormatProperties' in references.commandsUsingType('VkImageTiling')
+    assert references.structsUsingType('VkNoSuchType') == ()
+
+    assert 'VkPhysicalDeviceFeatures2' in references.structsExtending('VkPhysicalDeviceVulkan11Features')
+    assert 'VkPhysicalDeviceVulkan11Features' in references.structsExtendedBy('VkPhysicalDeviceFeatures2')
+
+    deviceCommands = references.handleCommands('VkDevice')
+    assert 'vkCreateBuffer' in deviceCommands
+    assert 'vkCmdDraw' not in deviceCommands
+    assert 'vkCmdDraw' in references.handleCommands('VkCommandBuffer')
+
+    assert 'vkCreateInstance' in references.featureRequires('VK_VERSION_1_0')
+    assert 'vkCreateSwapchainKHR' in references.featureRequires('VK_KHR_swapchain')
+    assert references.requiringFeatures('vkCreateSwapchainKHR')[0] == 'VK_KHR_swapchain'
+
+    # Check against a brute force search of the registry
+    for (name, cmdinfo) in reg.cmddict.items():
+        for param in cmdinfo.getParams():
+            assert name in references.commandsUsingType(param.find('type').text)
+
+def assertSameRegistry(reg, expected):
+    assert elementsEqual(reg.reg, expected.reg)
+    for name in Registry.parsedAttributes:
+        value = getattr(reg, name)
+        if name == 'enumValues':
+            # Keyed by the Elements of each tree, which are in the same order
+            assert list(value.values()) == list(getattr(expected, name).values())
+        elif isinstance(value, dict):
+            assert value.keys() == getattr(expected, name).keys()
+            for (key, info) in value.items():
+                if hasattr(info, 'elem'):
+                    assert elementsEqual(info.elem, getattr(expected, name)[key].elem), key
+                else:
+                    assert info == getattr(expected, name)[key], key
+    assert [ext.get('name') for ext in reg.extensions] == [ext.get('name') for ext in expected.extensions]
+    assert reg.references.__dict__ == expected.references.__dict__
+
+def testReloadFile(tmp_path):
+    with open(xml_path, encoding = 'utf-8') as fp:
+        text = fp.read()
+    edited = tmp_path / 'vk.xml'
+    edited.write_text(text, encoding = 'utf-8')
+
+    reg = Registry(None, GeneratorOptions(apiname = 'vulkan'))
+    reg.gen.diagFile = None
+    reg.loadFile(str(edited))
+
+    def edit(old, new):
+        nonlocal text
+        assert text.count(old) == 1
+        text = text.replace(old, new)
+        edited.write_text(text, encoding = 'utf-8')
+
+    # Type, command, command with aliases, and extension changes are
+    # applied in place
+    edit('''<member><type>uint32_t</type>        <name>height</name></member>
+        </type>''', '''<member><type>uint32_t</type>        <name>height</name></member>
+            <member><type>uint32_t</type>        <name>depth</name></member>
+        </type>''')
+    edit('''<name>vkCmdDraw</name></proto>
+            <param externsync="true"><type>VkCommandBuffer</type> <name>commandBuffer</name></param>''',
+         '''<name>vkCmdDraw</name></proto>
+            <param externsync="true"><type>VkCommandBuffer</type> <name>cmdBuffer</name></param>''')
+    edit('<param><type>VkPhysicalDeviceFeatures2</type>* <name>pFeatures</name></param>',
+         '<param><type>VkPhysicalDeviceFeatures2</type>* <name>pDeviceFeatures</name></param>')
+    edit('''<enum offset="1" extends="VkResult" dir="-"                     name="VK_ERROR_NATIVE_WINDOW_IN_USE_KHR"/>''',
+         '''<enum offset="1" extends="VkResult" dir="-"                     name="VK_ERROR_NATIVE_WINDOW_IN_USE_KHR"/>
+                <enum offset="2" extends="VkResult" dir="-"                     name="VK_ERROR_SURFACE_TEST_KHR"/>''')
+    assert reg.reloadFile()
+
+    expected = Registry(None, GeneratorOptions(apiname = 'vulkan'))
+    expected.gen.diagFile = None
+    expected.loadFile(str(edited))
+    assertSameRegistry(reg, expected)
+    assert [member.find('name').text for member in reg.typedict['VkExtent2D'].getMembers()] == ['width', 'height', 'depth']
+    assert reg.cmddict['vkGetPhysicalDeviceFeatures2KHR'].getParams()[1].find('name').text == 'pDeviceFeatures'
+    assert reg.enumvaluedict['VK_ERROR_SURFACE_TEST_KHR'] == 'VkResult'
+
+    # VK_KHR_swapchain defines enums also defined by VK_KHR_device_group,
+    # so changing it reparses the registry, as do added elements
+    edit('<enum value="70"                                                name="VK_KHR_SWAPCHAIN_SPEC_VERSION"/>',
+         '<enum value="71"                                                name="VK_KHR_SWAPCHAIN_SPEC_VERSION"/>')
+    assert not reg.reloadFile()
+    expected.loadFile(str(edited))
+    assertSameRegistry(reg, expected)
+
+    edit('<type name="VkExtent3D"/>', '')
+    edit('''<type category="struct" name="VkExtent2D">''',
+         '''<type category="struct" name="VkExtent2D" returnedonly="true">''')
+    assert not reg.reloadFile()
+    expected.loadFile(str(edited))
+    assertSameRegistry(reg, expected)
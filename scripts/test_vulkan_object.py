@@ -4,7 +4,9 @@
 #
 # SPDX-License-Identifier: Apache-2.0 OR MIT
 import os
+import stat
 import sys
+import threading
 import pytest
 from xml.etree import ElementTree
 
@@ -222,3 +224,336 @@ def testVulkanObjectWithVideoSC(tmp_path):
     tree = ElementTree.parse(xml_path)
     reg.loadElementTree(tree)
     reg.apiGen()
+
+def testVulkanObjectCache(tmp_path):
+    SetOutputDirectory(tmp_path)
+    SetOutputFileName("test_vulkan_object_cache_out.txt")
+    SetMergedApiNames(None)
+    cacheDirectory = os.path.join(tmp_path, 'cache')
+    EnableCaching(cacheDirectory, maxEntries = 1)
+
+    xml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'vk.xml'))
+    try:
+        # The first run builds the VulkanObject and stores it
+        SetTargetApiName('vulkan')
+        generator = MyGenerator()
+        RunGenerator(generator, BaseGeneratorOptions(), xml_path)
+        assert generator.registry is not None
+        assert len(os.listdir(cacheDirectory)) == 1
+
+        # The next run with the same XML and options loads it without parsing the XML
+        generator = MyGenerator()
+        RunGenerator(generator, BaseGeneratorOptions(), xml_path)
+        assert generator.registry is None
+        assert 'VK_KHR_surface' in generator.vk.extensions
+
+        # Other options build another VulkanObject, evicting the least recently used
+        SetTargetApiName('vulkansc')
+        SetMergedApiNames('vulkan')
+        generator = MyGenerator()
+        RunGenerator(generator, BaseGeneratorOptions(), xml_path)
+        assert generator.registry is not None
+        entries = os.listdir(cacheDirectory)
+        assert len(entries) == 1
+
+        generator = MyGenerator()
+        RunGenerator(generator, BaseGeneratorOptions(), xml_path)
+        assert generator.registry is None
+        assert os.listdir(cacheDirectory) == entries
+
+        # Truncated entries are misses, and are replaced
+        with open(os.path.join(cacheDirectory, entries[0]), 'wb') as fp:
+            fp.write(b'\x80')
+        generator = MyGenerator()
+        RunGenerator(generator, BaseGeneratorOptions(), xml_path)
+        assert generator.registry is not None
+    finally:
+        DisableCaching()
+
+def testVulkanObjectCacheRegistry(tmp_path):
+    SetOutputDirectory(tmp_path)
+    SetOutputFileName("test_vulkan_object_cache_out.txt")
+    SetTargetApiName('vulkan')
+    SetMergedApiNames(None)
+    cacheDirectory = os.path.join(tmp_path, 'cache')
+    EnableCaching(cacheDirectory)
+
+    xml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'vk.xml'))
+    try:
+        # Generators run by a Registry directly store the VulkanObject
+        generator = MyGenerator()
+        reg = Registry(generator, BaseGeneratorOptions())
+        reg.loadFile(xml_path)
+        reg.apiGen()
+        assert len(os.listdir(cacheDirectory)) == 1
+
+        # for RunGenerator() to load
+        generator = MyGenerator()
+        RunGenerator(generator, BaseGeneratorOptions(), xml_path)
+        assert generator.registry is None
+        assert 'VK_KHR_surface' in generator.vk.extensions
+
+        # Other generator classes can build a different VulkanObject, so they have their own entries
+        class ModelGenerator(MyGenerator):
+            def applyExtensionDependency(self):
+                MyGenerator.applyExtensionDependency(self)
+                self.vk.extensions.clear()
+
+        for _ in range(2):
+            generator = ModelGenerator()
+            RunGenerator(generator, BaseGeneratorOptions(), xml_path)
+            assert generator.vk.extensions == {}
+        assert generator.registry is None
+        assert len(os.listdir(cacheDirectory)) == 2
+        generator = MyGenerator()
+        RunGenerator(generator, BaseGeneratorOptions(), xml_path)
+        assert 'VK_KHR_surface' in generator.vk.extensions
+    finally:
+        DisableCaching()
+
+def testVulkanObjectCacheDirectory(tmp_path, monkeypatch):
+    # The default directory is private to the current user
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'xdg'))
+    cache = VulkanObjectCache(DefaultCacheDirectory(), maxEntries = 8)
+    assert cache.directory == str(tmp_path / 'xdg' / 'vkobject_cache')
+    cache.store('key', VulkanObject())
+    assert stat.S_IMODE(os.stat(cache.directory).st_mode) == 0o700
+    assert isinstance(cache.load('key'), VulkanObject)
+
+    # Entries are neither loaded from nor stored in a directory other users can write to
+    os.chmod(cache.directory, 0o777)
+    assert cache.load('key') is None
+    cache.store('other', VulkanObject())
+    assert not os.path.exists(cache.path('other'))
+
+def testVulkanObjectCacheErrors(tmp_path, capsys):
+    SetOutputDirectory(tmp_path)
+    SetOutputFileName("test_vulkan_object_cache_out.txt")
+    SetTargetApiName('vulkan')
+    SetMergedApiNames(None)
+    (tmp_path / 'file').write_text('')
+
+    # Generators still run when the cache cannot be written
+    EnableCaching(str(tmp_path / 'file' / 'cache'))
+    xml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'vk.xml'))
+    try:
+        generator = MyGenerator()
+        RunGenerator(generator, BaseGeneratorOptions(), xml_path)
+        assert 'VK_KHR_surface' in generator.vk.extensions
+    finally:
+        DisableCaching()
+    assert 'WARNING: Could not cache the VulkanObject' in capsys.readouterr().err
+
+    # Nor when the VulkanObject cannot be pickled, and no partial entry is left
+    cache = VulkanObjectCache(str(tmp_path / 'cache'), maxEntries = 8)
+    vk = VulkanObject()
+    vk.headerVersion = threading.Lock()
+    cache.store('key', vk)
+    assert 'WARNING: Could not cache the VulkanObject' in capsys.readouterr().err
+    assert os.listdir(cache.directory) == []
+
+def testUniqueLists():
+    unique = UniqueLists()
+    names = ['VK_KHR_surface']
+    unique.append(names, 'VK_KHR_surface')
+    unique.append(names, ''.join(['VK_KHR_', 'swapchain']))
+    unique.append(names, 'VK_KHR_swapchain')
+    assert names == ['VK_KHR_surface', 'VK_KHR_swapchain']
+
+    # Objects are compared by identity, not by their fields
+    first = Flags('VkTestFlags', [], 'VkTestFlagBits', None, 'VkFlags', 32, False, [])
+    second = Flags('VkTestFlags', [], 'VkTestFlagBits', None, 'VkFlags', 32, False, [])
+    assert first == second
+    flags = []
+    unique.append(flags, first)
+    unique.append(flags, first)
+    unique.append(flags, second)
+    assert len(flags) == 2 and flags[0] is first and flags[1] is second
+    assert unique.members(names) == {'VK_KHR_surface', 'VK_KHR_swapchain'}
+
+def testExtensionDependencyUnique(tmp_path):
+    SetOutputDirectory(tmp_path)
+    SetOutputFileName("test_vulkan_object_extension_dependency_out.txt")
+    SetTargetApiName('vulkan')
+    SetMergedApiNames(None)
+
+    class DependencyGenerator(BaseGenerator):
+        def generate(self):
+            for extension in self.vk.extensions.values():
+                for items in [extension.commands, extension.enums, extension.bitmasks, extension.structs,
+                              *extension.enumFields.values(), *extension.flagBits.values()]:
+                    assert len(set(map(id, items))) == len(items)
+            for command in self.vk.commands.values():
+                assert len(set(command.extensions)) == len(command.extensions)
+            for enum in self.vk.enums.values():
+                assert len(set(enum.fieldExtensions)) == len(enum.fieldExtensions)
+                for field in enum.fields:
+                    assert len(set(field.extensions)) == len(field.extensions)
+            surface = self.vk.extensions['VK_KHR_surface']
+            assert self.vk.commands['vkDestroySurfaceKHR'] in surface.commands
+            assert 'VK_KHR_surface' in self.vk.commands['vkDestroySurfaceKHR'].extensions
+
+    xml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'vk.xml'))
+    reg = Registry(DependencyGenerator(), BaseGeneratorOptions())
+    reg.loadFile(xml_path)
+    reg.apiGen()
+
+    # vk.xml never adds enum constants to a group named like a handle or Flags, so
+    # pretend it does, to cover those cases
+    class AliasedGroupGenerator(BaseGenerator):
+        def applyExtensionDependency(self):
+            self.vk.handles['VkShaderStageFlagBits'] = self.vk.handles['VkPipeline']
+            self.vk.flags['VkPipelineStageFlagBits'] = self.vk.flags['VkPipelineStageFlags']
+            BaseGenerator.applyExtensionDependency(self)
+            del self.vk.handles['VkShaderStageFlagBits']
+            del self.vk.flags['VkPipelineStageFlagBits']
+
+        def generate(self):
+            extension = self.vk.extensions['VK_KHR_ray_tracing_pipeline']
+            pipeline = self.vk.handles['VkPipeline']
+            assert 'VK_KHR_ray_tracing_pipeline' in pipeline.extensions
+            assert pipeline in extension.handles
+            extension = self.vk.extensions['VK_KHR_acceleration_structure']
+            flags = self.vk.flags['VkPipelineStageFlags']
+            assert 'VK_KHR_acceleration_structure' in flags.extensions
+            assert extension.flags['VkPipelineStageFlagBits'] == [flags]
+
+    reg.setGenerator(AliasedGroupGenerator(), BaseGeneratorOptions())
+    reg.apiGen()
+
+def testVulkanObjectMemory(tmp_path):
+    import gc
+    import pickle
+    import time
+    import tracemalloc
+
+    SetOutputDirectory(tmp_path)
+    SetOutputFileName("test_vulkan_object_memory_out.txt")
+    SetTargetApiName('vulkan')
+    SetMergedApiNames(None)
+
+    class MemoryGenerator(BaseGenerator):
+        def generate(self):
+            pass
+
+    generator = MemoryGenerator()
+    base_options = BaseGeneratorOptions(
+        videoXmlPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'video.xml')))
+    xml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'vk.xml'))
+    RunGenerator(generator, base_options, xml_path)
+    vk = generator.vk
+
+    # Model objects have no per-instance __dict__, and repeated names are shared
+    command = vk.commands['vkCreateSwapchainKHR']
+    assert not hasattr(command, '__dict__')
+    assert not hasattr(command.params[0], '__dict__')
+    assert command.extensions[0] is vk.extensions['VK_KHR_swapchain'].name
+    assert command.params[1].type is vk.structs['VkSwapchainCreateInfoKHR'].name
+
+    gc.collect()
+    start = time.perf_counter()
+    data = pickle.dumps(vk, protocol=pickle.HIGHEST_PROTOCOL)
+    dumpTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = pickle.loads(data)
+    loadTime = time.perf_counter() - start
+    assert loaded == vk
+    del loaded
+
+    # Tracing allocations slows unpickling, so it is measured separately
+    gc.collect()
+    tracemalloc.start()
+    loaded = pickle.loads(data)
+    gc.collect()
+    (resident, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f'VulkanObject: {resident / 1e6:.2f} MB resident ({peak / 1e6:.2f} MB peak), '
+          f'{len(data) / 1e6:.2f} MB pickled, pickled in {dumpTime:.3f}s, unpickled in {loadTime:.3f}s')
+
+def testVulkanObjectFile(tmp_path):
+    import dataclasses
+    from vulkan_object_file import WriteVulkanObject, ReadVulkanObject, VulkanObjectFileError, LazyDict
+
+    SetOutputDirectory(tmp_path)
+    SetOutputFileName("test_vulkan_object_file_out.txt")
+    SetTargetApiName('vulkan')
+    SetMergedApiNames(None)
+
+    class FileGenerator(BaseGenerator):
+        def generate(self):
+            pass
+
+    generator = FileGenerator()
+    base_options = BaseGeneratorOptions(
+        videoXmlPath = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'video.xml')))
+    xml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'vk.xml'))
+    RunGenerator(generator, base_options, xml_path)
+    vk = generator.vk
+
+    path = os.path.join(tmp_path, 'vk.vkobject')
+    WriteVulkanObject(vk, path)
+
+    # Only the values used are decoded, and objects referenced more than once are shared
+    lazy = ReadVulkanObject(path)
+    assert isinstance(lazy.commands, LazyDict)
+    draw = lazy.commands['vkCmdDraw']
+    assert draw == vk.commands['vkCmdDraw']
+    assert len(lazy.commands.decoded) == 1
+    assert draw is lazy.commands['vkCmdDraw']
+    swapchain = lazy.extensions['VK_KHR_swapchain']
+    assert lazy.commands['vkCreateSwapchainKHR'] in swapchain.commands
+    assert any(x is lazy.commands['vkCreateSwapchainKHR'] for x in swapchain.commands)
+    assert lazy.headerVersion == vk.headerVersion
+    assert lazy.videoStd == vk.videoStd
+    assert sorted(x.name for x in lazy.structs.values()) == sorted(vk.structs)
+
+    loaded = ReadVulkanObject(path).load()
+    for field in dataclasses.fields(VulkanObject):
+        assert getattr(loaded, field.name) == getattr(vk, field.name)
+
+    with open(path, 'r+b') as fp:
+        fp.write(b'NOTVKOBJ')
+    with pytest.raises(VulkanObjectFileError):
+        ReadVulkanObject(path)
+    open(path, 'wb').close()
+    with pytest.raises(VulkanObjectFileError):
+        ReadVulkanObject(path)
+
+class CountGenerator(BaseGenerator):
+    def __init__(self, attribute):
+        BaseGenerator.__init__(self)
+        self.attribute = attribute
+
+    def generate(self):
+        items = getattr(self.vk, self.attribute)
+        self.write(f'{self.attribute} {len(items)}\n')
+        # Generators may modify the VulkanObject, which must not affect other generators
+        items.clear()
+
+def testRunGenerators(tmp_path):
+    SetOutputDirectory(tmp_path)
+    SetTargetApiName('vulkan')
+    SetMergedApiNames(None)
+
+    xml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'xml', 'vk.xml'))
+    attributes = ['commands', 'structs', 'enums', 'commands']
+    outputs = {}
+    for jobs in (1, 2):
+        generators = [(CountGenerator(attribute), BaseGeneratorOptions(customFileName = f'{index}_{jobs}.txt'))
+                      for (index, attribute) in enumerate(attributes)]
+        runs = RunGenerators(generators, xml_path, jobs = jobs)
+
+        assert [run.filename for run in runs] == [f'{index}_{jobs}.txt' for index in range(len(attributes))]
+        assert all(run.generator == 'CountGenerator' and run.seconds >= 0 for run in runs)
+        for (index, run) in enumerate(runs):
+            path = os.path.join(tmp_path, f'{index}_{jobs}.txt')
+            assert list(run.outputFiles) == [path]
+            with open(path) as fp:
+                outputs.setdefault(index, []).append(fp.read())
+
+    for (index, attribute) in enumerate(attributes):
+        assert outputs[index][0] == outputs[index][1]
+        assert outputs[index][0].startswith(f'{attribute} ') and outputs[index][0] != f'{attribute} 0\n'
+    assert outputs[0] == outputs[3]
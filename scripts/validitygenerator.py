@@ -187,7 +187,7 @@ class ValidityOutputGenerator(OutputGenerator):
 
         self.logMsg('diag', '# Generating summary file:', filename)
 
-        with open(filename, 'w', encoding='utf-8') as fp:
+        with self.openFile(filename) as fp:
             # No need to protect with VK_EXT_conditional_rendering, since
             # this is included from a protected section of the specification
             write('.Commands Affected by Conditional Rendering', file=fp)
@@ -274,7 +274,7 @@ class ValidityOutputGenerator(OutputGenerator):
         filename = str(directory / f'{basename}{self.file_suffix}')
         self.logMsg('diag', '# Generating include file:', filename)
 
-        with open(filename, 'w', encoding='utf-8') as fp:
+        with self.openFile(filename) as fp:
             write(self.conventions.warning_comment, file=fp)
 
             # Valid Usage
@@ -1552,7 +1552,7 @@ class ValidityOutputGenerator(OutputGenerator):
                 for name in names
                 if is_required(name)]
 
-    def makeReturnCodeList(self, attrib, cmd, name):
+    def makeReturnCodeList(self, attrib, cmdinfo, name):
         """Return a list of possible return codes for a function.
 
         attrib is either 'successcodes' or 'errorcodes'.
@@ -1560,9 +1560,9 @@ class ValidityOutputGenerator(OutputGenerator):
         return_lines = []
         RETURN_CODE_FORMAT = '* ename:{}'
 
-        codes_attr = cmd.get(attrib)
+        codes_attr = getattr(cmdinfo, attrib)
         if codes_attr:
-            codes = self.findRequiredEnums(codes_attr.split(','))
+            codes = self.findRequiredEnums(codes_attr)
 
             if codes:
                 return_lines.extend((RETURN_CODE_FORMAT.format(code)
@@ -1585,11 +1585,11 @@ class ValidityOutputGenerator(OutputGenerator):
 
         return None
 
-    def makeSuccessCodes(self, cmd, name):
-        return self.makeReturnCodeList('successcodes', cmd, name)
+    def makeSuccessCodes(self, cmdinfo, name):
+        return self.makeReturnCodeList('successcodes', cmdinfo, name)
 
-    def makeErrorCodes(self, cmd, name):
-        return self.makeReturnCodeList('errorcodes', cmd, name)
+    def makeErrorCodes(self, cmdinfo, name):
+        return self.makeReturnCodeList('errorcodes', cmdinfo, name)
 
     def genCmd(self, cmdinfo, name, alias):
         """Command generation."""
@@ -1612,8 +1612,8 @@ class ValidityOutputGenerator(OutputGenerator):
         commandpropertiesentry = self.makeCommandPropertiesTableEntry(
             cmdinfo.elem, name)
         conditionalrendering = cmdinfo.elem.get('conditionalrendering')
-        successcodes = self.makeSuccessCodes(cmdinfo.elem, name)
-        errorcodes = self.makeErrorCodes(cmdinfo.elem, name)
+        successcodes = self.makeSuccessCodes(cmdinfo, name)
+        errorcodes = self.makeErrorCodes(cmdinfo, name)
 
         # OpenXR-specific
         # self.generateStateValidity(validity, name)
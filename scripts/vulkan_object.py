@@ -4,10 +4,30 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import IntFlag, Enum, auto
-
-@dataclass
+from operator import attrgetter
+
+# There are tens of thousands of these objects in a VulkanObject, so they are dataclasses
+# with __slots__ rather than a __dict__ for each instance.
+# They are pickled as a tuple of their field values, which __setstate__ assigns in one
+# statement, rather than the default dictionary of field names and values.
+def slottedDataclass(cls):
+    cls = dataclass(slots=True)(cls)
+    names = tuple(f.name for f in fields(cls))
+
+    getter = attrgetter(*names)
+    if len(names) == 1:
+        cls.__getstate__ = lambda self: (getter(self),)
+    else:
+        cls.__getstate__ = lambda self: getter(self)
+
+    namespace = {}
+    exec(f'def __setstate__(self, state):\n    ({"".join(f"self.{name}, " for name in names)}) = state', namespace)
+    cls.__setstate__ = namespace['__setstate__']
+    return cls
+
+@slottedDataclass
 class FeatureRequirement:
     """Each instance of FeatureRequirement is one part of the AND operation,
        unless the struct/field are the same, then the depends are AND togethered"""
@@ -15,7 +35,7 @@ class FeatureRequirement:
     field: str # Can have comma delimiter, which are expressed as OR
     depends: (str | None) # ex) "VK_EXT_descriptor_indexing", "VK_VERSION_1_2+VkPhysicalDeviceVulkan12Features::descriptorIndexing"
 
-@dataclass
+@slottedDataclass
 class Extension:
     """<extension>"""
     name: str # ex) VK_KHR_SURFACE
@@ -52,7 +72,7 @@ class Extension:
     # Use the Bitmask name to see what flag bits are added to it
     flagBits: dict[str, list['Flag']] = field(default_factory=dict, init=False)
 
-@dataclass
+@slottedDataclass
 class Version:
     """
     <feature> which represents a version
@@ -64,7 +84,7 @@ class Version:
 
     featureRequirement: list[FeatureRequirement]
 
-@dataclass
+@slottedDataclass
 class Legacy:
     """<deprecate>
     For historical reasons, the XML tag is "deprecate" but we decided in the WG to not use that as the public facing name
@@ -73,7 +93,7 @@ class Legacy:
     version: (Version | None)
     extensions: list[str]
 
-@dataclass
+@slottedDataclass
 class Handle:
     """<type> which represents a dispatch handle"""
     name: str # ex) VkBuffer
@@ -102,7 +122,7 @@ class ExternSync(Enum):
     SUBTYPE       = auto() # externsync="param->member"
     SUBTYPE_MAYBE = auto() # externsync="maybe:param->member"
 
-@dataclass
+@slottedDataclass
 class Param:
     """<command/param>"""
     name: str # ex) pCreateInfo, pAllocator, pBuffer
@@ -150,7 +170,7 @@ class CommandScope(Enum):
     OUTSIDE = auto()
     BOTH    = auto()
 
-@dataclass
+@slottedDataclass
 class Command:
     """<command>"""
     name: str # ex) vkCmdDraw
@@ -200,7 +220,7 @@ class Command:
     def __lt__(self, other):
         return self.name < other.name
 
-@dataclass
+@slottedDataclass
 class Member:
     """<member>"""
     name: str # ex) sType, pNext, flags, size, usage
@@ -247,7 +267,7 @@ class Member:
     def __lt__(self, other):
         return self.name < other.name
 
-@dataclass
+@slottedDataclass
 class Struct:
     """<type category="struct"> or <type category="union">"""
     name: str # ex) VkImageSubresource2
@@ -276,7 +296,7 @@ class Struct:
     def __lt__(self, other):
         return self.name < other.name
 
-@dataclass
+@slottedDataclass
 class EnumField:
     """<enum> of type enum"""
     name: str # ex) VK_DYNAMIC_STATE_SCISSOR_WITH_COUNT
@@ -294,7 +314,7 @@ class EnumField:
     def __lt__(self, other):
         return self.name < other.name
 
-@dataclass
+@slottedDataclass
 class Enum:
     """<enums> of type enum"""
     name: str # ex) VkLineRasterizationMode
@@ -317,7 +337,7 @@ class Enum:
     def __lt__(self, other):
         return self.name < other.name
 
-@dataclass
+@slottedDataclass
 class Flag:
     """<enum> of type bitmask"""
     name: str # ex) VK_ACCESS_2_SHADER_READ_BIT
@@ -336,7 +356,7 @@ class Flag:
     def __lt__(self, other):
         return self.name < other.name
 
-@dataclass
+@slottedDataclass
 class Bitmask:
     """<enums> of type bitmask"""
     name: str     # ex) VkAccessFlagBits2
@@ -357,7 +377,7 @@ class Bitmask:
     def __lt__(self, other):
         return self.name < other.name
 
-@dataclass
+@slottedDataclass
 class Flags:
     """<type> defining flags types"""
     name: str # ex) VkAccessFlags2
@@ -375,7 +395,7 @@ class Flags:
     def __lt__(self, other):
         return self.name < other.name
 
-@dataclass
+@slottedDataclass
 class Constant:
     name: str # ex) VK_UUID_SIZE
     type: str # ex) uint32_t, float
@@ -385,7 +405,7 @@ class Constant:
     # This field is only set for enum definitions coming from Video Std headers
     videoStdHeader: (str | None) = None
 
-@dataclass
+@slottedDataclass
 class FormatComponent:
     """<format/component>"""
     type: str # ex) R, G, B, A, D, S, etc
@@ -393,7 +413,7 @@ class FormatComponent:
     numericFormat: str # ex) UNORM, SINT, etc
     planeIndex: (int | None) # None if no planeIndex in format
 
-@dataclass
+@slottedDataclass
 class FormatPlane:
     """<format/plane>"""
     index: int
@@ -401,7 +421,7 @@ class FormatPlane:
     heightDivisor: int
     compatible: str
 
-@dataclass
+@slottedDataclass
 class Format:
     """<format>"""
     name: str
@@ -416,35 +436,35 @@ class Format:
     planes: list[FormatPlane]  # <format/plane>
     spirvImageFormat: (str | None)
 
-@dataclass
+@slottedDataclass
 class SyncSupport:
     """<syncsupport>"""
     queues: list[str]  # ex) [ VK_QUEUE_GRAPHICS_BIT, VK_QUEUE_COMPUTE_BIT ]
     stages: list[Flag] # VkPipelineStageFlagBits2
     max: bool # If this supports max values
 
-@dataclass
+@slottedDataclass
 class SyncEquivalent:
     """<syncequivalent>"""
     stages: list[Flag] # VkPipelineStageFlagBits2
     accesses: list[Flag] # VkAccessFlagBits2
     max: bool # If this equivalent to everything
 
-@dataclass
+@slottedDataclass
 class SyncStage:
     """<syncstage>"""
     flag: Flag # VkPipelineStageFlagBits2
     support: SyncSupport
     equivalent: SyncEquivalent
 
-@dataclass
+@slottedDataclass
 class SyncAccess:
     """<syncaccess>"""
     flag: Flag # VkAccessFlagBits2
     support: SyncSupport
     equivalent: SyncEquivalent
 
-@dataclass
+@slottedDataclass
 class SyncPipelineStage:
     """<syncpipelinestage>"""
     order: (str | None)
@@ -452,14 +472,14 @@ class SyncPipelineStage:
     after: (str | None)
     value: str
 
-@dataclass
+@slottedDataclass
 class SyncPipeline:
     """<syncpipeline>"""
     name: str
     depends: list[str]
     stages: list[SyncPipelineStage]
 
-@dataclass
+@slottedDataclass
 class SpirvEnables:
     """What is needed to enable the SPIR-V element"""
     version: (str | None)
@@ -471,7 +491,7 @@ class SpirvEnables:
     member: (str | None)
     value: (str | None)
 
-@dataclass
+@slottedDataclass
 class Spirv:
     """<spirvextension> and <spirvcapability>"""
     name: str
@@ -480,7 +500,7 @@ class Spirv:
     capability: bool
     enable: list[SpirvEnables]
 
-@dataclass
+@slottedDataclass
 class VideoRequiredCapabilities:
     """<videorequirecapabilities>"""
     struct: str     # ex) VkVideoEncodeCapabilitiesKHR
@@ -488,7 +508,7 @@ class VideoRequiredCapabilities:
     value: str      # ex) VK_VIDEO_ENCODE_CAPABILITY_QUANTIZATION_DELTA_MAP_BIT_KHR
                     # may contain XML boolean expressions ("+" means AND, "," means OR)
 
-@dataclass
+@slottedDataclass
 class VideoFormat:
     """<videoformat>"""
     name: str       # ex) Decode Output
@@ -501,7 +521,7 @@ class VideoFormat:
     def __lt__(self, other):
         return self.name < other.name
 
-@dataclass
+@slottedDataclass
 class VideoProfileMember:
     """<videoprofilemember> and <videoprofile>"""
     name: str
@@ -509,13 +529,13 @@ class VideoProfileMember:
     # profile name substring (name attribute of <videoprofile>) as value
     values: dict[str, str]
 
-@dataclass
+@slottedDataclass
 class VideoProfiles:
     """<videoprofiles>"""
     name: str
     members: dict[str, VideoProfileMember]
 
-@dataclass
+@slottedDataclass
 class VideoCodec:
     """<videocodec>"""
     name: str   # ex) H.264 Decode
@@ -529,7 +549,7 @@ class VideoCodec:
     def __lt__(self, other):
         return self.name < other.name
 
-@dataclass
+@slottedDataclass
 class VideoStdHeader:
     """<extension> in video.xml"""
     name: str # ex) vulkan_video_codec_h264std_decode
@@ -541,7 +561,7 @@ class VideoStdHeader:
     # Other Video Std headers that this one depends on
     depends: list[str]
 
-@dataclass
+@slottedDataclass
 class VideoStd:
     headers: dict[str, VideoStdHeader] = field(default_factory=dict, init=False)
 
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3 -i
+#
+# Copyright 2025 The Khronos Group Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+
+# Binary file format for a VulkanObject, which can be memory-mapped and is decoded lazily.
+#
+# Unpickling a VulkanObject decodes all of it before a generator can look at any of it.
+# ReadVulkanObject() instead maps the file and only decodes the parts of the VulkanObject
+# that are used, so a tool looking at a few commands or structs starts in milliseconds.
+#
+# File layout, with all integers little-endian uint32 and each section 4-byte aligned:
+#
+#   header        - MAGIC, FORMAT_VERSION, then the counts and offsets in HEADER_FIELDS
+#   string index  - offset of each string in the string data, plus the end offset
+#   string data   - UTF-8 strings
+#   node index    - offset in the cells of each node
+#   cells         - fixed-size (tag, payload) pairs of uint32
+#
+# Each value is one cell. None, booleans, and small integers are stored in the cell, and
+# strings, larger integers, and floats are stored as an index into the string table.
+# Enum members are stored as the name of the member, with the Enum class in the tag.
+#
+# Lists, dicts, and model objects are nodes, referenced by their index in the node index.
+# A node is a header cell, with the node kind (and class of objects) in the tag and the
+# number of cells in the payload, followed by the cells of its items, of its keys and
+# values, or of its fields. Objects referenced more than once, such as a Command in both
+# vk.commands and Extension.commands, are stored once, so they are also the same object
+# when read.
+#
+# The schema node lists the name and fields of each class, and the name of each Enum
+# class, in the file. Files written with a different VulkanObject schema are rejected.
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from collections.abc import Mapping
+from dataclasses import fields, is_dataclass
+import enum
+
+import vulkan_object
+from vulkan_object import VulkanObject
+
+MAGIC = b'VKOBJECT'
+# Version of the file layout. Increment on incompatible changes.
+FORMAT_VERSION = 1
+
+HEADER_FIELDS = ('stringCount', 'nodeCount', 'cellCount', 'schemaNode', 'rootNode',
+                 'stringIndexOffset', 'stringDataOffset', 'nodeIndexOffset', 'cellsOffset')
+HEADER = struct.Struct(f'<8sI{len(HEADER_FIELDS)}I')
+
+# Value tags
+TAG_NONE   = 0
+TAG_FALSE  = 1
+TAG_TRUE   = 2
+TAG_INT    = 3 # payload is a signed 32-bit integer
+TAG_BIGINT = 4 # payload is a string index of the decimal integer
+TAG_FLOAT  = 5 # payload is a string index of the repr() of the float
+TAG_STR    = 6 # payload is a string index
+TAG_NODE   = 7 # payload is a node index
+TAG_ENUM   = 8 # payload is a string index of the member name, class index in the upper bits
+
+# Node header tags, with the class index in the upper bits for objects
+NODE_OBJECT = 16
+NODE_LIST   = 17
+NODE_DICT   = 18
+
+TAG_BITS = 8
+TAG_MASK = (1 << TAG_BITS) - 1
+
+class VulkanObjectFileError(Exception):
+    pass
+
+#
+# Encodes a VulkanObject in the file format
+class VulkanObjectWriter:
+    def __init__(self):
+        self.strings = dict() # string -> index
+        self.nodes = [] # list of cells of each node
+        self.nodeIds = dict() # id() of list, dict or object -> node index
+        self.objects = [] # Keeps encoded objects alive, so their id() is not reused
+        self.classes = dict() # class -> index in schema
+        self.fieldNames = dict() # class -> names of its fields
+
+    def string(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def classIndex(self, cls) -> int:
+        index = self.classes.get(cls)
+        if index is None:
+            index = self.classes[cls] = len(self.classes)
+        return index
+
+    # Returns the (tag, payload) cell of a value
+    def value(self, value) -> tuple:
+        if value is None:
+            return (TAG_NONE, 0)
+        valueType = type(value)
+        if valueType is str:
+            return (TAG_STR, self.string(value))
+        if valueType is bool:
+            return (TAG_TRUE if value else TAG_FALSE, 0)
+        if isinstance(value, enum.Enum):
+            return (TAG_ENUM | (self.classIndex(valueType) << TAG_BITS), self.string(value.name))
+        if valueType is int:
+            if -(1 << 31) <= value < (1 << 31):
+                return (TAG_INT, value & 0xFFFFFFFF)
+            return (TAG_BIGINT, self.string(str(value)))
+        if valueType is float:
+            return (TAG_FLOAT, self.string(repr(value)))
+        return (TAG_NODE, self.node(value))
+
+    # Returns the index of the node of a list, dict, or model object
+    def node(self, value) -> int:
+        index = self.nodeIds.get(id(value))
+        if index is not None:
+            return index
+        index = self.nodeIds[id(value)] = len(self.nodes)
+        self.objects.append(value)
+        # Reserve the index before encoding the contents, which may reference the node
+        self.nodes.append(None)
+
+        if type(value) is list:
+            cells = [(NODE_LIST, len(value))]
+            cells.extend(self.value(x) for x in value)
+        elif type(value) is dict:
+            cells = [(NODE_DICT, 2 * len(value))]
+            for (key, x) in value.items():
+                cells.append(self.value(key))
+                cells.append(self.value(x))
+        elif is_dataclass(value):
+            names = self.fieldNames.get(type(value))
+            if names is None:
+                names = self.fieldNames[type(value)] = [f.name for f in fields(value)]
+            cells = [(NODE_OBJECT | (self.classIndex(type(value)) << TAG_BITS), len(names))]
+            cells.extend(self.value(getattr(value, name)) for name in names)
+        else:
+            raise VulkanObjectFileError(f'Cannot encode {type(value).__name__} value {value!r}')
+
+        self.nodes[index] = cells
+        return index
+
+    # The schema is a list with a [kind, name, field names...] list for each class
+    def schema(self) -> int:
+        schema = []
+        for cls in self.classes:
+            if issubclass(cls, enum.Enum):
+                schema.append(['enum', cls.__name__])
+            else:
+                schema.append(['class', cls.__name__] + [f.name for f in fields(cls)])
+        return self.node(schema)
+
+    def encode(self, vk: VulkanObject) -> bytes:
+        rootNode = self.node(vk)
+        schemaNode = self.schema()
+
+        encodedStrings = [s.encode('utf-8') for s in self.strings]
+        stringIndex = [0]
+        for s in encodedStrings:
+            stringIndex.append(stringIndex[-1] + len(s))
+        stringData = b''.join(encodedStrings)
+        stringData += b'\0' * (-len(stringData) % 4)
+
+        nodeIndex = []
+        cells = []
+        for nodeCells in self.nodes:
+            nodeIndex.append(len(cells))
+            cells.extend(nodeCells)
+
+        header = dict(stringCount = len(encodedStrings),
+                      nodeCount = len(nodeIndex),
+                      cellCount = len(cells),
+                      schemaNode = schemaNode,
+                      rootNode = rootNode)
+        header['stringIndexOffset'] = HEADER.size
+        header['stringDataOffset'] = header['stringIndexOffset'] + 4 * len(stringIndex)
+        header['nodeIndexOffset'] = header['stringDataOffset'] + len(stringData)
+        header['cellsOffset'] = header['nodeIndexOffset'] + 4 * len(nodeIndex)
+
+        flatCells = [x for cell in cells for x in cell]
+        return b''.join([
+            HEADER.pack(MAGIC, FORMAT_VERSION, *(header[name] for name in HEADER_FIELDS)),
+            struct.pack(f'<{len(stringIndex)}I', *stringIndex),
+            stringData,
+            struct.pack(f'<{len(nodeIndex)}I', *nodeIndex),
+            struct.pack(f'<{len(flatCells)}I', *flatCells)])
+
+#
+# Write a VulkanObject to a file, replacing it atomically so concurrent readers never
+# see a partial file
+def WriteVulkanObject(vk: VulkanObject, path: str) -> None:
+    data = VulkanObjectWriter().encode(vk)
+    fd, tmpname = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        os.replace(tmpname, path)
+    except BaseException:
+        os.remove(tmpname)
+        raise
+
+#
+# Decodes values from a file on demand
+class VulkanObjectReader:
+    def __init__(self, data):
+        self.data = data
+        if len(data) < HEADER.size:
+            raise VulkanObjectFileError('File is too short to be a VulkanObject file')
+        (magic, version, *values) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise VulkanObjectFileError('Not a VulkanObject file')
+        if version != FORMAT_VERSION:
+            raise VulkanObjectFileError(f'VulkanObject file format version {version} is not {FORMAT_VERSION}')
+        self.header = dict(zip(HEADER_FIELDS, values))
+
+        self.stringIndex = self.uint32s(self.header['stringIndexOffset'], self.header['stringCount'] + 1)
+        self.nodeIndex = self.uint32s(self.header['nodeIndexOffset'], self.header['nodeCount'])
+        self.cells = self.uint32s(self.header['cellsOffset'], 2 * self.header['cellCount'])
+        self.stringDataOffset = self.header['stringDataOffset']
+
+        self.stringCache = [None] * self.header['stringCount']
+        self.nodeCache = dict() # node index -> decoded list, dict, or object
+
+        self.classes = []
+        for entry in self.decodeNode(self.header['schemaNode']):
+            self.classes.append(self.schemaClass(entry))
+
+    # Returns a sequence of uint32 in the file, without copying it if possible
+    def uint32s(self, offset: int, count: int):
+        view = memoryview(self.data)[offset:offset + 4 * count]
+        if len(view) != 4 * count:
+            raise VulkanObjectFileError('VulkanObject file is truncated')
+        if sys.byteorder == 'little':
+            return view.cast('I')
+        return list(struct.unpack(f'<{count}I', view))
+
+    # Returns the current class for a schema entry, if it has the same fields as in the file
+    def schemaClass(self, entry: list):
+        (kind, name, *names) = entry
+        cls = getattr(vulkan_object, name, None)
+        if kind == 'enum':
+            if not (isinstance(cls, type) and issubclass(cls, enum.Enum)):
+                raise VulkanObjectFileError(f'VulkanObject file has unknown Enum class {name}')
+        elif not (isinstance(cls, type) and is_dataclass(cls) and [f.name for f in fields(cls)] == names):
+            raise VulkanObjectFileError(f'VulkanObject file has a different definition of {name}')
+        return cls
+
+    def string(self, index: int) -> str:
+        value = self.stringCache[index]
+        if value is None:
+            start = self.stringDataOffset + self.stringIndex[index]
+            end = self.stringDataOffset + self.stringIndex[index + 1]
+            value = self.stringCache[index] = sys.intern(str(self.data[start:end], 'utf-8'))
+        return value
+
+    def value(self, tag: int, payload: int):
+        if tag == TAG_STR:
+            return self.string(payload)
+        if tag == TAG_NODE:
+            node = self.nodeCache.get(payload)
+            if node is None:
+                node = self.decodeNode(payload)
+            return node
+        if tag == TAG_NONE:
+            return None
+        if tag == TAG_FALSE:
+            return False
+        if tag == TAG_TRUE:
+            return True
+        if tag == TAG_INT:
+            return payload - (1 << 32) if payload & 0x80000000 else payload
+        if tag & TAG_MASK == TAG_ENUM:
+            return self.classes[tag >> TAG_BITS][self.string(payload)]
+        if tag == TAG_BIGINT:
+            return int(self.string(payload))
+        if tag == TAG_FLOAT:
+            return float(self.string(payload))
+        raise VulkanObjectFileError(f'VulkanObject file has unknown value tag {tag}')
+
+    # Returns the position in self.cells of the header of a node, and the header cell
+    def nodeHeader(self, index: int) -> tuple:
+        position = 2 * self.nodeIndex[index]
+        return (position, self.cells[position], self.cells[position + 1])
+
+    # Returns the cells of the items of a node as a list
+    def nodeCells(self, position: int, count: int) -> list:
+        cells = self.cells[position + 2:position + 2 + 2 * count]
+        return cells.tolist() if isinstance(cells, memoryview) else cells
+
+    def decodeNode(self, index: int):
+        (position, tag, count) = self.nodeHeader(index)
+        cells = self.nodeCells(position, count)
+        value = self.value
+        if tag == NODE_LIST:
+            node = self.nodeCache[index] = []
+            node.extend(value(cells[i], cells[i + 1]) for i in range(0, 2 * count, 2))
+        elif tag == NODE_DICT:
+            node = self.nodeCache[index] = dict()
+            for i in range(0, 2 * count, 4):
+                node[value(cells[i], cells[i + 1])] = value(cells[i + 2], cells[i + 3])
+        elif tag & TAG_MASK == NODE_OBJECT:
+            cls = self.classes[tag >> TAG_BITS]
+            # The object is cached before its fields are decoded, in case they reference it
+            node = self.nodeCache[index] = cls.__new__(cls)
+            state = tuple(value(cells[i], cells[i + 1]) for i in range(0, 2 * count, 2))
+            if hasattr(cls, '__setstate__'):
+                node.__setstate__(state)
+            else:
+                for (f, x) in zip(fields(cls), state):
+                    setattr(node, f.name, x)
+        else:
+            raise VulkanObjectFileError(f'VulkanObject file has unknown node tag {tag}')
+        return node
+
+#
+# Read-only dict of a VulkanObject file, which only decodes the keys until a value is used
+class LazyDict(Mapping):
+    def __init__(self, reader: VulkanObjectReader, index: int):
+        self.reader = reader
+        (position, _, count) = reader.nodeHeader(index)
+        cells = reader.nodeCells(position, count)
+        # key -> (tag, payload) cell of the value
+        self.cells = dict()
+        for i in range(0, 2 * count, 4):
+            self.cells[reader.value(cells[i], cells[i + 1])] = (cells[i + 2], cells[i + 3])
+        self.decoded = dict() # key -> value, for the values decoded
+
+    def __getitem__(self, key):
+        if key in self.decoded:
+            return self.decoded[key]
+        (tag, payload) = self.cells[key]
+        value = self.decoded[key] = self.reader.value(tag, payload)
+        return value
+
+    def __contains__(self, key):
+        return key in self.cells
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __repr__(self):
+        return f'LazyDict({len(self)} items)'
+
+#
+# VulkanObject read from a file, with the same attributes as the VulkanObject written.
+# Each attribute is decoded when it is first used, and the dict attributes (commands,
+# structs, etc) are LazyDicts which only decode the values that are used.
+class LazyVulkanObject:
+    def __init__(self, reader: VulkanObjectReader):
+        self._reader = reader
+        (position, tag, count) = reader.nodeHeader(reader.header['rootNode'])
+        if tag & TAG_MASK != NODE_OBJECT or reader.classes[tag >> TAG_BITS] is not VulkanObject:
+            raise VulkanObjectFileError('VulkanObject file does not contain a VulkanObject')
+        cells = reader.nodeCells(position, count)
+        self._cells = {f.name: (cells[2 * i], cells[2 * i + 1]) for (i, f) in enumerate(fields(VulkanObject))}
+
+    def __getattr__(self, name: str):
+        if name.startswith('_') or name not in self._cells:
+            raise AttributeError(f"'LazyVulkanObject' object has no attribute '{name}'")
+        (tag, payload) = self._cells[name]
+        reader = self._reader
+        if tag == TAG_NODE and reader.nodeHeader(payload)[1] == NODE_DICT:
+            value = LazyDict(reader, payload)
+        else:
+            value = reader.value(tag, payload)
+        # Later uses of the attribute find it without calling __getattr__
+        setattr(self, name, value)
+        return value
+
+    # Returns a VulkanObject with everything in the file decoded
+    def load(self) -> VulkanObject:
+        vk = VulkanObject()
+        for name in self._cells:
+            value = getattr(self, name)
+            setattr(vk, name, dict(value) if isinstance(value, LazyDict) else value)
+        return vk
+
+#
+# Read a VulkanObject written by WriteVulkanObject()
+# The file is memory-mapped and only decoded as the VulkanObject is used
+def ReadVulkanObject(path: str) -> LazyVulkanObject:
+    with open(path, 'rb') as fp:
+        try:
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            data = b''
+    return LazyVulkanObject(VulkanObjectReader(data))
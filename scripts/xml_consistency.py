@@ -440,7 +440,7 @@ If you are working in an old branch using the old (non-enumerant) "queues" names
                 # Enforcing that non-returnedonly pNext are const is not
                 # viable, with hundreds of examples either way
                 returnedonly = info.elem.get('returnedonly', 'false')
-                structextends = info.elem.get('structextends', '').split(',')
+                structextends = info.structextends
 
 
                 # Look for 'const' at beginning, rather than parsing
@@ -478,12 +478,10 @@ If you are working in an old branch using the old (non-enumerant) "queues" names
 
         # Check consistency with parent structure(s) with
         # 'requiredlimittype'
-        extends = info.elem.get('structextends')
-        if extends:
-            for parent_name in extends.split(','):
-                parent_info = self.reg.typedict[parent_name]
-                if getRequiredLimittype(parent_info) and not requiredLimittype:
-                    self.record_error(f'{name} missing \'requiredlimittype="true"\' attribute, which must match parent {parent_name}')
+        for parent_name in info.structextends:
+            parent_info = self.reg.typedict[parent_name]
+            if getRequiredLimittype(parent_info) and not requiredLimittype:
+                self.record_error(f'{name} missing \'requiredlimittype="true"\' attribute, which must match parent {parent_name}')
 
         # Check individual members for consistency with 'requiredlimittype'
         validLimittypes = { 'min', 'max', 'not', 'pot', 'mul', 'bits', 'bitmask', 'range', 'struct', 'exact', 'noauto' }